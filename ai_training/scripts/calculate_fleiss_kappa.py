@@ -1,11 +1,9 @@
 """
 Script để tính độ đồng thuận Fleiss' Kappa cho dữ liệu annotation
 """
-import csv
 import sys
 import io
 from pathlib import Path
-from collections import defaultdict
 import numpy as np
 
 # Fix console encoding for Windows
@@ -13,6 +11,14 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# Schema nhãn và bộ đọc annotations dùng chung nằm trong scripts/ của project
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts"))
+from dataset_schema import ASPECT_CODES, ASPECT_VALUES, LABEL_COLUMNS, encode_labels  # noqa: E402
+from dataset_store import load_annotations  # noqa: E402
+
+# Thứ tự categories trong ma trận ratings: Negative, Neutral, Positive, Empty
+CATEGORIES = ['Negative', 'Neutral', 'Positive', '']
+
 def fleiss_kappa(ratings_matrix):
     """
     Tính Fleiss' Kappa
@@ -56,60 +62,43 @@ def calculate_agreement(csv_file):
     """
     print(f"Đang đọc file: {csv_file}\n")
     
-    # Đọc dữ liệu
-    with open(csv_file, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+    # Đọc dữ liệu: CSV (mọi ô là chuỗi) hoặc Parquet có kiểu từ json_to_csv --parquet
+    df = load_annotations(csv_file)
+    
+    # Các cột label cần tính, theo thứ tự của dataset
+    label_columns = LABEL_COLUMNS
     
-    # Các cột label cần tính
-    label_columns = ['Camera', 'Design', 'Others', 'Battery', 'Pricing', 
-                    'Shipping', 'Warranty', 'Packaging', 'Performance']
+    # Nhóm annotations theo ID: items[r] = chỉ số item (ID đã sắp xếp) của annotation r
+    item_ids, items = np.unique(df['id'].to_numpy(), return_inverse=True)
+    n_items, n_labels, n_codes = len(item_ids), len(label_columns), len(ASPECT_VALUES)
     
-    # Nhóm annotations theo ID
-    annotations_by_id = defaultdict(list)
-    for row in rows:
-        item_id = row['id']
-        annotations_by_id[item_id].append(row)
+    print(f"Tổng số items (texts) được đánh giá: {n_items}")
+    print(f"Tổng số annotations: {len(df)}\n")
     
-    print(f"Tổng số items (texts) được đánh giá: {len(annotations_by_id)}")
-    print(f"Tổng số annotations: {len(rows)}\n")
+    # Mã int8 của từng nhãn (0 = rỗng, -1 = giá trị lạ, bị bỏ qua), đếm vote
+    # của mọi (item, label, category) bằng một lần bincount
+    codes = encode_labels(df, label_columns)
+    cells = (items[:, None] * n_labels + np.arange(n_labels)) * n_codes + codes
+    votes = np.bincount(cells[codes >= 0], minlength=n_items * n_labels * n_codes)
+    votes = votes.reshape(n_items, n_labels, n_codes)[:, :, [ASPECT_CODES[cat] for cat in CATEGORIES]]
     
     # Tính Fleiss' Kappa cho từng label
     results = {}
     
-    for label in label_columns:
+    for j, label in enumerate(label_columns):
         print(f"{'='*60}")
         print(f"Label: {label}")
         print(f"{'='*60}")
         
-        # Tạo ma trận ratings
-        # Categories: Negative, Neutral, Positive, Empty
-        categories = ['Negative', 'Neutral', 'Positive', '']
-        category_to_idx = {cat: idx for idx, cat in enumerate(categories)}
-        
-        # Ma trận n x k (n items, k categories)
-        ratings_matrix = []
-        valid_items = 0
-        
-        for item_id, annotations in sorted(annotations_by_id.items()):
-            # Đếm số lượng mỗi category
-            counts = [0] * len(categories)
-            for ann in annotations:
-                value = ann[label].strip()
-                if value in category_to_idx:
-                    counts[category_to_idx[value]] += 1
-            
-            # Chỉ tính những items có ít nhất 2 raters
-            if sum(counts) >= 2:
-                ratings_matrix.append(counts)
-                valid_items += 1
+        # Ma trận n x k (n items, k categories); chỉ tính những items có ít nhất 2 raters
+        ratings_matrix = votes[:, j]
+        ratings_matrix = ratings_matrix[ratings_matrix.sum(axis=1) >= 2]
+        valid_items = len(ratings_matrix)
         
         if len(ratings_matrix) == 0:
             print(f"⚠ Không có đủ dữ liệu để tính Fleiss' Kappa cho {label}\n")
             continue
         
-        ratings_matrix = np.array(ratings_matrix)
-        
         # Tính Fleiss' Kappa
         kappa = fleiss_kappa(ratings_matrix)
         results[label] = kappa
@@ -121,7 +110,7 @@ def calculate_agreement(csv_file):
         print(f"Số items có ít nhất 2 raters: {valid_items}")
         print(f"Tổng số annotations: {int(total_annotations)}")
         print(f"\nPhân bố categories:")
-        for cat, count in zip(categories, category_counts):
+        for cat, count in zip(CATEGORIES, category_counts):
             cat_name = cat if cat else "(Rỗng)"
             percentage = (count / total_annotations * 100) if total_annotations > 0 else 0
             print(f"  {cat_name:12} : {int(count):4} ({percentage:5.1f}%)")
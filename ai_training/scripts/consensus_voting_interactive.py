@@ -5,13 +5,20 @@ import csv
 import sys
 import io
 from pathlib import Path
-from collections import Counter, defaultdict
+from collections import Counter
+import numpy as np
+import pandas as pd
 
 # Fix console encoding for Windows
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# Schema nhãn và bộ đọc annotations dùng chung nằm trong scripts/ của project
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts"))
+from dataset_schema import LABEL_COLUMNS  # noqa: E402
+from dataset_store import load_annotations  # noqa: E402
+
 # Mapping số -> label
 NUMBER_TO_LABEL = {
     '0': 'Neutral',
@@ -128,6 +135,31 @@ def majority_vote_with_review(values, annotations, text, label,
         else:
             return manager_decision, confidence, True, True
 
+def tally_votes(values, items, n_items):
+    """
+    Đếm vote của một label cho mọi item bằng numpy
+
+    Args:
+        values: Mảng giá trị (đã strip) của từng annotation
+        items: Chỉ số item của từng annotation
+        n_items: Số items
+
+    Returns:
+        Tuple (winner, max_votes): giá trị nhiều vote nhất của mỗi item (hòa thì
+        lấy giá trị xuất hiện trước, như Counter.most_common) và số vote của nó
+    """
+    codes, uniques = pd.factorize(values)
+    k = len(uniques)
+    cells = items * k + codes
+    counts = np.bincount(cells, minlength=n_items * k).reshape(n_items, k)
+    # Vị trí annotation đầu tiên chọn mỗi giá trị, để phân xử khi hòa
+    first = np.full(n_items * k, len(values), dtype=np.int64)
+    np.minimum.at(first, cells, np.arange(len(values)))
+    first = first.reshape(n_items, k)
+    max_votes = counts.max(axis=1)
+    winner = np.where(counts == max_votes[:, None], first, len(values)).argmin(axis=1)
+    return np.asarray(uniques, dtype=object)[winner], max_votes
+
 def consensus_with_manager_review(input_file, output_file=None, 
                                  min_agreement=2, interactive=True,
                                  review_only_no_agreement=True):
@@ -153,89 +185,84 @@ def consensus_with_manager_review(input_file, output_file=None,
         print(f"\n⚠️  Chế độ interactive: Bạn sẽ được hỏi khi có disagreement")
         input("\n➤ Nhấn Enter để bắt đầu...")
     
-    # Đọc dữ liệu
-    with open(input_file, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+    # Đọc dữ liệu: CSV (mọi ô là chuỗi) hoặc Parquet có kiểu từ json_to_csv --parquet
+    df = load_annotations(input_file)
+    
+    label_columns = LABEL_COLUMNS
+    
+    # Nhóm theo ID: items[r] = chỉ số item (ID đã sắp xếp) của annotation r
+    # (ID so sánh dạng chuỗi, để thứ tự output như nhau với CSV và Parquet)
+    item_ids, items = np.unique(df['id'].astype(str).to_numpy(), return_inverse=True)
+    total_items = len(item_ids)
+    order = np.argsort(items, kind='stable')
+    num_annotators = np.bincount(items, minlength=total_items)
+    starts = np.concatenate([[0], np.cumsum(num_annotators)])
     
-    label_columns = ['Camera', 'Design', 'Others', 'Battery', 'Pricing', 
-                    'Shipping', 'Warranty', 'Packaging', 'Performance']
+    print(f"\n📊 Tổng annotations: {len(df)}")
+    print(f"📝 Số texts unique: {total_items}")
     
-    # Nhóm theo ID
-    annotations_by_id = defaultdict(list)
-    for row in rows:
-        annotations_by_id[row['id']].append(row)
+    # Vote của mọi (item, label) tính một lần; chỉ các ô cần review mới xử lý từng cái
+    values = {label: df[label].str.strip().to_numpy(dtype=object) for label in label_columns}
+    winners, max_votes = {}, {}
+    for label in label_columns:
+        winners[label], max_votes[label] = tally_votes(values[label], items, total_items)
     
-    print(f"\n📊 Tổng annotations: {len(rows)}")
-    print(f"📝 Số texts unique: {len(annotations_by_id)}")
+    # Quyết định có review không
+    threshold = 2 if review_only_no_agreement else min_agreement
     
     # Tạo consensus
     consensus_data = []
     stats = {
-        'total_items': 0,
-        'total_labels': 0,
+        'total_items': total_items,
+        'total_labels': total_items * len(label_columns),
         'needs_review': 0,
         'reviewed_by_manager': 0,
         'perfect': 0,
         'majority': 0,
         'no_agreement': 0,
     }
+    for label in label_columns:
+        agreed = max_votes[label] >= threshold
+        stats['perfect'] += int((agreed & (max_votes[label] == num_annotators)).sum())
+        stats['majority'] += int((agreed & (max_votes[label] < num_annotators)).sum())
     
-    item_count = 0
-    total_items = len(annotations_by_id)
+    texts = df['data'].to_numpy(dtype=object)
     
-    for item_id, annotations in sorted(annotations_by_id.items()):
-        item_count += 1
-        stats['total_items'] += 1
-        text = annotations[0]['data']
+    for item in range(total_items):
+        rows = order[starts[item]:starts[item + 1]]
+        item_id = item_ids[item]
+        text = texts[rows[0]]
         
         print(f"\n\n{'='*70}")
-        print(f"📍 Progress: {item_count}/{total_items} texts")
+        print(f"📍 Progress: {item + 1}/{total_items} texts")
         print(f"🆔 ID: {item_id}")
         
         consensus_row = {
             'data': text,
             'id': item_id,
-            'num_annotators': len(annotations),
+            'num_annotators': len(rows),
             'manager_reviewed_labels': []
         }
+        annotations = None
         
         for label in label_columns:
-            stats['total_labels'] += 1
-            values = [ann[label].strip() for ann in annotations]
-            
-            # Kiểm tra có cần review không
-            counter = Counter(values)
-            max_votes = counter.most_common(1)[0][1]
+            if max_votes[label][item] >= threshold:
+                # Không cần review, lấy majority
+                consensus_row[label] = winners[label][item]
+                continue
             
-            # Quyết định có review không
-            if review_only_no_agreement:
-                # Chỉ review khi hoàn toàn không đồng thuận (1/1/1)
-                should_review = (max_votes < 2)  # Không có giá trị nào ≥ 2 votes
-            else:
-                # Review khi không đủ min_agreement
-                should_review = (max_votes < min_agreement)
+            if annotations is None:
+                annotations = df.iloc[rows].to_dict('records')
+            result, confidence, needs_review, reviewed = majority_vote_with_review(
+                list(values[label][rows]), annotations, text, label, 
+                min_agreement, auto_mode=not interactive
+            )
             
-            if should_review:
-                result, confidence, needs_review, reviewed = majority_vote_with_review(
-                    values, annotations, text, label, 
-                    min_agreement, auto_mode=not interactive
-                )
-                
-                if needs_review:
-                    stats['needs_review'] += 1
-                if reviewed:
-                    stats['reviewed_by_manager'] += 1
-                    consensus_row['manager_reviewed_labels'].append(label)
-            else:
-                # Không cần review, lấy majority
-                result = counter.most_common(1)[0][0]
-                confidence = max_votes / len(values)
-                
-                if max_votes == len(values):
-                    stats['perfect'] += 1
-                else:
-                    stats['majority'] += 1
+            if needs_review:
+                stats['needs_review'] += 1
+            if reviewed:
+                stats['reviewed_by_manager'] += 1
+                consensus_row['manager_reviewed_labels'].append(label)
             
             consensus_row[label] = result
         
@@ -1,10 +1,17 @@
 """
-Script để chuyển đổi file JSON sang CSV
+Script để chuyển đổi file JSON sang CSV (hoặc Parquet)
 """
+import argparse
 import json
 import csv
+import os
+import re
 import sys
 import io
+import time
+from datetime import datetime, timezone
+from itertools import chain, islice
+from operator import itemgetter
 from pathlib import Path
 
 # Fix console encoding for Windows
@@ -12,46 +19,399 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-def json_to_csv(json_file, csv_file):
+# Schema nhãn dùng chung nằm trong scripts/ của project
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts"))
+from dataset_schema import LABEL_COLUMNS  # noqa: E402
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+# Số ký tự đọc mỗi lần từ file JSON
+CHUNK_SIZE = 1 << 20
+# Giới hạn kích thước một bản ghi (ký tự); vượt quá thì coi như JSON hỏng,
+# để một file hỏng không bị đọc hết vào bộ nhớ
+MAX_RECORD_CHARS = 64 << 20
+# Đuôi file luôn được đọc như JSON Lines (mỗi dòng một bản ghi)
+JSONL_SUFFIXES = {'.jsonl', '.ndjson'}
+
+_NON_WHITESPACE = re.compile(r'\S')
+_NUMBER_CHARS = set('0123456789+-.eE')
+
+# Kiểu cột: int, float, bool, timestamp (chuỗi ISO 8601) hoặc string
+# Kiểu cố định của các trường trong export Label Studio; trường khác được suy ra từ dữ liệu
+LABEL_STUDIO_TYPES = {
+    'data': 'string', 'annotator': 'string',
+    'id': 'int', 'annotation_id': 'int',
+    'lead_time': 'float', 'agreement': 'float',
+    'created_at': 'timestamp', 'updated_at': 'timestamp',
+    **{label: 'string' for label in LABEL_COLUMNS},
+}
+# Số hàng mỗi row group khi ghi Parquet
+PARQUET_BATCH_ROWS = 65536
+
+_TIMESTAMP = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$')
+_PYTHON_TYPES = {bool: 'bool', int: 'int', float: 'float', str: 'str', type(None): None}
+_MISSING = object()
+
+
+class _JsonStream:
+    """Bộ đệm ký tự trên file JSON, giải mã từng giá trị bằng JSONDecoder.raw_decode"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE, max_record_chars=MAX_RECORD_CHARS):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.max_record_chars = max_record_chars
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        # Vị trí trong file của đầu bộ đệm, số dòng và đầu dòng trước đó, để báo lỗi theo file
+        self.offset = 0
+        self.lines = 0
+        self.line_start = 0
+
+    def _fill(self, size=None):
+        """Đọc thêm vào bộ đệm (bỏ phần đã xử lý); False nếu đã hết file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        newline = self.buffer.rfind('\n', 0, self.pos)
+        if newline >= 0:
+            self.lines += self.buffer.count('\n', 0, newline + 1)
+            self.line_start = self.offset + newline + 1
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, msg, pos=None):
+        """JSONDecodeError tại vị trí pos của bộ đệm, với pos/lineno/colno tính theo cả file"""
+        pos = self.pos if pos is None else pos
+        err = json.JSONDecodeError(msg, self.buffer, pos)
+        newline = self.buffer.rfind('\n', 0, pos)
+        err.pos = self.offset + pos
+        err.lineno = self.lines + self.buffer.count('\n', 0, pos) + 1
+        err.colno = err.pos - (self.offset + newline + 1 if newline >= 0 else self.line_start) + 1
+        err.doc = None
+        err.args = (f'{msg}: line {err.lineno} column {err.colno} (char {err.pos})',)
+        return err
+
+    def peek(self):
+        """Ký tự khác khoảng trắng tiếp theo ('' nếu hết file); pos dừng tại ký tự đó"""
+        while True:
+            match = _NON_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return ''
+
+    def _complete(self, value, end):
+        """Giá trị kết thúc tại end chắc chắn không bị cắt ngang bởi ranh giới bộ đệm"""
+        if self.eof or isinstance(value, (dict, list, str)):
+            return True
+        # Số (hoặc true/false/null) sát cuối bộ đệm có thể còn tiếp ở chunk sau
+        match = _NON_WHITESPACE.search(self.buffer, end)
+        return match is not None and self.buffer[match.start()] not in _NUMBER_CHARS
+
+    def decode(self):
+        """Giải mã giá trị JSON tiếp theo, đọc thêm chunk khi giá trị chưa trọn"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                if self._complete(value, end):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as err:
+                if self.eof or len(self.buffer) - self.pos > self.max_record_chars:
+                    raise self.error(err.msg, err.pos) from None
+            # Đọc thêm ít nhất bằng phần đang chờ, để tổng chi phí thử lại là tuyến tính
+            self._fill(max(self.chunk_size, len(self.buffer) - self.pos))
+
+    def expect(self, chars):
+        """Đọc một ký tự phân cách trong chars"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise self.error(f"Expecting {' or '.join(repr(c) for c in chars)} delimiter")
+        self.pos += 1
+        return char
+
+
+def iter_json_records(json_file, chunk_size=CHUNK_SIZE):
+    """
+    Đọc dần các bản ghi của file JSON mà không nạp cả file vào bộ nhớ
+
+    File bắt đầu bằng '[' được đọc như một mảng JSON (export của Label Studio),
+    ngược lại (hoặc đuôi .jsonl/.ndjson) như JSON Lines: các giá trị JSON nối
+    tiếp nhau, thường mỗi dòng một bản ghi. Mỗi lần chỉ giữ trong bộ nhớ một
+    chunk và bản ghi đang đọc.
+
+    Yields:
+        Từng bản ghi (dict)
+
+    Raises:
+        json.JSONDecodeError: JSON hỏng hoặc còn dữ liệu sau ']' (vị trí lỗi tính theo file)
+    """
+    with open(json_file, 'r', encoding='utf-8-sig') as f:
+        stream = _JsonStream(f, chunk_size)
+        first = stream.peek()
+        if first == '[' and Path(json_file).suffix.lower() not in JSONL_SUFFIXES:
+            stream.pos += 1
+            if stream.peek() == ']':
+                stream.pos += 1
+            else:
+                while True:
+                    yield stream.decode()
+                    if stream.expect(',]') == ']':
+                        break
+            # Như json.load: sau ']' chỉ được còn khoảng trắng
+            if stream.peek():
+                raise stream.error("Extra data")
+            return
+        while stream.peek():
+            yield stream.decode()
+
+
+def merge_types(a, b):
+    """Kiểu chung của hai kiểu cột (None = chưa có giá trị)"""
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    if {a, b} == {'int', 'float'}:
+        return 'float'
+    return 'string'
+
+
+def infer_schema(records, limit=None):
     """
-    Chuyển đổi file JSON sang CSV
+    Suy ra header và kiểu cột từ các bản ghi
+
+    Header là hợp các key theo thứ tự xuất hiện đầu tiên. Kiểu của mỗi cột
+    là kiểu chung của mọi giá trị (null và chuỗi rỗng được bỏ qua); kiểu cố
+    định trong LABEL_STUDIO_TYPES được dùng khi tương thích với dữ liệu.
+
+    Args:
+        records: Iterable các bản ghi (dict)
+        limit: Chỉ xét tối đa ngần ấy bản ghi (None = tất cả)
+
+    Returns:
+        Tuple (headers, types, số bản ghi đã xét)
+    """
+    types = {}
+    # Bản ghi cùng key và cùng kiểu Python cho ra cùng kiểu cột, trừ các chuỗi
+    # (rỗng / timestamp / chuỗi thường): với mỗi chữ ký chỉ còn xét lại các key đó
+    pending_by_signature = {}
+    count = 0
+    for record in islice(records, limit):
+        count += 1
+        signature = (tuple(record), tuple(map(type, record.values())))
+        pending = pending_by_signature.get(signature)
+        if pending is None:
+            for key, value in record.items():
+                current = types.get(key, _MISSING)
+                kind = _PYTHON_TYPES.get(type(value), 'string')
+                if kind == 'str':
+                    kind = ('timestamp' if _TIMESTAMP.match(value) else 'string') if value else None
+                types[key] = kind if current is _MISSING else merge_types(current, kind)
+            pending_by_signature[signature] = [key for key, value in record.items() if type(value) is str]
+            continue
+        for key in pending:
+            current = types[key]
+            if current != 'string':
+                value = record[key]
+                types[key] = merge_types(current, ('timestamp' if _TIMESTAMP.match(value) else 'string')
+                                         if value else None)
+
+    for key, kind in types.items():
+        declared = LABEL_STUDIO_TYPES.get(key)
+        if declared and merge_types(declared, kind) == declared:
+            types[key] = declared
+        else:
+            types[key] = kind or 'string'
+    return list(types), types, count
+
+
+def _parse_timestamp(value):
+    if value is None or value == '':
+        return None
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _arrow_column(values, kind, label):
+    """Mảng pyarrow của một cột Parquet theo kiểu đã suy ra"""
+    import pyarrow as pa
+    if kind == 'timestamp':
+        return pa.array([_parse_timestamp(v) for v in values], type=pa.timestamp('us', tz='UTC'))
+    if kind in ('int', 'float', 'bool'):
+        arrow_type = {'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_()}[kind]
+        return pa.array([None if v == '' else v for v in values], type=arrow_type)
+    strings = pa.array([None if v is None else v if isinstance(v, str) else
+                        json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else str(v)
+                        for v in values], type=pa.string())
+    # Nhãn khía cạnh có ít giá trị: lưu dạng dictionary, pandas đọc ra categorical
+    return strings.dictionary_encode() if label else strings
+
+
+class _ParquetRows:
+    """Ghi hàng vào Parquet theo từng row group PARQUET_BATCH_ROWS hàng"""
+
+    def __init__(self, path, headers, types):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.headers = headers
+        self.types = types
+        self.labels = [header in LABEL_COLUMNS for header in headers]
+        arrow_types = {'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_(),
+                       'timestamp': pa.timestamp('us', tz='UTC'), 'string': pa.string()}
+        self.schema = pa.schema([
+            (header, pa.dictionary(pa.int32(), pa.string()) if label else arrow_types[types[header]])
+            for header, label in zip(headers, self.labels)
+        ])
+        self.writer = pq.ParquetWriter(str(path), self.schema)
+        self.rows = []
+
+    def writerow(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= PARQUET_BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        import pyarrow as pa
+        if not self.rows:
+            return
+        columns = [_arrow_column(values, self.types[header], label)
+                   for header, label, values in zip(self.headers, self.labels, zip(*self.rows))]
+        self.writer.write_table(pa.Table.from_arrays(columns, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def write_rows(writer, records, headers):
+    """
+    Ghi từng bản ghi thành một hàng theo headers, ngay khi bản ghi được đọc xong
+    (trường thiếu là None, CSV ghi ô rỗng)
+
+    Returns:
+        Tuple (số hàng, số bản ghi thiếu trường, {key ngoài headers: số bản ghi})
+    """
+    known = set(headers)
+    row_of = itemgetter(*headers) if len(headers) > 1 else (lambda record: (record[headers[0]],))
+    count = incomplete = 0
+    extra_keys = {}
+    for record in records:
+        if record.keys() == known:
+            row = row_of(record)
+        else:
+            row = [record.get(header) for header in headers]
+            if not known <= record.keys():
+                incomplete += 1
+            for key in record:
+                if key not in known:
+                    extra_keys[key] = extra_keys.get(key, 0) + 1
+        writer.writerow(row)
+        count += 1
+    return count, incomplete, extra_keys
+
+
+def json_to_csv(json_file, csv_file, sample=None, parquet=False):
+    """
+    Chuyển đổi file JSON sang CSV (hoặc Parquet nếu parquet=True hoặc file đầu ra có đuôi .parquet)
+    
+    Header là hợp các key của mọi bản ghi (infer_schema). Mặc định file JSON
+    được đọc hai lần: lần đầu suy ra header và kiểu cột, lần sau ghi từng
+    hàng ngay khi bản ghi được đọc xong (iter_json_records), nên bộ nhớ không
+    tăng theo kích thước file. Với sample, chỉ sample bản ghi đầu được dùng để
+    suy ra schema và file được đọc một lần; key chỉ xuất hiện sau đó bị bỏ
+    (và được báo). Bản ghi thiếu trường được ghi ô rỗng và được đếm.
+    
+    Parquet giữ kiểu cột (id, annotation_id: int64; lead_time, agreement:
+    float64; created_at, updated_at: timestamp UTC; nhãn: dictionary) và cần
+    pyarrow. File đầu ra được ghi vào file tạm rồi đổi tên, nên JSON hỏng
+    giữa chừng không để lại file dở dang.
     
     Args:
-        json_file: Đường dẫn file JSON đầu vào
-        csv_file: Đường dẫn file CSV đầu ra
+        json_file: Đường dẫn file JSON (mảng JSON hoặc JSON Lines) đầu vào
+        csv_file: Đường dẫn file CSV (hoặc .parquet) đầu ra
+        sample: Số bản ghi dùng để suy ra schema trong một lần đọc (None = đọc hai lần)
+        parquet: Ghi Parquet dù file đầu ra không có đuôi .parquet (đuôi khác .parquet là lỗi)
     """
-    print(f"Đang đọc file JSON: {json_file}")
+    csv_file = Path(csv_file)
+    suffix = csv_file.suffix.lower()
+    if parquet and suffix not in ('', '.parquet'):
+        raise ValueError(f"--parquet nhưng file đầu ra có đuôi {csv_file.suffix}: "
+                         f"dùng đuôi .parquet hoặc bỏ --parquet")
+    parquet = parquet or suffix == '.parquet'
+    if parquet and not HAVE_PYARROW:
+        raise ImportError("ghi Parquet cần pyarrow (pip install pyarrow)")
     
-    # Đọc file JSON
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    print(f"Đang đọc file JSON: {json_file}")
+    start = time.perf_counter()
     
-    print(f"Đã đọc {len(data)} bản ghi")
+    if sample is None:
+        headers, types, count = infer_schema(iter_json_records(json_file))
+        records = iter_json_records(json_file)
+        print(f"Đã quét {count} bản ghi để suy ra schema ({time.perf_counter() - start:.2f}s)")
+    else:
+        records = iter_json_records(json_file)
+        head = list(islice(records, sample))
+        headers, types, count = infer_schema(head)
+        records = chain(head, records)
+        print(f"Đã suy ra schema từ {count} bản ghi đầu")
     
-    if not data:
+    if not headers:
         print("⚠ File JSON trống!")
         return
     
-    # Lấy tất cả các key từ bản ghi đầu tiên làm header
-    headers = list(data[0].keys())
-    print(f"Các cột: {', '.join(headers)}")
+    print(f"Các cột: {', '.join(f'{header} ({types[header]})' for header in headers)}")
     
-    # Ghi ra file CSV
-    print(f"\nĐang ghi file CSV: {csv_file}")
-    with open(csv_file, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=headers, quoting=csv.QUOTE_ALL)
-        
-        # Ghi header
-        writer.writeheader()
-        
-        # Ghi các hàng dữ liệu
-        for row in data:
-            writer.writerow(row)
+    # Ghi ra file đầu ra
+    print(f"\nĐang ghi file {'Parquet' if parquet else 'CSV'}: {csv_file}")
+    tmp_file = csv_file.with_name(csv_file.name + '.tmp')
+    try:
+        if parquet:
+            writer = _ParquetRows(tmp_file, headers, types)
+            count, incomplete, extra_keys = write_rows(writer, records, headers)
+            writer.close()
+        else:
+            with open(tmp_file, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+                # Ghi header
+                writer.writerow(headers)
+                count, incomplete, extra_keys = write_rows(writer, records, headers)
+        os.replace(tmp_file, csv_file)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+    
+    elapsed = time.perf_counter() - start
+    size_mb = Path(json_file).stat().st_size / 1_048_576
     
     print(f"\n✓ Đã chuyển đổi thành công!")
-    print(f"- Số bản ghi: {len(data)}")
+    print(f"- Số bản ghi: {count}")
     print(f"- Số cột: {len(headers)}")
+    if incomplete:
+        print(f"- Bản ghi thiếu trường (ghi ô rỗng): {incomplete}")
+    if extra_keys:
+        dropped = ', '.join(f'{key} ({n})' for key, n in extra_keys.items())
+        print(f"⚠ Key không có trong {sample} bản ghi đầu bị bỏ qua: {dropped}")
     print(f"- File đầu ra: {csv_file}")
+    print(f"- Thời gian: {elapsed:.2f}s ({size_mb / elapsed if elapsed > 0 else 0:.1f} MB/s, "
+          f"{count / elapsed if elapsed > 0 else 0:.0f} bản ghi/s)")
 
 def main():
     """Hàm chính"""
@@ -61,34 +421,43 @@ def main():
     
     # Đường dẫn mặc định
     default_json = project_root / "data_label" / "1.json"
-    default_csv = project_root / "data_label" / "1.csv"
     
-    # Cho phép truyền tham số từ command line
-    if len(sys.argv) >= 2:
-        json_file = Path(sys.argv[1])
-    else:
-        json_file = default_json
+    parser = argparse.ArgumentParser(description="Chuyển đổi export JSON/JSON Lines của Label Studio sang CSV hoặc Parquet")
+    parser.add_argument("json_file", nargs="?", default=str(default_json),
+                        help=f"File JSON hoặc JSON Lines đầu vào (mặc định: {default_json})")
+    parser.add_argument("csv_file", nargs="?", default=None,
+                        help="File đầu ra; đuôi .parquet để ghi Parquet (mặc định: tên file JSON với đuôi .csv)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Ghi Parquet có kiểu cột (cần pyarrow); đầu ra mặc định đổi thành đuôi .parquet, "
+                             "file đầu ra chỉ định phải có đuôi .parquet hoặc không có đuôi")
+    parser.add_argument("--sample", type=int, default=None, metavar="N",
+                        help="Suy ra schema từ N bản ghi đầu và chỉ đọc file một lần "
+                             "(mặc định: quét toàn bộ file trước khi ghi)")
+    args = parser.parse_args()
     
-    if len(sys.argv) >= 3:
-        csv_file = Path(sys.argv[2])
+    json_file = Path(args.json_file)
+    if args.csv_file:
+        csv_file = Path(args.csv_file)
     else:
-        # Tự động tạo tên file CSV dựa trên tên file JSON
-        csv_file = json_file.with_suffix('.csv')
+        # Tự động tạo tên file đầu ra dựa trên tên file JSON
+        csv_file = json_file.with_suffix('.parquet' if args.parquet else '.csv')
     
     # Kiểm tra file đầu vào
     if not json_file.exists():
         print(f"❌ Lỗi: Không tìm thấy file {json_file}")
         print(f"\nCách sử dụng:")
-        print(f"  python {Path(__file__).name} [đường_dẫn_json] [đường_dẫn_csv]")
+        print(f"  python {Path(__file__).name} [đường_dẫn_json|jsonl] [đường_dẫn_csv|parquet] [--parquet] [--sample N]")
         print(f"\nVí dụ:")
         print(f"  python {Path(__file__).name}")
         print(f"  python {Path(__file__).name} data_label/1.json")
         print(f"  python {Path(__file__).name} data_label/1.json output/result.csv")
+        print(f"  python {Path(__file__).name} export.jsonl")
+        print(f"  python {Path(__file__).name} data_label/1.json --parquet")
         sys.exit(1)
     
     # Chuyển đổi
     try:
-        json_to_csv(json_file, csv_file)
+        json_to_csv(json_file, csv_file, sample=args.sample, parquet=args.parquet)
     except json.JSONDecodeError as e:
         print(f"❌ Lỗi: File JSON không hợp lệ - {e}")
         sys.exit(1)
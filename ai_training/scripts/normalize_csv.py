@@ -1,6 +1,7 @@
 """
 Script để chuẩn hóa format CSV - đảm bảo tất cả các trường đều có dấu ngoặc kép
 """
+import argparse
 import csv
 import sys
 import io
@@ -11,103 +12,88 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-def normalize_csv(input_file, output_file):
+# Bộ sửa CSV dùng chung nằm trong scripts/ của project
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts"))
+from csv_repair import DEFAULT_MAX_RECORD_LINES, repair_csv  # noqa: E402
+
+
+def normalize_csv(input_file, output_file, fixes_file=None, max_record_lines=DEFAULT_MAX_RECORD_LINES):
     """
     Chuẩn hóa file CSV - sửa các hàng thiếu dấu ngoặc kép hoặc bị ngắt dòng
-    
+
+    Đọc file một lần theo luồng (csv_repair.repair_csv, bước "rejoin"), theo dõi
+    trạng thái dấu ngoặc kép:
+    - thêm dấu ngoặc kép còn thiếu ở đầu hàng
+    - đóng dấu ngoặc kép bị bỏ ngỏ quá max_record_lines dòng (chỉ nhìn trước
+      tối đa chừng ấy dòng, bộ nhớ không phụ thuộc kích thước file)
+    - gộp dòng bị ngắt vào hàng trước, bỏ dòng trống
+    Trường có xuống dòng nằm trong dấu ngoặc kép được giữ nguyên. Số cột được
+    đếm ngay khi ghi, không cần đọc lại file.
+
     Args:
         input_file: Đường dẫn file CSV đầu vào
         output_file: Đường dẫn file CSV đầu ra
+        fixes_file: File JSONL ghi lại từng hàng đã sửa (tùy chọn)
+        max_record_lines: Số dòng tối đa của một hàng
+
+    Returns:
+        Thống kê RepairStats của lần chạy
     """
     print(f"Đang đọc file: {input_file}")
-    
-    # Đọc file gốc và sửa các hàng bị lỗi
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    lines = content.split('\n')
-    fixed_lines = []
-    i = 0
-    total_lines = len(lines)
-    fixed_count = 0
-    
-    while i < total_lines:
-        line = lines[i]
-        
-        # Bỏ qua dòng trống
-        if not line.strip():
-            i += 1
-            continue
-        
-        # Kiểm tra nếu dòng không bắt đầu bằng dấu ngoặc kép
-        if not line.startswith('"'):
-            # Trường hợp 1: Thiếu dấu ngoặc kép ở đầu nhưng có ở cuối
-            if '","' in line or line.endswith('"'):
-                # Thêm dấu ngoặc kép vào đầu
-                line = '"' + line
-                fixed_count += 1
-                print(f"Đã sửa hàng {i+1}: Thêm dấu ngoặc kép ở đầu")
-            # Trường hợp 2: Dòng này là phần tiếp theo của dòng trước (bị ngắt dòng)
-            elif i > 0 and fixed_lines:
-                # Gộp với dòng trước đó
-                fixed_lines[-1] = fixed_lines[-1].rstrip() + ' ' + line
-                fixed_count += 1
-                print(f"Đã sửa hàng {i+1}: Gộp với hàng trước")
-                i += 1
-                continue
-        
-        fixed_lines.append(line)
-        i += 1
-    
-    # Ghi lại file với encoding UTF-8 có BOM để Excel đọc được
-    print(f"\nĐang ghi file mới: {output_file}")
-    
-    with open(output_file, 'w', encoding='utf-8-sig', newline='') as f:
-        for line in fixed_lines:
-            f.write(line + '\n')
-    
-    print(f"\nHoàn thành!")
-    print(f"- Tổng số dòng gốc: {total_lines}")
-    print(f"- Số dòng đã sửa: {fixed_count}")
-    print(f"- Tổng số dòng trong file mới: {len(fixed_lines)}")
-    
-    # Kiểm tra và đọc lại file để xác nhận
-    print(f"\nĐang kiểm tra file đã chuẩn hóa...")
-    error_count = 0
-    with open(output_file, 'r', encoding='utf-8-sig') as f:
-        reader = csv.reader(f)
-        row_count = 0
-        for idx, row in enumerate(reader, 1):
-            row_count += 1
-            # Kiểm tra số cột (nên có 10 cột)
-            if len(row) != 10:
-                print(f"⚠ Cảnh báo: Hàng {idx} có {len(row)} cột (nên có 10 cột)")
-                error_count += 1
-    
-    print(f"- Số hàng trong file mới: {row_count}")
+
+    # Ghi file với encoding UTF-8 có BOM để Excel đọc được
+    stats = repair_csv(str(input_file), str(output_file), steps=['rejoin'],
+                       quoting=csv.QUOTE_ALL, bom='add', lineterminator='\n',
+                       report_file=str(fixes_file) if fixes_file else None,
+                       max_record_lines=max_record_lines)
+
+    print(f"\nHoàn thành trong {stats.elapsed:.1f}s!")
+    print(f"- Tổng số dòng gốc: {stats.lines}")
+    print(f"- Số hàng thêm dấu ngoặc kép ở đầu: {stats.leading_quotes}")
+    print(f"- Số hàng đóng dấu ngoặc kép bị bỏ ngỏ: {stats.closed_quotes}")
+    print(f"- Số hàng đã gộp dòng bị ngắt: {stats.rejoined}")
+    print(f"- Số dòng trống đã bỏ: {stats.blank}")
+    print(f"- Số hàng trong file mới: {stats.rows_written + 1}")
+
+    error_count = sum(count for width, count in stats.column_counts.items() if width != stats.expected)
     if error_count == 0:
         print("✓ File CSV đã được chuẩn hóa thành công!")
     else:
-        print(f"⚠ Có {error_count} hàng cần kiểm tra thêm")
+        print(f"⚠ Có {error_count} hàng không có đúng {stats.expected} cột, cần kiểm tra thêm:")
+        for width, count in sorted(stats.column_counts.items()):
+            if width != stats.expected:
+                print(f"  {count} hàng có {width} cột")
+    if fixes_file and stats.touched:
+        print(f"- Chi tiết từng hàng đã sửa: {fixes_file}")
+    return stats
 
 def main():
     # Xác định đường dẫn
     script_dir = Path(__file__).parent
     project_root = script_dir.parent.parent
-    
-    input_file = project_root / "data" / "Dataset Text Normalization 14k.csv"
-    output_file = project_root / "data" / "Dataset Text Normalization 14k_normalized.csv"
-    
+
+    parser = argparse.ArgumentParser(description="Chuẩn hóa file CSV (sửa dấu ngoặc kép, gộp dòng bị ngắt)")
+    parser.add_argument("--input", default=str(project_root / "data" / "Dataset Text Normalization 14k.csv"),
+                        help="File CSV đầu vào")
+    parser.add_argument("--output", default=str(project_root / "data" / "Dataset Text Normalization 14k_normalized.csv"),
+                        help="File CSV đầu ra")
+    parser.add_argument("--fixes", default=None, help="File JSONL ghi lại từng hàng đã sửa")
+    parser.add_argument("--max-record-lines", type=int, default=DEFAULT_MAX_RECORD_LINES,
+                        help=f"Số dòng tối đa của một hàng (mặc định: {DEFAULT_MAX_RECORD_LINES})")
+    args = parser.parse_args()
+
+    input_file = Path(args.input)
+    output_file = Path(args.output)
+
     # Kiểm tra file đầu vào có tồn tại không
     if not input_file.exists():
         print(f"❌ Lỗi: Không tìm thấy file {input_file}")
         sys.exit(1)
     
     # Chạy chuẩn hóa
-    normalize_csv(input_file, output_file)
+    normalize_csv(input_file, output_file, args.fixes, args.max_record_lines)
     
     print(f"\n📁 File đã lưu tại: {output_file}")
 
 if __name__ == "__main__":
     main()
-
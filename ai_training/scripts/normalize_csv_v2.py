@@ -12,58 +12,42 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# Bộ sửa CSV dùng chung nằm trong scripts/ của project
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts"))
+from csv_repair import repair_csv  # noqa: E402
+
 def normalize_csv_v2(input_file, output_file):
     """
     Chuẩn hóa file CSV - đảm bảo tất cả các trường đều được quoted
-    
+
+    Đọc và ghi một lần qua csv_repair.repair_csv (không sửa hàng, chỉ đổi
+    quoting sang QUOTE_ALL); số cột được đếm ngay trong lúc ghi.
+
     Args:
         input_file: Đường dẫn file CSV đầu vào
         output_file: Đường dẫn file CSV đầu ra
     """
     print(f"Đang đọc file: {input_file}")
-    
-    rows_read = 0
-    rows_written = 0
-    error_rows = []
-    
-    # Đọc file CSV với csv.reader
-    with open(input_file, 'r', encoding='utf-8', newline='') as infile:
-        # Sử dụng csv.reader để parse đúng cách
-        reader = csv.reader(infile)
-        
-        # Ghi ra file mới với tất cả các trường được quoted
-        with open(output_file, 'w', encoding='utf-8-sig', newline='') as outfile:
-            writer = csv.writer(outfile, quoting=csv.QUOTE_ALL)
-            
-            for row_num, row in enumerate(reader, 1):
-                rows_read += 1
-                
-                # Kiểm tra số cột
-                if len(row) != 10:
-                    error_rows.append((row_num, len(row)))
-                    if len(error_rows) <= 10:  # Chỉ in 10 hàng lỗi đầu tiên
-                        print(f"⚠ Hàng {row_num} có {len(row)} cột: {row[0][:100] if row else '(trống)'}...")
-                
-                # Ghi hàng ra file mới (csv.writer sẽ tự động thêm dấu ngoặc kép)
-                writer.writerow(row)
-                rows_written += 1
-                
-                # In progress mỗi 1000 hàng
-                if rows_read % 1000 == 0:
-                    print(f"Đã xử lý {rows_read} hàng...", end='\r')
-    
-    print(f"\n\nHoàn thành!")
-    print(f"- Số hàng đã đọc: {rows_read}")
-    print(f"- Số hàng đã ghi: {rows_written}")
-    print(f"- Số hàng có vấn đề: {len(error_rows)}")
-    
+
+    # Ghi ra file mới với tất cả các trường được quoted
+    stats = repair_csv(str(input_file), str(output_file), quoting=csv.QUOTE_ALL, bom='add', drop_blank=False)
+    error_rows = sum(count for width, count in stats.column_counts.items() if width != stats.expected)
+
+    print(f"\nHoàn thành!")
+    print(f"- Số hàng đã đọc: {stats.records + 1}")
+    print(f"- Số hàng đã ghi: {stats.rows_written + 1}")
+    print(f"- Số hàng có vấn đề: {error_rows}")
+
     if error_rows:
-        print(f"\n⚠ Có {len(error_rows)} hàng không có đúng 10 cột.")
+        print(f"\n⚠ Có {error_rows} hàng không có đúng {stats.expected} cột.")
+        for width, count in sorted(stats.column_counts.items()):
+            if width != stats.expected:
+                print(f"  {count} hàng có {width} cột")
         print("Các hàng này có thể cần xem xét thêm.")
     else:
-        print("\n✓ Tất cả các hàng đều có đúng 10 cột!")
-    
-    return len(error_rows) == 0
+        print(f"\n✓ Tất cả các hàng đều có đúng {stats.expected} cột!")
+
+    return error_rows == 0
 
 def main():
     # Xác định đường dẫn
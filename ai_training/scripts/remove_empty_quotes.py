@@ -12,42 +12,46 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# Bộ sửa CSV dùng chung nằm trong scripts/ của project
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "scripts"))
+from csv_repair import repair_csv  # noqa: E402
+
 def remove_empty_quotes(input_file, output_file=None):
     """
     Xóa dấu ngoặc kép ở các trường rỗng
-    
+
+    Ghi lại file với QUOTE_MINIMAL (chỉ quote khi cần thiết) trong một lần đọc
+    qua csv_repair.repair_csv: mỗi lần chỉ giữ một hàng trong bộ nhớ, kết quả
+    ghi ra file tạm cùng thư mục, fsync rồi đổi tên đè lên file đích. Nếu bị
+    dừng giữa chừng, file gốc vẫn nguyên vẹn.
+
     Args:
         input_file: Đường dẫn file CSV đầu vào
         output_file: Đường dẫn file CSV đầu ra (nếu None, sẽ ghi đè file gốc)
+
+    Returns:
+        Số byte tiết kiệm được so với file đầu vào
     """
     print(f"Đang đọc file: {input_file}")
-    
-    # Đọc file CSV
-    with open(input_file, 'r', encoding='utf-8-sig', newline='') as f:
-        reader = csv.reader(f)
-        rows = list(reader)
-    
-    total_rows = len(rows)
-    print(f"Tổng số rows: {total_rows}")
-    
+
     # Xác định file đầu ra
     if output_file is None:
         output_file = input_file
-        print(f"⚠ Sẽ ghi đè file gốc")
+        print(f"⚠ Sẽ ghi đè file gốc (thay thế nguyên tử)")
     else:
         print(f"File đầu ra: {output_file}")
-    
-    # Ghi lại file với QUOTE_MINIMAL (chỉ quote khi cần thiết)
+
     print(f"\nĐang xử lý và ghi file...")
-    with open(output_file, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
-        for row in rows:
-            # Thay thế empty strings để không bị quote
-            processed_row = [cell if cell else '' for cell in row]
-            writer.writerow(processed_row)
-    
+    stats = repair_csv(str(input_file), str(output_file), quoting=csv.QUOTE_MINIMAL, bom='add', drop_blank=False)
+
+    saved = stats.bytes_saved
+    percent = saved / stats.bytes_read * 100 if stats.bytes_read else 0.0
+    print(f"Tổng số rows: {stats.rows_written + 1}")
+    print(f"Kích thước: {stats.bytes_read:,} -> {stats.bytes_written:,} bytes "
+          f"(tiết kiệm {saved:,} bytes, {percent:.1f}%) trong {stats.elapsed:.1f}s")
     print(f"\n✓ Hoàn thành!")
     print(f"File đầu ra: {output_file}")
+    return saved
 
 def main():
     """Hàm chính"""
@@ -2,41 +2,269 @@
 # -*- coding: utf-8 -*-
 """Utility to verify column counts in the dataset CSV."""
 
+import argparse
 import csv
+import io
+import math
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 import sys
 
-def main():
-    path = Path('data') / 'Dataset Text Normalization 14k.csv'
-    if not path.exists():
-        print(f"File not found: {path}")
-        return
+DATA_FILE = Path('data') / 'Dataset Text Normalization 14k.csv'
+
+MIN_RANGE_BYTES = 1 << 20
+_BLOCK = 1 << 20
+_PREVIEW = 10
+
+
+def count_range(path: str, start: int, end: int) -> Tuple[int, int]:
+    """Number of quote and newline bytes in path[start:end]."""
+    quotes = newlines = 0
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(_BLOCK, remaining))
+            if not block:
+                break
+            quotes += block.count(b'"')
+            newlines += block.count(b'\n')
+            remaining -= len(block)
+    return quotes, newlines
+
+
+def next_record_start(f, position: int, parity: int) -> Tuple[int, int]:
+    """
+    First record boundary at or after position, given the quote parity of
+    everything before it: the byte after the first newline outside quotes.
+
+    Returns:
+        (offset, newlines skipped to reach it); the file size if none
+    """
+    f.seek(position)
+    newlines = 0
+    while True:
+        block = f.read(_BLOCK)
+        if not block:
+            return position, newlines
+        cursor = 0
+        while True:
+            newline = block.find(b'\n', cursor)
+            if newline < 0:
+                parity ^= block.count(b'"', cursor) & 1
+                position += len(block)
+                break
+            parity ^= block.count(b'"', cursor, newline) & 1
+            newlines += 1
+            cursor = newline + 1
+            if not parity:
+                return position + cursor, newlines
 
-    if sys.stdout.encoding != 'utf-8':
-        sys.stdout.reconfigure(encoding='utf-8')
 
-    counts = {}
-    inconsistent: List[Tuple[int, int, List[str]]] = []
+class _OffsetFeed:
+    """Physical lines of path[start:...] for csv.reader, remembering where each record starts."""
 
-    with path.open(encoding='utf-8', newline='') as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        expected = len(header)
-        for idx, row in enumerate(reader, start=2):
+    def __init__(self, f, start: int, end: int):
+        self.f = f
+        self.offset = start
+        self.end = end
+        self.lines = 0
+        self.at_boundary = True  # set by the consumer after each record
+        self.record_offset = start
+        self.record_line = 0
+
+    def __iter__(self) -> Iterator[str]:
+        self.f.seek(self.offset)
+        for raw in self.f:
+            if self.at_boundary:
+                # A record starting at or past end belongs to the next range
+                if self.offset >= self.end:
+                    return
+                self.at_boundary = False
+                self.record_offset = self.offset
+                self.record_line = self.lines
+            self.offset += len(raw)
+            self.lines += 1
+            yield raw.decode('utf-8')
+
+
+def validate_range(path: str, start: int, end: int, expected: int,
+                   bad_rows_path: str) -> Tuple[Counter, int, int]:
+    """
+    Count the columns of every record that starts in path[start:end]
+    (start must be a record boundary; the last record may run past end).
+
+    Bad rows are written to bad_rows_path as record index (from 0 within the
+    range), physical line (from 0 within the range), byte offset and column
+    count, so memory does not grow with the number of bad rows.
+
+    Returns:
+        (column count histogram, records, bad records)
+    """
+    counts = Counter()
+    records = bad = 0
+    with open(path, 'rb') as f, open(bad_rows_path, 'w', encoding='utf-8', newline='') as out:
+        writer = csv.writer(out, lineterminator='\n')
+        feed = _OffsetFeed(f, start, end)
+        for row in csv.reader(feed):
             cols = len(row)
-            counts[cols] = counts.get(cols, 0) + 1
+            counts[cols] += 1
             if cols != expected:
-                inconsistent.append((idx, cols, row))
+                writer.writerow([records, feed.record_line, feed.record_offset, cols])
+                bad += 1
+            records += 1
+            feed.at_boundary = True
+    return counts, records, bad
+
+
+def read_header(path: str) -> Tuple[List[str], int]:
+    """Header fields (BOM stripped) and the byte offset of the first data record."""
+    with open(path, 'rb') as f:
+        data_start, _ = next_record_start(f, 0, 0)
+        f.seek(0)
+        raw = f.read(data_start)
+    header = next(csv.reader(io.StringIO(raw.decode('utf-8-sig'), newline='')), [])
+    return header, data_start
+
+
+def read_row(path: str, offset: int) -> List[str]:
+    """Parse the single record starting at offset."""
+    with open(path, 'rb') as f:
+        feed = _OffsetFeed(f, offset, offset + 1)
+        return next(csv.reader(feed), [])
+
+
+def split_ranges(size: int, data_start: int, parts: int) -> List[int]:
+    """Nominal range starts: data_start plus evenly spaced offsets, at least MIN_RANGE_BYTES apart."""
+    span = size - data_start
+    parts = max(1, min(parts, math.ceil(span / MIN_RANGE_BYTES)))
+    step = math.ceil(span / parts) if span > 0 else 1
+    return [data_start + i * step for i in range(parts)]
+
+
+def validate_csv(path: str, bad_rows_file: str, workers: int = 1) -> Tuple[int, Counter, int, int]:
+    """
+    Histogram of column counts of path, validated in byte ranges across
+    workers processes.
+
+    The file is split into about 4 ranges per worker. A first parallel pass
+    counts quotes and newlines per range; from the quote parity before each
+    nominal start, the range is moved to the next newline outside quotes, so
+    every range starts on a record boundary (quotes are assumed to only
+    delimit fields, as in RFC 4180; a stray quote inside an unquoted field can
+    shift a boundary). Ranges are then parsed with csv.reader in parallel and
+    their histograms merged. Bad rows (column count != header) are written to
+    bad_rows_file as record (header = 1), line, byte offset and columns.
+
+    Returns:
+        (expected columns, histogram, records, bad records)
+    """
+    size = os.path.getsize(path)
+    header, data_start = read_header(path)
+    expected = len(header)
+
+    nominal = split_ranges(size, data_start, workers * 4 if workers > 1 else 1)
+    ends = nominal[1:] + [size]
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(nominal) > 1 else None
+    try:
+        mapper = pool.map if pool is not None else map
+        totals = list(mapper(count_range, [path] * len(nominal), nominal, ends))
+
+        # Resolve every nominal start to a record boundary and its line number
+        starts, lines = [], []
+        parity, newlines = 0, 0
+        header_lines = count_range(path, 0, data_start)[1]
+        with open(path, 'rb') as f:
+            for start, (quotes, range_newlines) in zip(nominal, totals):
+                if not starts:
+                    boundary, skipped = start, 0
+                else:
+                    boundary, skipped = next_record_start(f, start, parity)
+                    boundary = max(boundary, starts[-1])
+                starts.append(boundary)
+                lines.append(header_lines + newlines + skipped)
+                parity ^= quotes & 1
+                newlines += range_newlines
+        bounds = starts[1:] + [size]
+
+        with tempfile.TemporaryDirectory(prefix='check_csv_') as tmp:
+            parts = [os.path.join(tmp, f'part_{i}.csv') for i in range(len(starts))]
+            results = list(mapper(validate_range, [path] * len(starts), starts, bounds,
+                                  [expected] * len(starts), parts))
+
+            histogram = Counter()
+            records = bad = 0
+            merged_file = os.path.join(tmp, 'bad_rows.csv')
+            with open(merged_file, 'w', encoding='utf-8', newline='') as out:
+                writer = csv.writer(out, lineterminator='\n')
+                writer.writerow(['record', 'line', 'offset', 'columns'])
+                for part, first_line, (counts, part_records, part_bad) in zip(parts, lines, results):
+                    histogram.update(counts)
+                    with open(part, encoding='utf-8', newline='') as src:
+                        for local_record, local_line, offset, cols in csv.reader(src):
+                            # record/line numbers are 1-based, the header being record 1
+                            writer.writerow([records + int(local_record) + 2,
+                                             first_line + int(local_line) + 1, offset, cols])
+                    records += part_records
+                    bad += part_bad
+            if bad:
+                shutil.move(merged_file, bad_rows_file)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return expected, histogram, records, bad
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Verify that every CSV record has as many columns as the header")
+    parser.add_argument('path', nargs='?', default=str(DATA_FILE), help=f"CSV file (default: {DATA_FILE})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes for byte-range validation (default: 1)")
+    parser.add_argument('--bad-rows', default=None,
+                        help="CSV of bad rows: record, line, byte offset, columns; only written "
+                             "when there are bad rows (default: <input>_bad_rows.csv)")
+    return parser.parse_args()
+
+
+def main():
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout.reconfigure(encoding='utf-8')
+    args = parse_args()
+
+    path = Path(args.path)
+    if not path.exists():
+        print(f"File not found: {path}")
+        return
+    bad_rows_file = args.bad_rows or str(path.with_name(f"{path.stem}_bad_rows.csv"))
+
+    start = time.perf_counter()
+    expected, counts, records, bad = validate_csv(str(path), bad_rows_file, max(1, args.workers))
+    elapsed = time.perf_counter() - start
+    size_mb = path.stat().st_size / 1_048_576
 
     print(f"Header column count: {expected}")
     print("Column count frequencies:")
     for cols, freq in sorted(counts.items()):
         print(f"  {cols}: {freq}")
+    print(f"Validated {records} rows ({size_mb:.1f} MB) in {elapsed:.2f}s "
+          f"with {args.workers} worker(s), {size_mb / elapsed if elapsed > 0 else 0:.1f} MB/s")
+
+    print(f"\nRows with incorrect column count: {bad}")
+    if bad:
+        print(f"Bad row offsets written to {bad_rows_file}")
+        with open(bad_rows_file, encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            for _, entry in zip(range(_PREVIEW), reader):
+                row = read_row(str(path), int(entry['offset']))
+                print(f"Row {entry['record']} (line {entry['line']}) has {entry['columns']} columns -> {row}")
 
-    print(f"\nRows with incorrect column count: {len(inconsistent)}")
-    for idx, cols, row in inconsistent[:10]:
-        print(f"Row {idx} has {cols} columns -> {row}")
 
 if __name__ == '__main__':
     main()
@@ -1,116 +1,323 @@
+import argparse
+import csv
 import pandas as pd
 import numpy as np
 from collections import Counter
 import re
 import sys
+import time
 from collections import defaultdict
+from itertools import islice
 from pathlib import Path
 from typing import List, Dict
 
+from csv_stream import DEFAULT_CHUNK_SIZE
+from dataset_store import (CLEAN_DATA_FILE, DATASET_FILE, DEDUP_INDEX_FILE, DUPLICATES_EXACT_FILE,
+                           DUPLICATES_NEAR_FILE, load_dataset)
+from exact_duplicates import DEFAULT_MAX_ENTRIES, DedupIndex, DigestCounter, text_digest
+from near_duplicates import DEFAULT_NUM_PERM, DEFAULT_SHINGLE_SIZE, DEFAULT_THRESHOLD, find_near_duplicates
+
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
 def clean_text(text):
     # Clean text for comparison
     if pd.isna(text):
         return ""
     
     text = str(text).lower()
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
+    text = _PUNCTUATION.sub(' ', text)
+    text = _WHITESPACE.sub(' ', text)
     text = text.strip()
     
     return text
 
-def check_duplicates(csv_file):
+# clean_text cho cả cột: các câu được nối bằng _SEPARATOR thành từng khối và
+# lower / thay thế một lần trên cả khối (vòng lặp C của str.lower, re.sub và
+# str.replace), rồi split lại; không có bước Python nào chạy riêng cho từng câu.
+# Sau lower, [^\w\s] -> ' ' rồi \s+ -> ' ' tương đương một lần \W+ -> ' ', và
+# strip chỉ còn phải bỏ một ' ' ở đầu/cuối câu. '\x00' không phải chữ, không
+# có hoa/thường và không "case-ignorable", nên cả lower (Σ cuối từ -> ς) lẫn
+# \W của mỗi câu đều không bị câu bên cạnh ảnh hưởng
+_SEPARATOR = '\x00'
+_CLEAN_BLOCK = 512
+_NON_WORD = re.compile(r'[^\w\x00]+')
+
+def _clean_block(values):
+    joined = _SEPARATOR.join(values)
+    if joined.count(_SEPARATOR) != len(values) - 1:
+        # Câu có sẵn '\x00': dùng bản tham chiếu
+        return [clean_text(value) for value in values]
+    joined = _NON_WORD.sub(' ', joined.lower())
+    joined = joined.replace(' ' + _SEPARATOR, _SEPARATOR).replace(_SEPARATOR + ' ', _SEPARATOR)
+    return joined[joined.startswith(' '):len(joined) - joined.endswith(' ')].split(_SEPARATOR)
+
+def clean_text_series(series):
+    """
+    clean_text áp dụng cho cả một cột, kết quả giống hệt series.map(clean_text)
+
+    Mỗi câu khác nhau chỉ được làm sạch một lần, theo từng khối _CLEAN_BLOCK
+    câu (clean_text vẫn là bản tham chiếu).
+    """
+    codes, uniques = pd.factorize(series)
+    if pd.api.types.infer_dtype(uniques, skipna=False) == 'string':
+        values = uniques.tolist()
+    else:
+        values = [str(value) for value in uniques]
+    cleaned = []
+    for start in range(0, len(values), _CLEAN_BLOCK):
+        cleaned.extend(_clean_block(values[start:start + _CLEAN_BLOCK]))
+    # Mã -1 (giá trị thiếu) lấy phần tử cuối là chuỗi rỗng
+    lookup = np.array(cleaned + [""], dtype=object)
+    return pd.Series(lookup[codes], index=series.index, dtype=object)
+
+def check_duplicates(csv_file, chunk_size=DEFAULT_CHUNK_SIZE, top_n=10,
+                     max_entries=DEFAULT_MAX_ENTRIES, spill_dir=None,
+                     clean_file=CLEAN_DATA_FILE, frequency_file=DUPLICATES_EXACT_FILE):
     print("🔍 Đang đọc file CSV...")
-    
+
+    # Một lượt đọc duy nhất theo từng khối: mỗi câu chỉ được băm một lần
+    # (BLAKE2b 128 bit), bảng đếm vừa dùng để ghi dữ liệu sạch, vừa cho
+    # bảng tần suất và top N; bảng băm tự chuyển sang SQLite khi quá lớn
+    counter = DigestCounter(max_entries=max_entries, spill_dir=spill_dir)
     try:
-        df = pd.read_csv(csv_file, encoding='utf-8')
+        columns = list(pd.read_csv(csv_file, encoding='utf-8', nrows=0).columns)
         print(f"✅ Đọc thành công file CSV")
-        print(f"📊 Tổng số dòng: {len(df)}")
-        print(f"📊 Tổng số cột: {len(df.columns)}")
-        print(f"📊 Tên các cột: {list(df.columns)}")
-        
-        if 'data' not in df.columns:
+        print(f"📊 Tổng số cột: {len(columns)}")
+        print(f"📊 Tên các cột: {columns}")
+
+        if 'data' not in columns:
             print("❌ Không tìm thấy cột 'data' trong file CSV")
             return
-        
+
+        empty_count = 0
+        empty_string_count = 0
+        with open(clean_file, 'w', encoding='utf-8', newline='') as dst:
+            for chunk in pd.read_csv(csv_file, encoding='utf-8', chunksize=chunk_size):
+                texts = chunk['data'].tolist()
+                first = counter.add([text_digest(text) for text in texts], texts)
+                chunk[first].to_csv(dst, header=dst.tell() == 0, index=False)
+                empty_count += int(chunk['data'].isna().sum())
+                empty_string_count += int((chunk['data'] == '').sum())
+
+        total_rows = counter.rows
+        clean_count = counter.unique
+        removed_count = total_rows - clean_count
+        exact_duplicate_count = counter.duplicated_rows()
+        print(f"📊 Tổng số dòng: {total_rows}")
+        if counter.spilled:
+            print(f"💾 Bảng băm vượt {max_entries} mục, đã chuyển sang SQLite tạm trên đĩa")
+
         print(f"\n🔍 Phân tích dữ liệu trùng lặp...")
-        
+
         # Check exact duplicates
         print("\n1️⃣ KIỂM TRA TRÙNG LẶP HOÀN TOÀN:")
-        exact_duplicates = df.duplicated(subset=['data'], keep=False)
-        exact_duplicate_count = exact_duplicates.sum()
-        
         if exact_duplicate_count > 0:
             print(f"⚠️  Tìm thấy {exact_duplicate_count} dòng bị trùng lặp hoàn toàn")
-            
-            duplicate_rows = df[exact_duplicates]
-            duplicate_groups = duplicate_rows.groupby('data').size().sort_values(ascending=False)
-            
+
             print(f"📋 Chi tiết các nhóm trùng lặp:")
-            for i, (content, count) in enumerate(duplicate_groups.head(10).items(), 1):
+            for i, (content, count, _) in enumerate(islice(counter.duplicates(), top_n), 1):
                 print(f"   {i}. Xuất hiện {count} lần:")
                 print(f"      \"{content[:100]}{'...' if len(str(content)) > 100 else ''}\"")
                 print()
         else:
             print("✅ Không có dữ liệu trùng lặp hoàn toàn")
-        
+
         # Create clean data
         print("\n2️⃣ TẠO DỮ LIỆU SẠCH (LOẠI BỎ DUMP):")
-        
-        clean_df = df[~df.duplicated(subset=['data'], keep='first')].copy()
-        clean_count = len(clean_df)
-        removed_count = len(df) - clean_count
-        
         print(f"📊 Số dòng sau khi loại bỏ dump: {clean_count}")
         print(f"📊 Số dòng đã loại bỏ: {removed_count}")
-        print(f"📊 Tỷ lệ dữ liệu sạch: {(clean_count / len(df)) * 100:.2f}%")
-        
+        print(f"📊 Tỷ lệ dữ liệu sạch: {(clean_count / total_rows) * 100:.2f}%")
+
         # Statistics
         print("\n3️⃣ THỐNG KÊ TỔNG QUAN:")
-        print(f"📊 Tổng số dòng gốc: {len(df)}")
+        print(f"📊 Tổng số dòng gốc: {total_rows}")
         print(f"📊 Số dòng trùng lặp (dump): {exact_duplicate_count}")
         print(f"📊 Số dòng duy nhất (sạch): {clean_count}")
-        print(f"📊 Tỷ lệ dump: {(exact_duplicate_count / len(df)) * 100:.2f}%")
-        print(f"📊 Tỷ lệ dữ liệu sạch: {(clean_count / len(df)) * 100:.2f}%")
-        
+        print(f"📊 Tỷ lệ dump: {(exact_duplicate_count / total_rows) * 100:.2f}%")
+        print(f"📊 Tỷ lệ dữ liệu sạch: {(clean_count / total_rows) * 100:.2f}%")
+
         # Check empty data
         print("\n4️⃣ KIỂM TRA DỮ LIỆU TRỐNG:")
-        empty_count = df['data'].isna().sum()
-        empty_string_count = (df['data'] == '').sum()
         print(f"📊 Số dòng có giá trị null: {empty_count}")
         print(f"📊 Số dòng có chuỗi rỗng: {empty_string_count}")
-        
+
         # Save results
         print("\n5️⃣ LƯU KẾT QUẢ:")
-        
+
         if exact_duplicate_count > 0:
-            frequency_count = df['data'].value_counts()
-            frequency_df = pd.DataFrame({
-                'content': frequency_count.index,
-                'frequency': frequency_count.values
-            })
-            
-            duplicates_only = frequency_df[frequency_df['frequency'] > 1].copy()
-            duplicates_only = duplicates_only.sort_values('frequency', ascending=False)
-            
-            duplicates_only.to_csv('duplicates_exact.csv', index=False, encoding='utf-8')
-            print("✅ Đã lưu file 'duplicates_exact.csv' chứa dữ liệu dump (đã sắp xếp theo tần suất)")
-            
-            print(f"\n🏆 TOP 10 DỮ LIỆU DUMP NHIỀU NHẤT:")
-            for i, row in duplicates_only.head(10).iterrows():
-                content = str(row['content'])
+            top_rows = []
+            with open(frequency_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow(['content', 'frequency'])
+                for content, count, _ in counter.duplicates():
+                    writer.writerow([content, count])
+                    if len(top_rows) < top_n:
+                        top_rows.append((content, count))
+            print(f"✅ Đã lưu file '{frequency_file}' chứa dữ liệu dump (đã sắp xếp theo tần suất)")
+
+            print(f"\n🏆 TOP {top_n} DỮ LIỆU DUMP NHIỀU NHẤT:")
+            for i, (content, count) in enumerate(top_rows, 1):
+                content = str(content)
                 if len(content) > 80:
                     content = content[:80] + "..."
-                print(f"   {i+1:2d}. Xuất hiện {row['frequency']:3d} lần: \"{content}\"")
-        
-        clean_df.to_csv('clean_data.csv', index=False, encoding='utf-8')
-        print(f"✅ Đã lưu file 'clean_data.csv' chứa {len(clean_df)} dòng dữ liệu sạch (đã loại bỏ dump)")
-        
+                print(f"   {i:2d}. Xuất hiện {count:3d} lần: \"{content}\"")
+
+        print(f"✅ Đã lưu file '{clean_file}' chứa {clean_count} dòng dữ liệu sạch (đã loại bỏ dump)")
+
     except Exception as e:
         print(f"❌ Lỗi khi đọc file: {str(e)}")
+    finally:
+        counter.close()
+
+def check_near_duplicates(csv_file, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                          shingle_size=DEFAULT_SHINGLE_SIZE, output_file=DUPLICATES_NEAR_FILE):
+    print("🔍 Đang đọc file CSV...")
+    df = load_dataset(csv_file)
+    print(f"📊 Tổng số dòng: {len(df)}")
+
+    if 'data' not in df.columns:
+        print("❌ Không tìm thấy cột 'data' trong file CSV")
+        return None
+
+    print(f"\n🔍 KIỂM TRA GẦN TRÙNG LẶP (MinHash + LSH, Jaccard >= {threshold}):")
+    start = time.perf_counter()
+    texts = clean_text_series(df['data']).tolist()
+    result = find_near_duplicates(texts, threshold=threshold, num_perm=num_perm, shingle_size=shingle_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 LSH: {result.bands} band x {result.rows} hàng, {result.candidate_pairs} cặp ứng viên được so sánh")
+    print(f"📊 Số cụm gần trùng lặp: {result.clusters}")
+    print(f"📊 Số dòng thuộc các cụm: {result.duplicated_rows} ({result.duplicated_rows / max(len(df), 1) * 100:.2f}%)")
+    print(f"⏱️  Thời gian: {elapsed:.2f}s")
+
+    clusters = pd.DataFrame({
+        'cluster_id': result.cluster_ids,
+        'cluster_size': result.cluster_sizes,
+        'row': df.index,
+        'data': df['data'],
+    })
+    clusters = clusters[clusters['cluster_id'] >= 0].sort_values(
+        ['cluster_size', 'cluster_id', 'row'], ascending=[False, True, True])
+    clusters.to_csv(output_file, index=False, encoding='utf-8')
+    print(f"✅ Đã lưu file '{output_file}' (cluster_id, cluster_size, row, data)")
+
+    if len(clusters):
+        print(f"\n🏆 TOP 10 CỤM GẦN TRÙNG LẶP LỚN NHẤT:")
+        for i, (cluster_id, group) in enumerate(clusters.groupby('cluster_id', sort=False), 1):
+            if i > 10:
+                break
+            print(f"   {i:2d}. Cụm {cluster_id} ({len(group)} dòng):")
+            for content in group['data'].head(3):
+                content = str(content)
+                print(f"      \"{content[:80]}{'...' if len(content) > 80 else ''}\"")
+    return result
+
+def ingest_batch(batch_file, index_file, key='exact', output_file=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    print(f"🔍 Đang kiểm tra lô mới: {batch_file}")
+    print(f"🗂️  Chỉ mục chống trùng: {index_file} (khoá: {key})")
+    if output_file is None:
+        output_file = str(Path(batch_file).with_name(Path(batch_file).stem + '_new.csv'))
+
+    # Kiểm tra header trước khi mở file đầu ra và chỉ mục, để lô sai không để lại file rỗng
+    if 'data' not in pd.read_csv(batch_file, encoding='utf-8', nrows=0).columns:
+        print("❌ Không tìm thấy cột 'data' trong file CSV")
+        return None
+
+    start = time.perf_counter()
+    rows = accepted = known_count = batch_duplicates = empty_count = 0
+    with DedupIndex(index_file) as index:
+        history = len(index)
+        try:
+            with open(output_file, 'w', encoding='utf-8', newline='') as dst:
+                for chunk in pd.read_csv(batch_file, encoding='utf-8', chunksize=chunk_size):
+                    texts = chunk['data'].tolist()
+                    present = chunk['data'].notna().tolist()
+                    exact = [text_digest(text) if ok else None for text, ok in zip(texts, present)]
+                    clean = [text_digest(text) if ok else None
+                             for text, ok in zip(clean_text_series(chunk['data']), present)]
+                    keys = exact if key == 'exact' else clean
+
+                    # Chỉ tra những khoá của lô này trong chỉ mục, không đọc lại lịch sử
+                    known = index.known([k for k in keys if k is not None], key=key)
+                    seen = set()
+                    keep = []
+                    for k in keys:
+                        if k is None:
+                            empty_count += 1
+                            keep.append(False)
+                        elif k in known:
+                            known_count += 1
+                            keep.append(False)
+                        elif k in seen:
+                            batch_duplicates += 1
+                            keep.append(False)
+                        else:
+                            seen.add(k)
+                            keep.append(True)
+
+                    index.add([d for d, ok in zip(exact, keep) if ok],
+                              [d for d, ok in zip(clean, keep) if ok], source=Path(batch_file).name)
+                    chunk[keep].to_csv(dst, header=dst.tell() == 0, index=False)
+                    rows += len(chunk)
+                    accepted += sum(keep)
+        except Exception:
+            index.rollback()
+            raise
+
+        if dry_run:
+            index.rollback()
+        else:
+            index.commit()
+        total = len(index)
+
+    print(f"📊 Số dòng trong lô: {rows}")
+    print(f"📊 Đã có trong lịch sử ({history} câu): {known_count}")
+    print(f"📊 Trùng lặp trong chính lô: {batch_duplicates}")
+    print(f"📊 Dòng trống: {empty_count}")
+    print(f"✅ Số dòng mới được giữ lại: {accepted}")
+    print(f"⏱️  Thời gian: {time.perf_counter() - start:.2f}s")
+    print(f"✅ Đã lưu các dòng mới vào '{output_file}'")
+    if dry_run:
+        print("ℹ️  --dry-run: chỉ mục không được cập nhật")
+    else:
+        print(f"🗂️  Chỉ mục hiện có {total} câu")
+    return accepted
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Kiểm tra dữ liệu trùng lặp trong cột 'data'")
+    parser.add_argument('--near', action='store_true',
+                        help="Tìm các câu gần trùng lặp (MinHash + LSH trên clean_text) thay vì trùng hoàn toàn")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Ngưỡng Jaccard cho --near (mặc định: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--num-perm', type=int, default=DEFAULT_NUM_PERM,
+                        help=f"Số hàm băm MinHash (mặc định: {DEFAULT_NUM_PERM})")
+    parser.add_argument('--shingle-size', type=int, default=DEFAULT_SHINGLE_SIZE,
+                        help=f"Số từ mỗi shingle (mặc định: {DEFAULT_SHINGLE_SIZE})")
+    parser.add_argument('--ingest', metavar='BATCH_CSV', default=None,
+                        help="Lọc một lô dữ liệu mới theo chỉ mục chống trùng và ghi lại các câu được chấp nhận")
+    parser.add_argument('--index', default=DEDUP_INDEX_FILE,
+                        help=f"File SQLite chỉ mục chống trùng cho --ingest (mặc định: {DEDUP_INDEX_FILE})")
+    parser.add_argument('--key', choices=DedupIndex.KEYS, default='exact',
+                        help="So khớp theo văn bản gốc (exact) hoặc theo clean_text (clean)")
+    parser.add_argument('--dry-run', action='store_true', help="Với --ingest: chỉ kiểm tra, không ghi vào chỉ mục")
+    parser.add_argument('--output', default=None,
+                        help=f"File kết quả cho --near (mặc định: {DUPLICATES_NEAR_FILE}) "
+                             "hoặc --ingest (mặc định: <lô>_new.csv)")
+    parser.add_argument('--top', type=int, default=10, help="Số nhóm trùng lặp hiển thị (mặc định: 10)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Số dòng đọc mỗi khối (mặc định: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f"Số câu khác nhau tối đa giữ trong RAM trước khi chuyển bảng băm "
+                             f"sang SQLite trên đĩa (mặc định: {DEFAULT_MAX_ENTRIES})")
+    parser.add_argument('--spill-dir', default=None, help="Thư mục chứa file SQLite tạm (mặc định: thư mục tạm hệ thống)")
+    return parser.parse_args()
 
 def main():
-    DATA_FILE = Path("data") / "Dataset Text Normalization 14k.csv"
+    args = parse_args()
+    DATA_FILE = Path(DATASET_FILE)
     if not DATA_FILE.exists():
         if sys.stdout.encoding != 'utf-8':
             sys.stdout.reconfigure(encoding='utf-8')
@@ -124,7 +331,16 @@ def main():
     print("🔍 KIỂM TRA DỮ LIỆU TRÙNG LẶP TRONG FILE CSV")
     print("=" * 60)
     
-    check_duplicates(DATA_FILE)
+    if args.ingest:
+        ingest_batch(args.ingest, args.index, key=args.key, output_file=args.output,
+                     chunk_size=args.chunk_size, dry_run=args.dry_run)
+    elif args.near:
+        check_near_duplicates(DATA_FILE, threshold=args.threshold, num_perm=args.num_perm,
+                              shingle_size=args.shingle_size, output_file=args.output or DUPLICATES_NEAR_FILE)
+    else:
+        check_duplicates(DATA_FILE, chunk_size=args.chunk_size, top_n=args.top,
+                         max_entries=args.max_entries, spill_dir=args.spill_dir,
+                         clean_file=CLEAN_DATA_FILE, frequency_file=DUPLICATES_EXACT_FILE)
     
     print("\n" + "=" * 60)
     print("✅ HOÀN THÀNH KIỂM TRA")
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Find reviews shared between the CSV splits under trainning_data_split/."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from check_duplicates import clean_text_series
+from dataset_store import SPLIT_DIR, dataset_columns, load_dataset, read_raw_dataset, source_encoding
+from exact_duplicates import text_digest
+from near_duplicates import DEFAULT_THRESHOLD, find_near_duplicates
+
+
+SPLIT_ROOT = Path(SPLIT_DIR)
+
+LEAK_KINDS = ["exact", "normalized", "near"]
+# Kinds --fix drops by default; near duplicates only with --fix-near
+FIX_KINDS = ["exact", "normalized"]
+
+
+def natural_key(text: str) -> List[object]:
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", text)]
+
+
+def discover_splits(root: Path) -> List[Path]:
+    """
+    Every CSV under root that is a split, in priority order: test splits
+    first, then by path (phase_1 before phase_2, sub_phase_2 before sub_phase_10).
+
+    Files that aggregate all the others (Dataset.csv) are left out. When a
+    review leaks, the copy in the highest-priority split is the one kept.
+    """
+    files = [path for path in root.rglob("*.csv") if path.is_file()]
+    splits = [path for path in files if any(comparable(path, other) for other in files if other != path)]
+    return sorted(splits, key=lambda path: (0 if "test" in path.stem.lower() else 1,
+                                            natural_key(path.relative_to(root).as_posix())))
+
+
+def comparable(a: Path, b: Path) -> bool:
+    """
+    False when one file aggregates the other: a CSV whose directory is a strict
+    ancestor of the other's (Dataset.csv vs everything, sub_phase_1.csv vs its
+    test_split/) contains those rows by construction.
+    """
+    return not (a.parent in b.parent.parents or b.parent in a.parent.parents)
+
+
+def load_rows(files: List[Path]) -> pd.DataFrame:
+    """One row per review of every split: file index, row in that file, text, clean_text form and digests."""
+    frames = []
+    for file_id, path in enumerate(files):
+        if "data" not in dataset_columns(str(path)):
+            print(f"Skipping {path}: no 'data' column")
+            continue
+        df = load_dataset(str(path), columns=["data"])
+        texts = df["data"]
+        cleaned = clean_text_series(texts)
+        frames.append(pd.DataFrame({
+            "file": file_id,
+            "row": range(len(df)),
+            "data": texts,
+            "clean": cleaned,
+            "exact": [text_digest(text) for text in texts],
+            "normalized": [text_digest(text) for text in cleaned],
+        })[texts.notna().to_numpy()])
+    if not frames:
+        return pd.DataFrame(columns=["file", "row", "data", "clean", "exact", "normalized"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def find_leaks(rows: pd.DataFrame, files: List[Path], near: bool = True,
+               threshold: float = DEFAULT_THRESHOLD) -> Tuple[pd.DataFrame, Dict[Tuple[int, int], Dict[str, int]]]:
+    """
+    Group the rows of all splits by exact text, clean_text form and (optionally)
+    MinHash/LSH near-duplicate cluster, in one pass over the combined rows.
+
+    Returns:
+        leaked: one row per review that shares a group with a comparable split,
+            with the group kind/id and whether it should be dropped (a comparable
+            higher-priority split holds the same review)
+        pair_counts: {(file_a, file_b): {kind: shared groups}}
+    """
+    groups: Dict[str, pd.Series] = {
+        "exact": pd.Series(pd.factorize(rows["exact"])[0], index=rows.index),
+        "normalized": pd.Series(pd.factorize(rows["normalized"])[0], index=rows.index),
+    }
+    if near and len(rows):
+        result = find_near_duplicates(rows["clean"].tolist(), threshold=threshold)
+        groups["near"] = pd.Series(result.cluster_ids, index=rows.index)
+
+    pair_counts: Dict[Tuple[int, int], Dict[str, int]] = {}
+    leaked = []
+    for kind, group_ids in groups.items():
+        frame = rows.assign(group=group_ids)
+        frame = frame[frame["group"] >= 0]
+        spread = frame.groupby("group")["file"].nunique()
+        shared = frame[frame["group"].isin(spread.index[spread > 1])]
+
+        for group_id, members in shared.groupby("group", sort=False):
+            member_files = sorted(set(members["file"]))
+            pairs = [(a, b) for a, b in combinations(member_files, 2) if comparable(files[a], files[b])]
+            if not pairs:
+                continue
+            for pair in pairs:
+                pair_counts.setdefault(pair, dict.fromkeys(LEAK_KINDS, 0))[kind] += 1
+            # Files are numbered in priority order, so a lower id wins; rows of
+            # aggregate files that only overlap their own parts are not reported
+            involved = {file_id for pair in pairs for file_id in pair}
+            losers = {b for a, b in pairs}
+            members = members[members["file"].isin(involved)]
+            leaked.append(pd.DataFrame({"kind": kind, "group": group_id, "file": members["file"],
+                                        "row": members["row"], "drop": members["file"].isin(losers),
+                                        "data": members["data"]}))
+
+    columns = ["kind", "group", "file", "row", "drop", "data"]
+    if not leaked:
+        return pd.DataFrame(columns=columns), pair_counts
+    return pd.concat(leaked, ignore_index=True)[columns], pair_counts
+
+
+def print_report(files: List[Path], root: Path, pair_counts: Dict[Tuple[int, int], Dict[str, int]],
+                 kinds: List[str]) -> None:
+    if not pair_counts:
+        print("No leakage between comparable splits.")
+        return
+
+    print(f"\nShared reviews between splits ({' / '.join(kinds)}):")
+    for (a, b), counts in sorted(pair_counts.items(), key=lambda item: -sum(item[1].values())):
+        numbers = " / ".join(f"{counts[kind]:5d}" for kind in kinds)
+        print(f"  {files[a].relative_to(root)}  <->  {files[b].relative_to(root)}: {numbers}")
+
+
+def dropped_rows(leaked: pd.DataFrame, kinds: List[str]) -> pd.DataFrame:
+    """The leaked rows --fix removes: marked drop by a leak of one of kinds, one row per (file, row)."""
+    return leaked[leaked["drop"] & leaked["kind"].isin(kinds)].drop_duplicates(["file", "row"])
+
+
+def write_leakage_free(files: List[Path], root: Path, leaked: pd.DataFrame,
+                       kinds: List[str] = FIX_KINDS) -> Dict[Path, int]:
+    """
+    Rewrite every split that loses rows to a leak of one of kinds; each file is
+    replaced atomically and keeps its own header and BOM.
+
+    Returns:
+        {rewritten split: rows removed}
+    """
+    removed: Dict[Path, int] = {}
+    drops = dropped_rows(leaked, kinds).groupby("file")["row"].apply(set)
+    for file_id, rows in drops.items():
+        path = files[file_id]
+        df = read_raw_dataset(str(path))
+        kept = df[~df.index.isin(rows)]
+        tmp_path = path.with_name(path.name + ".tmp")
+        kept.to_csv(tmp_path, index=False, encoding=source_encoding(str(path)))
+        os.replace(tmp_path, path)
+        removed[path] = len(df) - len(kept)
+        print(f"  {path.relative_to(root)}: {len(df)} -> {len(kept)} rows")
+    return removed
+
+
+def stale_aggregates(root: Path, removed: Dict[Path, int]) -> Dict[Path, int]:
+    """
+    CSV files under root that contain rewritten splits by construction
+    (Dataset.csv, sub_phase_1.csv for its test_split/), with the number of rows
+    removed from those splits. --fix does not rewrite them, so they still hold
+    those rows.
+    """
+    stale = {}
+    for path in sorted(root.rglob("*.csv"), key=lambda path: natural_key(path.relative_to(root).as_posix())):
+        count = sum(n for split, n in removed.items() if path.parent in split.parent.parents)
+        if count:
+            stale[path] = count
+    return stale
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Detect reviews leaking between train/test splits and phases")
+    parser.add_argument("--root", default=str(SPLIT_ROOT), help=f"Directory scanned for CSV splits (default: {SPLIT_ROOT})")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Jaccard threshold for near duplicates (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--no-near", action="store_true", help="Only check exact and clean_text-normalized overlaps")
+    parser.add_argument("--report", default="leakage_report.csv", help="CSV listing every leaking row")
+    parser.add_argument("--fix", action="store_true",
+                        help="Rewrite the splits in place, keeping each review that leaks as exact or clean_text-"
+                             "normalized text only in its highest-priority split")
+    parser.add_argument("--fix-near", action="store_true",
+                        help="With --fix, also drop near-duplicate leaks")
+    args = parser.parse_args()
+    if args.fix_near and (args.no_near or not args.fix):
+        parser.error("--fix-near needs --fix and near-duplicate detection (no --no-near)")
+    return args
+
+
+def main() -> None:
+    if sys.stdout.encoding != "utf-8":
+        sys.stdout.reconfigure(encoding="utf-8")
+    args = parse_args()
+
+    root = Path(args.root).resolve()
+    if not root.exists():
+        raise FileNotFoundError(f"Split directory not found at {root}")
+
+    start = time.perf_counter()
+    files = discover_splits(root)
+    print(f"Scanning {len(files)} CSV files under {root}...")
+    rows = load_rows(files)
+    print(f"Total reviews: {len(rows)}")
+
+    kinds = LEAK_KINDS if not args.no_near else LEAK_KINDS[:2]
+    leaked, pair_counts = find_leaks(rows, files, near=not args.no_near, threshold=args.threshold)
+    print_report(files, root, pair_counts, kinds)
+
+    fix_kinds = LEAK_KINDS if args.fix_near else FIX_KINDS
+    dropped = dropped_rows(leaked, fix_kinds)
+    print(f"\nReviews to drop for leakage-free splits ({' / '.join(fix_kinds)}): {len(dropped)}")
+    if not args.fix_near and not args.no_near:
+        near_only = len(dropped_rows(leaked, LEAK_KINDS)) - len(dropped)
+        print(f"Near-duplicate leaks only (dropped with --fix-near): {near_only}")
+    print(f"Checked in {time.perf_counter() - start:.2f}s")
+
+    if len(leaked):
+        report = leaked.assign(file=leaked["file"].map(lambda file_id: files[file_id].relative_to(root).as_posix()))
+        report.to_csv(args.report, index=False, encoding="utf-8")
+        print(f"Leaking rows written to {args.report}")
+
+    if args.fix and len(dropped):
+        print("\nRewriting splits:")
+        removed = write_leakage_free(files, root, leaked, fix_kinds)
+        stale = stale_aggregates(root, removed)
+        if stale:
+            print("\n⚠ Not rewritten, so now out of sync with their splits:")
+            for path, count in stale.items():
+                print(f"  {path.relative_to(root)}: still holds the {count} rows removed from the splits it contains")
+
+
+if __name__ == "__main__":
+    main()
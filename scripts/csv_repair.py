@@ -0,0 +1,460 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Streaming CSV repair: re-join broken lines, fit rows to the schema, rewrite quoting/BOM."""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Deque, Iterator, List, Optional, TextIO
+
+from dataset_schema import DATASET_COLUMNS
+
+AVAILABLE_STEPS = ['rejoin', 'fit']
+QUOTING = {'minimal': csv.QUOTE_MINIMAL, 'all': csv.QUOTE_ALL}
+BOM_POLICIES = ['keep', 'add', 'strip']
+
+# Lines one record may span: quoted multi-line fields and re-joined breaks
+DEFAULT_MAX_RECORD_LINES = 100
+
+
+@dataclass
+class RepairStats:
+    lines: int = 0
+    records: int = 0
+    rows_written: int = 0
+    blank: int = 0
+    leading_quotes: int = 0
+    closed_quotes: int = 0
+    rejoined: int = 0
+    padded: int = 0
+    truncated: int = 0
+    expected: int = 0
+    header_replaced: bool = False
+    input_bom: bool = False
+    output_bom: bool = False
+    bytes_read: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    # Data rows by field count, after re-joining and before fitting
+    column_counts: Counter = field(default_factory=Counter)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_read - self.bytes_written
+
+    @property
+    def touched(self) -> int:
+        return (self.blank + self.leading_quotes + self.closed_quotes + self.rejoined
+                + self.padded + self.truncated)
+
+    def summary(self) -> str:
+        return (
+            f"{self.lines} lines -> {self.rows_written} rows in {self.elapsed:.1f}s; "
+            f"re-joined {self.rejoined}, leading quotes {self.leading_quotes}, "
+            f"closed quotes {self.closed_quotes}, "
+            f"padded {self.padded}, truncated {self.truncated}, blank {self.blank}"
+        )
+
+
+@dataclass
+class _Record:
+    fields: List[str]
+    line: int          # first physical line (1-based)
+    end_line: int      # last physical line
+    unquoted_start: bool
+    fixes: List[str] = field(default_factory=list)
+
+
+class _LineFeed:
+    """
+    Physical lines for csv.reader, with two fixes when fix_quotes is set, both
+    applied to the first line of a record:
+
+    - a stray quote (first '"' not at a field start, odd number of quotes)
+      means the opening quote is missing: a leading quote is added;
+    - a quote left open that does not close within max_record_lines lines
+      (bounded lookahead, the only lines buffered) is closed on the same line
+      by _close_quote, so it cannot swallow the rest of the file.
+    """
+
+    def __init__(self, lines: Iterator[str], fix_quotes: bool, max_record_lines: int):
+        self.lines = iter(lines)
+        self.fix_quotes = fix_quotes
+        self.max_record_lines = max_record_lines
+        self.expected = 0          # schema width, set once the header is known
+        self.ahead: Deque[str] = deque()
+        self.at_boundary = True    # set by the consumer after each record
+        self.starts_unquoted = False
+        self.fixed_quote = False
+        self.closed_quote = False
+
+    def _closes_ahead(self) -> bool:
+        """Whether a quote opened on the current line closes within the next max_record_lines - 1 lines."""
+        parity = 1
+        for i in range(self.max_record_lines - 1):
+            if i == len(self.ahead):
+                line = next(self.lines, None)
+                if line is None:
+                    return False
+                self.ahead.append(line)
+            parity ^= self.ahead[i].count('"') & 1
+            if not parity:
+                return True
+        return False
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            if self.ahead:
+                line = self.ahead.popleft()
+            else:
+                line = next(self.lines, None)
+                if line is None:
+                    return
+            if self.at_boundary:
+                self.at_boundary = False
+                self.fixed_quote = self.closed_quote = False
+                self.starts_unquoted = not line.startswith('"')
+                if self.fix_quotes and line.count('"') % 2:
+                    first = line.index('"')
+                    if first > 0 and line[first - 1] != ',':
+                        line = '"' + line
+                        self.fixed_quote = True
+                        self.starts_unquoted = False
+                    elif not self._closes_ahead():
+                        line = _close_quote(line, self.expected)
+                        self.closed_quote = True
+            yield line
+
+
+def _close_quote(line: str, expected: int) -> str:
+    """
+    Close the quoted field left open on line. The field is the first one
+    opened at a field start that the rest of the line does not close; the
+    closing quote goes before the comma that leaves the remaining fields to
+    complete expected columns (the trailing label columns hold no commas),
+    or at the end of the line when that does not work out.
+    """
+    body = line.rstrip('\r\n')
+    ending = line[len(body):]
+    parity = 0
+    start = -1
+    for position, char in enumerate(body):
+        if char != '"':
+            continue
+        if not parity and (position == 0 or body[position - 1] == ',') and body.count('"', position) % 2:
+            start = position
+            break
+        parity ^= 1
+    if start < 0:
+        return body + '"' + ending
+
+    fields_before = len(next(csv.reader([body[:start]]))) - 1 if start else 0
+    wanted = expected - 1 - fields_before
+    commas = [i for i in range(start + 1, len(body)) if body[i] == ',']
+    if 0 < wanted <= len(commas):
+        cut = commas[-wanted]
+    else:
+        cut = len(body)
+    return body[:cut] + '"' + body[cut:] + ending
+
+
+def _records(feed: _LineFeed, stats: RepairStats) -> Iterator[_Record]:
+    reader = csv.reader(feed)
+    end = 0
+    for fields in reader:
+        start, end = end + 1, reader.line_num
+        record = _Record(fields, start, end, feed.starts_unquoted)
+        if feed.fixed_quote:
+            record.fixes.append('leading_quote')
+            stats.leading_quotes += 1
+        if feed.closed_quote:
+            record.fixes.append('closed_quote')
+            stats.closed_quotes += 1
+        feed.at_boundary = True
+        yield record
+    stats.lines = end
+
+
+def _is_blank(fields: List[str]) -> bool:
+    return not fields or (len(fields) == 1 and not fields[0].strip())
+
+
+def _drop_blank(records: Iterator[_Record], stats: RepairStats,
+                report: Optional[TextIO]) -> Iterator[_Record]:
+    for record in records:
+        if _is_blank(record.fields):
+            stats.blank += 1
+            _write_report(report, record, None, ['blank'], len(record.fields))
+            continue
+        yield record
+
+
+def _merge(chain: List[_Record], stats: RepairStats) -> _Record:
+    """Join the broken field at each line break with a single space."""
+    merged = chain[0]
+    for record in chain[1:]:
+        head = merged.fields[-1].rstrip() + ' ' + record.fields[0]
+        merged.fields = merged.fields[:-1] + [head] + record.fields[1:]
+        merged.end_line = record.end_line
+        merged.fixes.extend(record.fixes)
+    merged.fixes.append('rejoined')
+    stats.rejoined += 1
+    return merged
+
+
+def _rejoin(records: Iterator[_Record], expected: int, max_record_lines: int,
+            stats: RepairStats) -> Iterator[_Record]:
+    """
+    Merge a short record with the records after it when together they have
+    exactly expected fields, every continuation starts without a quote (a
+    new record of a quoted export does) and the chain spans at most
+    max_record_lines lines. A chain that overshoots or runs out is given up:
+    its first record is written as is and the rest are tried again, so a
+    legitimately short row is never merged into a complete one. Only the
+    chain is held.
+    """
+    source = iter(records)
+    retry: Deque[_Record] = deque()
+    chain: List[_Record] = []
+    width = 0
+    while True:
+        record = retry.popleft() if retry else next(source, None)
+        if record is None:
+            if not chain:
+                return
+            yield chain[0]
+            retry.extend(chain[1:])
+            chain = []
+            continue
+        if chain:
+            joined = width + len(record.fields) - 1
+            if (record.unquoted_start and record.fields and joined <= expected
+                    and record.end_line - chain[0].line < max_record_lines):
+                chain.append(record)
+                width = joined
+                if width == expected:
+                    yield _merge(chain, stats)
+                    chain = []
+                continue
+            yield chain[0]
+            retry.extendleft(reversed(chain[1:] + [record]))
+            chain = []
+            continue
+        if 0 < len(record.fields) < expected:
+            chain = [record]
+            width = len(record.fields)
+        else:
+            yield record
+
+
+def repair_csv(
+    input_file: str,
+    output_file: Optional[str] = None,
+    steps: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+    quoting: int = csv.QUOTE_MINIMAL,
+    bom: str = 'keep',
+    lineterminator: str = '\r\n',
+    report_file: Optional[str] = None,
+    max_record_lines: int = DEFAULT_MAX_RECORD_LINES,
+    drop_blank: bool = True,
+) -> RepairStats:
+    """
+    Repair input_file in one streaming pass and write it to output_file
+    (default: in place).
+
+    Steps (applied in AVAILABLE_STEPS order, any subset):
+        rejoin: add a missing opening quote, close a quote still open after
+                max_record_lines lines, merge lines broken out of a record
+                (at most max_record_lines lines per record)
+        fit:    pad short rows with empty fields / truncate long ones to the
+                schema width; a header of the wrong width is replaced by columns
+    With drop_blank, blank lines (and records of one empty field) are dropped;
+    otherwise they are kept as rows like any other (so 'fit' pads them). The
+    schema is columns, or the header when columns is None. Every record is re-quoted with quoting; bom chooses
+    whether the output starts with a UTF-8 BOM ('keep' = as in the input).
+
+    The output goes to a temporary file next to output_file that is fsynced
+    and renamed over it, so the target is never left half-written. With
+    report_file, one JSON line is written per record that was changed or
+    dropped (physical lines, output row, fixes, field counts, truncated values).
+    """
+    steps = list(steps or [])
+    unknown = [step for step in steps if step not in AVAILABLE_STEPS]
+    if unknown:
+        raise ValueError(f"Unknown step(s) {unknown}; choose from {AVAILABLE_STEPS}")
+    if bom not in BOM_POLICIES:
+        raise ValueError(f"bom must be one of {BOM_POLICIES}, got {bom!r}")
+
+    output_file = output_file or input_file
+    stats = RepairStats(bytes_read=os.path.getsize(input_file))
+    start_time = time.perf_counter()
+
+    with open(input_file, 'rb') as probe:
+        stats.input_bom = probe.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8
+    stats.output_bom = bom == 'add' or (bom == 'keep' and stats.input_bom)
+
+    directory = os.path.dirname(os.path.abspath(output_file))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(output_file) + '.', suffix='.tmp', dir=directory)
+    report = open(report_file, 'w', encoding='utf-8') if report_file else None
+    try:
+        with open(input_file, encoding='utf-8-sig', newline='') as src, \
+                os.fdopen(fd, 'w', encoding='utf-8-sig' if stats.output_bom else 'utf-8', newline='') as dst:
+            writer = csv.writer(dst, quoting=quoting, lineterminator=lineterminator)
+            feed = _LineFeed(src, 'rejoin' in steps, max_record_lines)
+            records = _records(feed, stats)
+
+            if drop_blank:
+                records = _drop_blank(records, stats, report)
+            header = next(records, None)
+
+            if header is not None:
+                schema = list(columns) if columns is not None else header.fields
+                expected = stats.expected = feed.expected = len(schema)
+                header_fields = header.fields
+                if 'fit' in steps and len(header_fields) != expected:
+                    header_fields = schema
+                    stats.header_replaced = True
+                writer.writerow(header_fields)
+
+                if 'rejoin' in steps:
+                    records = _rejoin(records, expected, max_record_lines, stats)
+                for record in records:
+                    fields = record.fields
+                    stats.records += 1
+                    width = len(fields)
+                    stats.column_counts[width] += 1
+                    dropped = None
+                    if 'fit' in steps and width != expected:
+                        if width < expected:
+                            fields = fields + [''] * (expected - width)
+                            record.fixes.append('padded')
+                            stats.padded += 1
+                        else:
+                            dropped = fields[expected:]
+                            fields = fields[:expected]
+                            record.fixes.append('truncated')
+                            stats.truncated += 1
+
+                    writer.writerow(fields)
+                    stats.rows_written += 1
+                    if record.fixes:
+                        _write_report(report, record, stats.rows_written, record.fixes, width,
+                                      len(fields), dropped)
+            dst.flush()
+            os.fsync(dst.fileno())
+        _copy_mode(output_file, tmp_path)
+        os.replace(tmp_path, output_file)
+        _fsync_directory(directory)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if report is not None:
+            report.close()
+
+    stats.bytes_written = os.path.getsize(output_file)
+    stats.elapsed = time.perf_counter() - start_time
+    return stats
+
+
+def _copy_mode(target: str, tmp_path: str) -> None:
+    """Give the temporary file the permissions of the file it replaces (mkstemp creates it 0600)."""
+    if os.path.exists(target):
+        shutil.copymode(target, tmp_path)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+
+
+def _fsync_directory(directory: str) -> None:
+    """Persist the rename itself (POSIX; directories cannot be opened for fsync on Windows)."""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_report(report: Optional[TextIO], record: _Record, row: Optional[int], fixes: List[str],
+                  columns_in: int, columns_out: Optional[int] = None, dropped: Optional[List[str]] = None) -> None:
+    if report is None:
+        return
+    entry = {'line': record.line, 'end_line': record.end_line, 'row': row, 'fixes': fixes,
+             'columns_in': columns_in, 'columns_out': columns_out}
+    if dropped is not None:
+        entry['dropped'] = dropped
+    report.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def print_stats(stats: RepairStats) -> None:
+    print(f"Repaired: {stats.summary()}")
+    if stats.header_replaced:
+        print("Header did not match the schema width and was replaced.")
+    print(f"BOM: input {'yes' if stats.input_bom else 'no'}, output {'yes' if stats.output_bom else 'no'}")
+    print(f"Size: {stats.bytes_read:,} -> {stats.bytes_written:,} bytes ({stats.bytes_saved:+,} saved)")
+    print("Column count frequencies (before fitting):")
+    for width, count in sorted(stats.column_counts.items()):
+        marker = '' if width == stats.expected else '  <- mismatch'
+        print(f"  {width}: {count}{marker}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Repair a CSV export in one streaming pass")
+    parser.add_argument('input', help="CSV file to repair")
+    parser.add_argument('-o', '--output', help="Output path (default: rewrite the input in place)")
+    parser.add_argument('--steps', default=','.join(AVAILABLE_STEPS),
+                        help=f"Comma-separated repair steps from {AVAILABLE_STEPS} (default: all; '' for none)")
+    parser.add_argument('--schema', choices=['dataset', 'header'], default='dataset',
+                        help="Target columns: the dataset layout from dataset_schema.py or the file's own header")
+    parser.add_argument('--quoting', choices=list(QUOTING), default='minimal',
+                        help="Quote every field or only when needed (default: minimal)")
+    parser.add_argument('--bom', choices=BOM_POLICIES, default='keep',
+                        help="UTF-8 BOM on the output: as in the input, always, or never (default: keep)")
+    parser.add_argument('--lf', action='store_true', help="End rows with \\n instead of \\r\\n")
+    parser.add_argument('--report', help="JSONL file listing every row that was changed or dropped")
+    parser.add_argument('--keep-blank', action='store_true', help="Keep blank lines as rows instead of dropping them")
+    parser.add_argument('--max-record-lines', type=int, default=DEFAULT_MAX_RECORD_LINES,
+                        help=f"Lines one record may span before an open quote is closed "
+                             f"(default: {DEFAULT_MAX_RECORD_LINES})")
+    return parser.parse_args()
+
+
+def main() -> None:
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout.reconfigure(encoding='utf-8')
+    args = parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"File not found: {args.input}")
+        sys.exit(1)
+
+    steps = [step.strip() for step in args.steps.split(',') if step.strip()]
+    columns = DATASET_COLUMNS if args.schema == 'dataset' else None
+    stats = repair_csv(args.input, args.output, steps=steps, columns=columns,
+                       quoting=QUOTING[args.quoting], bom=args.bom,
+                       lineterminator='\n' if args.lf else '\r\n', report_file=args.report,
+                       max_record_lines=args.max_record_lines, drop_blank=not args.keep_blank)
+
+    print_stats(stats)
+    print(f"Saved to {args.output or args.input}")
+    if args.report:
+        print(f"Touched rows listed in {args.report}")
+
+
+if __name__ == '__main__':
+    main()
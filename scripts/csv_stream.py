@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Chunked CSV read -> transform -> append helper with bounded memory."""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+@dataclass
+class StreamStats:
+    rows: int = 0
+    chunks: int = 0
+    bytes_read: int = 0
+    total_bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_read / 1_048_576 / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def progress(self) -> float:
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.rows} rows, {self.chunks} chunks, {self.progress * 100:5.1f}% "
+            f"in {self.elapsed:.1f}s ({self.rows_per_second:,.0f} rows/s, {self.mb_per_second:.2f} MB/s)"
+        )
+
+
+def stream_csv(
+    input_file: str,
+    output_file: str,
+    transform: Callable[[pd.DataFrame], pd.DataFrame],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    report: Optional[Callable[[StreamStats], None]] = None,
+) -> StreamStats:
+    """
+    Read input_file in chunks of chunk_size rows, apply transform to each
+    chunk and append it to output_file.
+
+    Only one chunk is held in memory at a time. The output is written with the
+    same to_csv settings as the whole-file scripts (header once, no index,
+    minimal quoting, utf-8), so column order and quoting are unchanged.
+    Column dtypes are inferred per chunk, which only matters for numeric
+    columns that mix integers and missing values.
+    """
+    stats = StreamStats(total_bytes=os.path.getsize(input_file))
+    start = time.perf_counter()
+
+    with open(input_file, "rb") as src, open(output_file, "w", encoding="utf-8", newline="") as dst:
+        for chunk in pd.read_csv(src, chunksize=chunk_size):
+            chunk = transform(chunk)
+            chunk.to_csv(dst, header=stats.chunks == 0, index=False)
+
+            stats.rows += len(chunk)
+            stats.chunks += 1
+            stats.bytes_read = min(src.tell(), stats.total_bytes)
+            stats.elapsed = time.perf_counter() - start
+            if report is not None:
+                report(stats)
+
+    stats.bytes_read = stats.total_bytes
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Declared column layout of the review datasets."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Free-text review column(s); the only columns the normalizers rewrite
+TEXT_COLUMNS: List[str] = ['data']
+
+# Aspect label columns: "Positive" / "Negative" / "Neutral" or empty
+LABEL_COLUMNS: List[str] = [
+    'Pricing', 'Shipping', 'Performance', 'Battery',
+    'Packaging', 'Warranty', 'Design', 'Camera', 'Others'
+]
+
+# Full column order of the dataset CSV
+DATASET_COLUMNS: List[str] = TEXT_COLUMNS + LABEL_COLUMNS
+
+# Aspect values by int8 code; empty (no opinion on the aspect) is 0
+ASPECT_VALUES: List[str] = ['', 'Negative', 'Neutral', 'Positive']
+ASPECT_CODES: Dict[str, int] = {value: code for code, value in enumerate(ASPECT_VALUES)}
+# Code of a non-empty value outside ASPECT_VALUES
+INVALID_CODE = -1
+
+# Categorical dtype of a label column; empty cells stay NaN, as read_csv leaves them
+ASPECT_DTYPE = pd.CategoricalDtype(ASPECT_VALUES[1:])
+
+_CANONICAL_NAMES: Dict[str, str] = {column.lower(): column for column in DATASET_COLUMNS}
+
+
+def select_text_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Return the columns of df that hold review text.
+
+    Frames with the declared schema yield TEXT_COLUMNS only, so label columns
+    are passed through untouched whatever their dtype. Frames without any
+    declared text column (other CSV layouts) fall back to every object column.
+    """
+    declared = [column for column in TEXT_COLUMNS if column in df.columns]
+    if declared:
+        return declared
+    return [column for column in df.columns if df[column].dtype == 'object']
+
+
+def canonical_column(name: str) -> str:
+    """Declared spelling of a dataset column name (case and surrounding spaces ignored), else name."""
+    return _CANONICAL_NAMES.get(str(name).strip().lower(), name)
+
+
+def canonicalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rename columns of df to their declared spelling ('camera' -> 'Camera').
+
+    A column is left as is when its canonical name is already taken by
+    another column.
+    """
+    renames = {}
+    taken = set(df.columns)
+    for column in df.columns:
+        canonical = canonical_column(column)
+        if canonical != column and canonical not in taken:
+            renames[column] = canonical
+            taken.add(canonical)
+    return df.rename(columns=renames) if renames else df
+
+
+def categorize_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the label columns of df to categoricals (1 byte per cell
+    instead of an 8-byte object pointer or float).
+
+    Columns holding only aspect values get ASPECT_DTYPE; any other value is
+    kept as an extra category after the declared ones, so writing the frame
+    back produces the same cells.
+    """
+    for column in LABEL_COLUMNS:
+        if column not in df.columns or df[column].dtype == ASPECT_DTYPE:
+            continue
+        values = df[column]
+        extra = [value for value in pd.unique(values.dropna()) if value not in ASPECT_DTYPE.categories]
+        dtype = pd.CategoricalDtype(list(ASPECT_DTYPE.categories) + extra) if extra else ASPECT_DTYPE
+        df[column] = values.astype(dtype)
+    return df
+
+
+def encode_aspect(values: pd.Series) -> np.ndarray:
+    """
+    int8 codes of one label column: ASPECT_CODES of the stripped value,
+    0 for empty or NaN, INVALID_CODE for anything else.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype('category')
+    categories = values.cat.categories
+    # One lookup per distinct value; the trailing slot serves NaN (code -1)
+    lookup = np.array([ASPECT_CODES.get(value.strip(), INVALID_CODE) if isinstance(value, str) else INVALID_CODE
+                       for value in categories] + [ASPECT_CODES['']], dtype=np.int8)
+    return lookup[values.cat.codes.to_numpy()]
+
+
+def encode_labels(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    Label columns of df (LABEL_COLUMNS by default, in that order) as an
+    n_rows x n_columns int8 matrix of aspect codes (see encode_aspect).
+    """
+    columns = LABEL_COLUMNS if columns is None else list(columns)
+    codes = np.empty((len(df), len(columns)), dtype=np.int8)
+    for j, column in enumerate(columns):
+        codes[:, j] = encode_aspect(df[column])
+    return codes
+
+
+def decode_labels(codes: np.ndarray, columns: Optional[Sequence[str]] = None,
+                  index: Optional[pd.Index] = None) -> pd.DataFrame:
+    """Inverse of encode_labels: aspect strings ('' for empty) in a frame with the given columns."""
+    columns = LABEL_COLUMNS if columns is None else list(columns)
+    codes = np.asarray(codes)
+    if codes.size and (codes.min() < 0 or codes.max() >= len(ASPECT_VALUES)):
+        raise ValueError("codes outside ASPECT_VALUES cannot be decoded")
+    values = np.array(ASPECT_VALUES, dtype=object)[codes]
+    return pd.DataFrame(values, columns=columns, index=index)
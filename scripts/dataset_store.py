@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Dataset paths and a columnar cache that lets repeated runs skip CSV parsing."""
+
+from __future__ import annotations
+
+import codecs
+import hashlib
+import json
+import os
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+from dataset_schema import LABEL_COLUMNS, canonicalize_columns, categorize_labels
+from mapping_cache import source_digest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DATASET_FILE = os.path.join(DATA_DIR, "Dataset Text Normalization 14k.csv")
+NORMALIZED_FILE = os.path.join(DATA_DIR, "Dataset Text Normalization 14k_normalized.csv")
+ICON_NORMALIZED_FILE = os.path.join(DATA_DIR, "Dataset Text Normalization 14k_icon_normalized.csv")
+PIPELINE_NORMALIZED_FILE = os.path.join(DATA_DIR, "Dataset Text Normalization 14k_pipeline_normalized.csv")
+KEY_FILE = os.path.join(DATA_DIR, "KEY.csv")
+ICON_FILE = os.path.join(DATA_DIR, "Icon.csv")
+CLEAN_DATA_FILE = os.path.join(DATA_DIR, "clean_data.csv")
+DUPLICATES_EXACT_FILE = os.path.join(DATA_DIR, "duplicates_exact.csv")
+DUPLICATES_NEAR_FILE = os.path.join(DATA_DIR, "duplicates_near.csv")
+DEDUP_INDEX_FILE = os.path.join(DATA_DIR, "dedup_index.sqlite")
+SPLIT_DIR = os.path.join(BASE_DIR, "trainning_data_split")
+SPLIT_DATASET_FILE = os.path.join(SPLIT_DIR, "Dataset.csv")
+
+CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", os.path.join(BASE_DIR, ".dataset_cache"))
+
+# Bump when the cached layout or the read_csv options below change
+CACHE_VERSION = 2
+CACHE_FORMATS = ["feather", "parquet", "pickle"]
+_EXTENSIONS = {"feather": ".feather", "parquet": ".parquet", "pickle": ".pkl"}
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+
+def default_format() -> str:
+    """Feather (memory-mapped, column projection) when pyarrow is installed, pickle otherwise."""
+    return "feather" if HAVE_PYARROW else "pickle"
+
+
+def cache_paths(source: str, fmt: str) -> tuple:
+    """(data file, metadata file) for source in CACHE_DIR, keyed by its absolute path."""
+    source = os.path.abspath(source)
+    stem = f"{os.path.basename(source)}.{hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]}"
+    base = os.path.join(CACHE_DIR, stem)
+    return base + _EXTENSIONS[fmt], base + ".json"
+
+
+def _read_meta(meta_file: str) -> Optional[dict]:
+    try:
+        with open(meta_file, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, payload: dict) -> None:
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_file, path)
+
+
+def _fresh_meta(source: str, fmt: str) -> Optional[dict]:
+    """
+    Metadata of a valid cache for source, or None.
+
+    A cache is valid when its version, format and pandas version match and
+    the source has the recorded size and mtime; when only the mtime differs
+    (file touched or copied), the content digest decides and the new mtime
+    is recorded.
+    """
+    data_file, meta_file = cache_paths(source, fmt)
+    meta = _read_meta(meta_file)
+    if (meta is None or meta.get("version") != CACHE_VERSION or meta.get("format") != fmt
+            or meta.get("pandas") != pd.__version__ or not os.path.exists(data_file)):
+        return None
+    stat = os.stat(source)
+    if meta.get("size") != stat.st_size:
+        return None
+    if meta.get("mtime_ns") != stat.st_mtime_ns:
+        if meta.get("digest") != source_digest(source):
+            return None
+        meta["mtime_ns"] = stat.st_mtime_ns
+        try:
+            _write_json(meta_file, meta)
+        except OSError:
+            pass
+    return meta
+
+
+def _read_cache(data_file: str, fmt: str, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    cols = list(columns) if columns is not None else None
+    if fmt == "feather":
+        from pyarrow import feather
+        return feather.read_table(data_file, columns=cols, memory_map=True).to_pandas()
+    if fmt == "parquet":
+        return pd.read_parquet(data_file, columns=cols, memory_map=True)
+    df = pd.read_pickle(data_file)
+    return df[cols] if cols is not None else df
+
+
+def _write_cache(df: pd.DataFrame, source: str, fmt: str) -> None:
+    data_file, meta_file = cache_paths(source, fmt)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    stat = os.stat(source)
+    tmp_file = data_file + ".tmp"
+    if fmt == "feather":
+        df.to_feather(tmp_file)
+    elif fmt == "parquet":
+        df.to_parquet(tmp_file, index=False)
+    else:
+        df.to_pickle(tmp_file, protocol=5)
+    os.replace(tmp_file, data_file)
+    _write_json(meta_file, {
+        "version": CACHE_VERSION, "format": fmt, "pandas": pd.__version__, "source": os.path.abspath(source),
+        "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": source_digest(source),
+        "columns": list(df.columns), "rows": len(df),
+    })
+
+
+def source_encoding(path: str) -> str:
+    """'utf-8-sig' when path starts with a UTF-8 BOM, else 'utf-8': the encoding to write it back with."""
+    with open(path, "rb") as f:
+        return "utf-8-sig" if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else "utf-8"
+
+
+def read_raw_dataset(path: str) -> pd.DataFrame:
+    """
+    pd.read_csv(path) with the file's own header and dtypes, BOM removed and
+    no cache: for scripts that rewrite the file (or slices of it), which
+    should write with source_encoding(path). load_dataset canonicalizes
+    column names and categorizes labels, so it is for read-only use.
+    """
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def load_dataset(path: str = DATASET_FILE, columns: Optional[Sequence[str]] = None,
+                 fmt: Optional[str] = None, refresh: bool = False) -> pd.DataFrame:
+    """
+    pd.read_csv(path, encoding="utf-8") in the declared schema, served from
+    the columnar cache when the CSV has not changed since the last load.
+
+    Column names are canonicalized ('camera' -> 'Camera') and the label
+    columns are categoricals (dataset_schema.categorize_labels); cells and
+    NaNs are those of read_csv, so to_csv writes them back unchanged.
+
+    Args:
+        path: Source CSV
+        columns: Only load these columns (all by default); with feather or
+            parquet the other columns are never read
+        fmt: Cache format from CACHE_FORMATS (default: default_format());
+            feather and parquet need pyarrow
+        refresh: Re-parse the CSV and rewrite the cache
+
+    The first load parses the CSV and writes the cache under CACHE_DIR; a
+    cache that cannot be written (read-only checkout, missing pyarrow) only
+    costs the CSV parse.
+    """
+    fmt = fmt or default_format()
+    if fmt not in CACHE_FORMATS:
+        raise ValueError(f"fmt must be one of {CACHE_FORMATS}, got {fmt!r}")
+    if fmt != "pickle" and not HAVE_PYARROW:
+        raise ImportError(f"the {fmt} dataset cache needs pyarrow (pip install pyarrow)")
+
+    if not refresh:
+        meta = _fresh_meta(path, fmt)
+        if meta is not None:
+            missing = [column for column in columns or [] if column not in meta["columns"]]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in {path}")
+            try:
+                return _read_cache(cache_paths(path, fmt)[0], fmt, columns)
+            except (OSError, ValueError, EOFError):
+                pass
+
+    df = categorize_labels(canonicalize_columns(pd.read_csv(path, encoding="utf-8")))
+    try:
+        _write_cache(df, path, fmt)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Could not write dataset cache for {path}: {e}")
+    if columns is not None:
+        missing = [column for column in columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in {path}")
+        return df[list(columns)]
+    return df
+
+
+def dataset_columns(path: str, fmt: Optional[str] = None) -> List[str]:
+    """Canonical column names of path, from the cache metadata when it is fresh, else from the CSV header."""
+    meta = _fresh_meta(path, fmt or default_format())
+    if meta is not None:
+        return list(meta["columns"])
+    return list(canonicalize_columns(pd.read_csv(path, encoding="utf-8", nrows=0)).columns)
+
+
+def load_annotations(path: str) -> pd.DataFrame:
+    """
+    Label Studio annotations as exported by ai_training/scripts/json_to_csv.py.
+
+    CSV exports are read with every cell as a string; Parquet exports (json_to_csv
+    --parquet, needs pyarrow) keep their typed columns and label categoricals.
+    Column names are canonicalized and empty labels are '' in both cases.
+    """
+    if str(path).lower().endswith(".parquet"):
+        df = canonicalize_columns(pd.read_parquet(path))
+        for column in LABEL_COLUMNS:
+            if column not in df.columns or not df[column].isna().any():
+                continue
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype) and "" not in values.cat.categories:
+                values = values.cat.add_categories("")
+            df[column] = values.fillna("")
+        return df
+    return canonicalize_columns(pd.read_csv(path, encoding="utf-8-sig", dtype=str, keep_default_na=False))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Exact-duplicate counting and a persistent dedup index, keyed by 128-bit text digests."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+DIGEST_SIZE = 16
+DEFAULT_MAX_ENTRIES = 2_000_000
+
+# Digest used for missing cells; NaN rows are duplicates of each other but are
+# left out of the frequency table, as pandas value_counts() does
+NA_DIGEST = b"\0" * DIGEST_SIZE
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 900
+
+
+def text_digest(text: object) -> bytes:
+    if pd.isna(text):
+        return NA_DIGEST
+    return hashlib.blake2b(str(text).encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+class DigestCounter:
+    """
+    Occurrence counts of texts, keyed by digest, fed one chunk at a time.
+
+    Each entry keeps the count, the row of the first occurrence and, once the
+    text is seen a second time, the text itself (only duplicated texts are
+    kept, for the frequency report). Up to max_entries distinct digests are
+    held in a dict; beyond that the table moves to a temporary SQLite file in
+    spill_dir and later chunks are looked up and counted there in batches.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, spill_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.entries: Dict[bytes, list] = {}
+        self.texts: Dict[bytes, str] = {}
+        self.db: Optional[sqlite3.Connection] = None
+        self.db_path: Optional[str] = None
+        self.rows = 0
+        self.unique = 0
+
+    @property
+    def spilled(self) -> bool:
+        return self.db is not None
+
+    def add(self, digests: Sequence[bytes], texts: Sequence[object]) -> List[bool]:
+        """
+        Count one chunk of rows.
+
+        Returns:
+            For each row, True if it is the first occurrence of its text
+        """
+        if self.db is not None:
+            first = self._add_spilled(digests, texts)
+        else:
+            first = self._add_memory(digests, texts)
+            if len(self.entries) > self.max_entries:
+                self._spill()
+        self.rows += len(digests)
+        self.unique += sum(first)
+        return first
+
+    def _add_memory(self, digests: Sequence[bytes], texts: Sequence[object]) -> List[bool]:
+        entries = self.entries
+        first = []
+        row = self.rows
+        for digest, text in zip(digests, texts):
+            entry = entries.get(digest)
+            if entry is None:
+                entries[digest] = [1, row]
+                first.append(True)
+            else:
+                if entry[0] == 1 and digest != NA_DIGEST:
+                    self.texts[digest] = str(text)
+                entry[0] += 1
+                first.append(False)
+            row += 1
+        return first
+
+    def _spill(self) -> None:
+        fd, self.db_path = tempfile.mkstemp(prefix="duplicates_", suffix=".sqlite", dir=self.spill_dir)
+        os.close(fd)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.execute("CREATE TABLE digests (digest BLOB PRIMARY KEY, count INTEGER, first_row INTEGER, text TEXT)"
+                        " WITHOUT ROWID")
+        self.db.executemany("INSERT INTO digests VALUES (?, ?, ?, ?)",
+                            ((digest, count, first_row, self.texts.get(digest))
+                             for digest, (count, first_row) in self.entries.items()))
+        self.db.commit()
+        self.entries.clear()
+        self.texts.clear()
+
+    def _add_spilled(self, digests: Sequence[bytes], texts: Sequence[object]) -> List[bool]:
+        # Aggregate the chunk first so every distinct digest costs one lookup
+        # and one upsert
+        chunk: Dict[bytes, list] = {}
+        first = []
+        row = self.rows
+        for digest, text in zip(digests, texts):
+            entry = chunk.get(digest)
+            if entry is None:
+                chunk[digest] = [1, row, None if digest == NA_DIGEST else str(text)]
+                first.append(True)
+            else:
+                entry[0] += 1
+                first.append(False)
+            row += 1
+
+        keys = list(chunk)
+        existing = set()
+        for start in range(0, len(keys), _SQL_BATCH):
+            batch = keys[start:start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            existing.update(digest for (digest,) in self.db.execute(
+                f"SELECT digest FROM digests WHERE digest IN ({placeholders})", batch))
+
+        if existing:
+            first = [is_first and digest not in existing for is_first, digest in zip(first, digests)]
+        self.db.executemany(
+            "INSERT INTO digests VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(digest) DO UPDATE SET count = count + excluded.count, text = COALESCE(text, excluded.text)",
+            ((digest, count, first_row, text) for digest, (count, first_row, text) in chunk.items()))
+        self.db.commit()
+        return first
+
+    def duplicates(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        Yield (text, count, first_row) for every non-missing text seen more
+        than once, most frequent first, ties in order of first occurrence.
+        """
+        if self.db is not None:
+            yield from self.db.execute(
+                "SELECT text, count, first_row FROM digests WHERE count > 1 AND digest != ? "
+                "ORDER BY count DESC, first_row", (NA_DIGEST,))
+            return
+        ranked = sorted(((count, first_row, digest) for digest, (count, first_row) in self.entries.items()
+                         if count > 1 and digest != NA_DIGEST),
+                        key=lambda item: (-item[0], item[1]))
+        for count, first_row, digest in ranked:
+            yield self.texts[digest], count, first_row
+
+    def duplicated_rows(self) -> int:
+        """Rows whose text occurs more than once (pandas duplicated(keep=False))."""
+        if self.db is not None:
+            return self.db.execute("SELECT COALESCE(SUM(count), 0) FROM digests WHERE count > 1").fetchone()[0]
+        return sum(count for count, _ in self.entries.values() if count > 1)
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+            os.remove(self.db_path)
+
+
+class DedupIndex:
+    """
+    Persistent SQLite index of every review text already accepted.
+
+    Each accepted text is stored as two digests: the exact text and its
+    clean_text form, so a new batch can be checked with either key. Lookups
+    go through the primary key / secondary index in batches, so checking a
+    batch costs time proportional to the batch, not to the history.
+    """
+
+    KEYS = ("exact", "clean")
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self.db.execute("CREATE TABLE IF NOT EXISTS texts (exact BLOB PRIMARY KEY, clean BLOB NOT NULL, "
+                            "source TEXT, added_at TEXT) WITHOUT ROWID")
+            self.db.execute("CREATE INDEX IF NOT EXISTS texts_clean ON texts (clean)")
+            self.db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self.db.commit()
+        elif version != self.SCHEMA_VERSION:
+            raise ValueError(f"{path}: unsupported dedup index version {version}")
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+
+    def __enter__(self) -> "DedupIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def known(self, digests: Sequence[bytes], key: str = "exact") -> set:
+        """Subset of digests already recorded under key ("exact" or "clean")."""
+        if key not in self.KEYS:
+            raise ValueError(f"key must be one of {self.KEYS}, got {key!r}")
+        unique = list(set(digests))
+        found = set()
+        for start in range(0, len(unique), _SQL_BATCH):
+            batch = unique[start:start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.update(digest for (digest,) in self.db.execute(
+                f"SELECT {key} FROM texts WHERE {key} IN ({placeholders})", batch))
+        return found
+
+    def add(self, exact_digests: Sequence[bytes], clean_digests: Sequence[bytes], source: str) -> None:
+        """Record accepted texts; already known exact digests are ignored. Call commit() afterwards."""
+        added_at = datetime.now().isoformat(timespec="seconds")
+        self.db.executemany("INSERT OR IGNORE INTO texts VALUES (?, ?, ?, ?)",
+                            ((exact, clean, source, added_at)
+                             for exact, clean in zip(exact_digests, clean_digests)))
+
+    def commit(self) -> None:
+        self.db.commit()
+
+    def rollback(self) -> None:
+        self.db.rollback()
+
+    def close(self) -> None:
+        self.db.close()
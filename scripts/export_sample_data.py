@@ -9,6 +9,8 @@ import pandas as pd
 import os
 import sys
 
+from row_index import IndexedCSV
+
 # Set UTF-8 encoding for console output
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -24,15 +26,14 @@ def export_sample_data(input_file: str, output_file: str, num_rows: int = 20):
     """
     print(f"Đang đọc dữ liệu từ: {input_file}")
     
-    # Read the CSV file
-    df = pd.read_csv(input_file)
-    
-    print(f"Tổng số dòng trong dataset: {len(df)}")
-    print(f"Số cột: {len(df.columns)}")
-    print(f"Tên các cột: {list(df.columns)}")
-    
-    # Get first num_rows rows (including header)
-    df_sample = df.head(num_rows)
+    # Only the sampled rows are parsed; the row index gives their byte range
+    with IndexedCSV(input_file) as reader:
+        print(f"Tổng số dòng trong dataset: {len(reader)}")
+        print(f"Số cột: {len(reader.columns)}")
+        print(f"Tên các cột: {reader.columns}")
+
+        # Get first num_rows rows (including header)
+        df_sample = reader.frame(0, num_rows)
     
     print(f"\nĐang xuất {num_rows} dòng đầu tiên...")
     
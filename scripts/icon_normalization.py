@@ -4,69 +4,229 @@
 
 from __future__ import annotations
 
+import argparse
 import os
+import re
 import sys
-from typing import Dict
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, List, Match, Optional, Pattern, Tuple, Union
 
 import pandas as pd
 
+from csv_stream import DEFAULT_CHUNK_SIZE, StreamStats, stream_csv
+from dataset_schema import select_text_columns
+from dataset_store import DATASET_FILE, ICON_FILE, ICON_NORMALIZED_FILE, load_dataset
+from mapping_cache import load_or_build, read_mapping_csv
+from memo import describe_cache, lru_memoize, map_unique
+from rule_profile import RuleProfile
+
 
 def ensure_utf8_stdout() -> None:
     if sys.stdout.encoding != "utf-8":
         sys.stdout.reconfigure(encoding="utf-8")
 
 
-def load_icon_mapping(icon_file: str) -> Dict[str, str]:
+class IconMatcher:
+    """
+    Bảng Icon.csv được biên dịch thành một regex dạng trie trên byte UTF-8.
+
+    Mỗi chuỗi chỉ được quét một lần, tại mỗi vị trí lấy biểu tượng dài nhất
+    (longest-leftmost), nên kết quả không phụ thuộc thứ tự dòng trong Icon.csv:
+    "=)))" được thay cả cụm thay vì "=))" rồi còn sót ")". Quét trên byte vì
+    byte đầu của mọi biểu tượng chỉ thuộc một tập nhỏ, regex bỏ qua rất nhanh;
+    với str, emoji ngoài BMP buộc regex so từng ký tự với cả danh sách.
+    """
+
+    def __init__(self, mapping: Dict[str, str]) -> None:
+        self.mapping = {icon: replacement for icon, replacement in mapping.items() if icon}
+        self.replacements = {icon.encode("utf-8"): replacement.encode("utf-8")
+                             for icon, replacement in self.mapping.items()}
+        self.pattern = self._compile(self._trie_source(list(self.replacements)))
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.skipped = 0
+        self.scanned = 0
+
+    @staticmethod
+    def _trie_source(icons: List[bytes]) -> Optional[bytes]:
+        if not icons:
+            return None
+
+        trie: Dict = {}
+        for icon in icons:
+            node = trie
+            for byte in icon:
+                node = node.setdefault(byte, {})
+            node[None] = True
+
+        def _node_source(node: Dict) -> bytes:
+            branches = [re.escape(bytes([byte])) + _node_source(child)
+                        for byte, child in sorted((k, v) for k, v in node.items() if k is not None)]
+            if not branches:
+                return b""
+            body = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+            # Nút kết thúc một biểu tượng: phần nối dài là tuỳ chọn, greedy nên
+            # luôn thử biểu tượng dài hơn trước
+            return b"(?:" + body + b")?" if None in node else body
+
+        return _node_source(trie)
+
+    @staticmethod
+    def _compile(source: Optional[bytes]) -> Optional[Pattern[bytes]]:
+        return re.compile(source) if source else None
+
+    def cache_state(self) -> dict:
+        return {"mapping": list(self.mapping.items()),
+                "pattern": self.pattern.pattern if self.pattern is not None else None}
+
+    @classmethod
+    def from_cache_state(cls, state: dict) -> "IconMatcher":
+        matcher = cls.__new__(cls)
+        matcher.mapping = dict(state["mapping"])
+        matcher.replacements = {icon.encode("utf-8"): replacement.encode("utf-8")
+                                for icon, replacement in matcher.mapping.items()}
+        matcher.pattern = cls._compile(state["pattern"])
+        matcher._reset_counters()
+        return matcher
+
+    def _replace(self, match: Match[bytes]) -> bytes:
+        return self.replacements[match.group(0)]
+
+    def normalize(self, text: str) -> str:
+        if self.pattern is None:
+            self.skipped += 1
+            return text
+        # Bộ lọc sơ bộ: regex trie trên byte tự loại ô không chứa biểu tượng nào
+        # nhanh hơn mọi phép kiểm tra riêng trên str (emoji ngoài BMP), nên chỉ
+        # cần search một lần; ô không khớp được trả lại nguyên vẹn, không phải
+        # thay thế và giải mã lại, ô có khớp được thay từ vị trí khớp đầu tiên
+        encoded = text.encode("utf-8")
+        match = self.pattern.search(encoded)
+        if match is None:
+            self.skipped += 1
+            return text
+        self.scanned += 1
+        start = match.start()
+        return (encoded[:start] + self.pattern.sub(self._replace, encoded[start:])).decode("utf-8")
+
+    def prefilter_summary(self) -> str:
+        total = self.skipped + self.scanned
+        share = self.skipped / total * 100 if total else 0.0
+        return f"bỏ qua {self.skipped}/{total} chuỗi ({share:.1f}%)"
+
+
+@lru_cache(maxsize=8)
+def _compile_cached(items: Tuple[Tuple[str, str], ...]) -> IconMatcher:
+    return IconMatcher(dict(items))
+
+
+def compile_icon_mapping(mapping: Union[Dict[str, str], IconMatcher]) -> IconMatcher:
+    if isinstance(mapping, IconMatcher):
+        return mapping
+    return _compile_cached(tuple(mapping.items()))
+
+
+def load_icon_matcher(icon_file: str) -> IconMatcher:
     print(f"Đang đọc bảng Icon từ: {icon_file}")
-    df = pd.read_csv(icon_file, encoding="utf-8")
+    # Bảng đã biên dịch được cache cạnh Icon.csv, tự tạo lại khi file thay đổi.
+    # Ưu tiên mapper cuối cùng nếu có trùng
+    state = load_or_build(icon_file, "icon_matcher",
+                          lambda: IconMatcher(read_mapping_csv(icon_file, "A", "B")).cache_state())
+    matcher = IconMatcher.from_cache_state(state)
+
+    print(f"Tổng số biểu tượng cần thay thế: {len(matcher.mapping)}")
+    return matcher
+
+
+def load_icon_mapping(icon_file: str) -> Dict[str, str]:
+    return dict(load_icon_matcher(icon_file).mapping)
+
 
-    mapping: Dict[str, str] = {}
-    for _, row in df.iterrows():
-        icon = str(row.get("A", "")).strip()
-        replacement = str(row.get("B", "")).strip()
-        if not icon or not replacement or icon.lower() == "nan" or replacement.lower() == "nan":
-            continue
-        # Ưu tiên mapper cuối cùng nếu có trùng
-        mapping[icon] = replacement
+def normalize_icons_in_text(text: object, mapping: Union[Dict[str, str], IconMatcher]) -> object:
+    if pd.isna(text):
+        return text
 
-    print(f"Tổng số biểu tượng cần thay thế: {len(mapping)}")
-    return mapping
+    return compile_icon_mapping(mapping).normalize(str(text))
 
 
-def normalize_icons_in_text(text: object, mapping: Dict[str, str]) -> object:
+def normalize_icons_in_text_profiled(text: object, matcher: IconMatcher, profile: RuleProfile) -> object:
     if pd.isna(text):
         return text
 
     normalized = str(text)
-    for icon, replacement in mapping.items():
-        if icon in normalized:
-            normalized = normalized.replace(icon, replacement)
+    hits: Counter = Counter()
+    changed_by = set()
+
+    def _replace(match: Match[bytes]) -> bytes:
+        icon = match.group(0).decode("utf-8")
+        replacement = matcher.mapping[icon]
+        hits[icon] += 1
+        if replacement != icon:
+            changed_by.add(icon)
+        return replacement.encode("utf-8")
+
+    # Cùng các bước như IconMatcher.normalize (lọc sơ bộ rồi thay từ vị trí khớp
+    # đầu tiên); thời gian của ô được chia cho các biểu tượng đã khớp (record_cell)
+    start = time.perf_counter()
+    if matcher.pattern is not None:
+        encoded = normalized.encode("utf-8")
+        match = matcher.pattern.search(encoded)
+        if match is not None:
+            first = match.start()
+            normalized = (encoded[:first] + matcher.pattern.sub(_replace, encoded[first:])).decode("utf-8")
+    profile.record_cell(time.perf_counter() - start, hits, changed_by)
     return normalized
 
 
-def process_dataset(dataset_file: str, icon_file: str, output_file: str) -> None:
+def normalize_icon_columns(df: pd.DataFrame, matcher: IconMatcher, memoized: Optional[Callable] = None) -> int:
+    text_columns = select_text_columns(df)
+
+    def _normalize_cell(cell: object) -> object:
+        return matcher.normalize(str(cell))
+
+    total_replacements = 0
+    for column in text_columns:
+        original = df[column]
+        if memoized is not None:
+            normalized = original.apply(lambda cell: cell if pd.isna(cell) else memoized(str(cell)))
+        else:
+            # Mỗi chuỗi khác nhau chỉ chuẩn hoá một lần rồi gán lại cho mọi dòng trùng
+            normalized, _ = map_unique(original, _normalize_cell)
+        total_replacements += int((original.notna() & (original != normalized)).sum())
+        df[column] = normalized
+
+    return total_replacements
+
+
+def process_dataset(
+    dataset_file: str, icon_file: str, output_file: str, profile_file: Optional[str] = None, top_n: int = 10
+) -> None:
     print(f"\nĐang đọc dataset: {dataset_file}")
-    df = pd.read_csv(dataset_file, encoding="utf-8")
+    df = load_dataset(dataset_file)
     print(f"Kích thước dataset: {df.shape}")
 
-    mapping = load_icon_mapping(icon_file)
+    matcher = load_icon_matcher(icon_file)
 
-    text_columns = [col for col in df.columns if df[col].dtype == "object"]
+    text_columns = select_text_columns(df)
     print(f"Các cột dạng văn bản sẽ được chuẩn hoá: {text_columns}")
 
-    total_replacements = 0
-    for column in text_columns:
-        def _normalize_cell(cell: object) -> object:
-            nonlocal total_replacements
-            if pd.isna(cell):
-                return cell
-            original = str(cell)
-            normalized = normalize_icons_in_text(original, mapping)
-            if normalized != original:
-                total_replacements += 1
-            return normalized
-
-        df[column] = df[column].apply(_normalize_cell)
+    if profile_file:
+        # Chế độ đo đạc: chạy từng ô, ghi nhận số lần khớp, số ô bị đổi và thời gian của từng biểu tượng
+        profile = RuleProfile("Icon.csv", list(matcher.mapping.items()))
+        total_replacements = 0
+        for column in text_columns:
+            original = df[column]
+            df[column] = original.apply(lambda cell: normalize_icons_in_text_profiled(cell, matcher, profile))
+            total_replacements += int((original.notna() & (original.astype(str) != df[column].astype(str))).sum())
+        profile.write(profile_file)
+        profile.print_summary(top_n)
+        print(f"Đã lưu thống kê theo từng biểu tượng vào: {profile_file}")
+    else:
+        total_replacements = normalize_icon_columns(df, matcher)
+        print(f"Bộ lọc sơ bộ: {matcher.prefilter_summary()}")
 
     print(f"Số ô dữ liệu đã thay đổi: {total_replacements}")
 
@@ -75,15 +235,54 @@ def process_dataset(dataset_file: str, icon_file: str, output_file: str) -> None
     print("Hoàn thành chuẩn hoá biểu tượng!")
 
 
+def process_dataset_streaming(
+    dataset_file: str, icon_file: str, output_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> StreamStats:
+    matcher = load_icon_matcher(icon_file)
+    print(f"\nĐang đọc dataset theo từng khối {chunk_size} dòng: {dataset_file}")
+
+    total_replacements = 0
+    # Các câu trùng lặp giữa các khối được lấy lại từ bộ nhớ đệm LRU
+    memoized = lru_memoize(matcher.normalize)
+
+    def _normalize(chunk: pd.DataFrame) -> pd.DataFrame:
+        nonlocal total_replacements
+        total_replacements += normalize_icon_columns(chunk, matcher, memoized)
+        return chunk
+
+    def _report(stats: StreamStats) -> None:
+        print(f"  {stats.summary()}")
+
+    stats = stream_csv(dataset_file, output_file, _normalize, chunk_size, report=_report)
+
+    print(f"Số dòng đã xử lý: {stats.rows}")
+    print(f"Số ô dữ liệu đã thay đổi: {total_replacements}")
+    print(f"Tốc độ: {stats.rows_per_second:,.0f} dòng/s, {stats.mb_per_second:.2f} MB/s")
+    print(f"Bộ lọc sơ bộ: {matcher.prefilter_summary()}")
+    print(f"Bộ nhớ đệm: {describe_cache(memoized)}")
+    print("Hoàn thành chuẩn hoá biểu tượng!")
+    return stats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Chuẩn hoá biểu tượng cảm xúc theo Icon.csv")
+    parser.add_argument("--stream", action="store_true",
+                        help="Đọc, chuẩn hoá và ghi dataset theo từng khối để giới hạn bộ nhớ")
+    parser.add_argument("--profile", default=None,
+                        help="Ghi số lần khớp/số ô thay đổi/thời gian của từng biểu tượng ra file .json hoặc .csv")
+    parser.add_argument("--top", type=int, default=10, help="Số biểu tượng hiển thị trong tóm tắt --profile")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Số dòng mỗi khối ở chế độ --stream (mặc định: {DEFAULT_CHUNK_SIZE})")
+    return parser.parse_args()
+
+
 def main() -> None:
     ensure_utf8_stdout()
+    args = parse_args()
 
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(base_dir)
-
-    dataset_file = os.path.join(project_root, "data", "Dataset Text Normalization 14k.csv")
-    icon_file = os.path.join(project_root, "data", "Icon.csv")
-    output_file = os.path.join(project_root, "data", "Dataset Text Normalization 14k_icon_normalized.csv")
+    dataset_file = DATASET_FILE
+    icon_file = ICON_FILE
+    output_file = ICON_NORMALIZED_FILE
 
     if not os.path.exists(dataset_file):
         print(f"Không tìm thấy dataset: {dataset_file}")
@@ -92,7 +291,10 @@ def main() -> None:
         print(f"Không tìm thấy file icon: {icon_file}")
         return
 
-    process_dataset(dataset_file, icon_file, output_file)
+    if args.stream:
+        process_dataset_streaming(dataset_file, icon_file, output_file, chunk_size=args.chunk_size)
+    else:
+        process_dataset(dataset_file, icon_file, output_file, profile_file=args.profile, top_n=args.top)
 
     print("\n========================================")
     print(f"File đã được lưu tại: {output_file}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""On-disk cache for data parsed/compiled from the mapping CSVs (KEY.csv, Icon.csv)."""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import os
+import pickle
+from typing import Any, Callable, Dict
+
+# Bump when the layout of any cached payload changes
+CACHE_VERSION = 1
+
+# Cells pandas.read_csv turns into NaN by default; the loaders used to skip them
+NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+
+def source_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path_for(source: str, kind: str) -> str:
+    return f"{source}.{kind}.cache.pkl"
+
+
+def load_or_build(source: str, kind: str, build: Callable[[], Any]) -> Any:
+    """
+    Return the cached payload for source, or build and cache it.
+
+    The cache lives next to the source CSV and is keyed by the SHA-256 of the
+    CSV bytes, so editing the CSV rebuilds it on the next call. Payloads must
+    be plain data (dicts, lists, strings) so that they load regardless of how
+    the calling script was started.
+    """
+    digest = source_digest(source)
+    cache_file = cache_path_for(source, kind)
+
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("version") == CACHE_VERSION and cached.get("source_digest") == digest:
+                return cached["payload"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            pass
+
+    payload = build()
+    tmp_file = cache_file + ".tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "source_digest": digest, "payload": payload},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Could not write cache {cache_file}: {e}")
+    return payload
+
+
+def read_mapping_csv(path: str, key_column: str, value_column: str) -> Dict[str, str]:
+    """
+    Read a two-column mapping CSV into an ordered dict without pandas.
+
+    Keys and values are stripped; rows where either side is empty or a
+    pandas NA token (or 'nan') are skipped, and later rows win on duplicate keys.
+    A BOM in the header (also inside the quotes) is ignored.
+    """
+    mapping: Dict[str, str] = {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = [name.replace("\ufeff", "").strip() for name in next(reader, [])]
+        key_idx = header.index(key_column)
+        value_idx = header.index(value_column)
+
+        for row in reader:
+            if max(key_idx, value_idx) >= len(row):
+                continue
+            raw_key, raw_value = row[key_idx], row[value_idx]
+            if raw_key in NA_VALUES or raw_value in NA_VALUES:
+                continue
+            key, value = raw_key.strip(), raw_value.strip()
+            if key and value and key.lower() != "nan" and value.lower() != "nan":
+                mapping[key] = value
+    return mapping
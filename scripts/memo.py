@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Avoid re-normalizing duplicated review text."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Callable, Tuple
+
+import pandas as pd
+
+DEFAULT_MEMO_SIZE = 100_000
+
+
+def map_unique(series: pd.Series, func: Callable[[object], object]) -> Tuple[pd.Series, int]:
+    """
+    Apply func once per distinct non-null value and broadcast the results.
+
+    Equivalent to series.apply(func) for functions that return missing values
+    unchanged, but the work is proportional to the number of unique values.
+
+    Returns:
+        The mapped series and the number of distinct values func was called on
+    """
+    uniques = series.dropna().unique()
+    lookup = {value: func(value) for value in uniques}
+    return series.map(lookup), len(uniques)
+
+
+def lru_memoize(func: Callable, maxsize: int = DEFAULT_MEMO_SIZE) -> Callable:
+    """Wrap func in a bounded LRU cache; use describe_cache() for hit/miss counts."""
+    return lru_cache(maxsize=maxsize)(func)
+
+
+def describe_cache(memoized: Callable) -> str:
+    info = memoized.cache_info()
+    lookups = info.hits + info.misses
+    hit_rate = info.hits / lookups * 100 if lookups else 0.0
+    return (f"{info.hits} hits, {info.misses} misses ({hit_rate:.1f}% hit rate), "
+            f"{info.currsize}/{info.maxsize} entries")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Near-duplicate clustering of review text with MinHash + LSH banding."""
+
+from __future__ import annotations
+
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 2
+
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> List[str]:
+    """
+    Word n-grams of an already cleaned text (see check_duplicates.clean_text).
+
+    Texts shorter than size words yield the whole text as their only shingle;
+    an empty text yields no shingles.
+    """
+    words = text.split()
+    if len(words) <= size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def choose_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose LSH S-curve
+    threshold (1 / bands) ** (1 / rows) is the highest one not above the
+    Jaccard threshold: candidates are verified on the full signature
+    afterwards, so a lower curve only costs time while a higher one misses pairs.
+    """
+    best: Tuple[int, int] = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class MinHasher:
+    """
+    num_perm multiply-shift hash functions over 32-bit shingle hashes:
+    h(x) = ((a * x + b) mod 2**64) >> 32 with random odd a, computed with
+    wrapping uint64 arithmetic (no modulo).
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.randint(0, 2 ** 63, size=num_perm, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 2 ** 63, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signatures(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        MinHash signatures of cleaned texts.
+
+        Returns:
+            (signatures, has_shingles): a (n_texts, num_perm) uint32 array and a
+            bool array that is False for empty texts (their rows are all max)
+        """
+        hashes = array('I')
+        counts = array('q')
+        for text in texts:
+            grams = shingles(text, self.shingle_size)
+            counts.append(len(grams))
+            hashes.extend(map(zlib.crc32, map(str.encode, grams)))
+
+        counts_arr = np.frombuffer(counts, dtype=np.int64)
+        has_shingles = counts_arr > 0
+        # Built transposed (one row per hash function): each row is one
+        # vectorized pass over all shingles, reduced to per-document minima
+        signatures = np.full((self.num_perm, len(counts_arr)), _MAX_HASH, dtype=np.uint32)
+        if len(hashes):
+            values = np.frombuffer(hashes, dtype=np.uint32).astype(np.uint64)
+            first = np.r_[0, np.cumsum(counts_arr[has_shingles])[:-1]]
+            owners = np.flatnonzero(has_shingles)
+            permuted = np.empty_like(values)
+            with np.errstate(over='ignore'):
+                for k in range(self.num_perm):
+                    np.multiply(values, self.a[k], out=permuted)
+                    permuted += self.b[k]
+                    permuted >>= np.uint64(32)
+                    signatures[k, owners] = np.minimum.reduceat(permuted, first)
+        return signatures.T.copy(), has_shingles
+
+
+@dataclass
+class NearDuplicateResult:
+    cluster_ids: np.ndarray   # -1 for rows without a near-duplicate
+    cluster_sizes: np.ndarray  # 1 for rows without a near-duplicate
+    bands: int
+    rows: int
+    candidate_pairs: int
+
+    @property
+    def clusters(self) -> int:
+        return int(self.cluster_ids.max()) + 1 if len(self.cluster_ids) else 0
+
+    @property
+    def duplicated_rows(self) -> int:
+        return int((self.cluster_ids >= 0).sum())
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_near_duplicates(texts: List[str], threshold: float = DEFAULT_THRESHOLD,
+                         num_perm: int = DEFAULT_NUM_PERM,
+                         shingle_size: int = DEFAULT_SHINGLE_SIZE) -> NearDuplicateResult:
+    """
+    Cluster cleaned texts whose estimated Jaccard similarity is >= threshold.
+
+    Each LSH band groups rows whose signature slice is identical; every row
+    of a bucket is compared with the bucket's first row on the full
+    signature and joined to its cluster when the estimated similarity
+    reaches the threshold. Work is linear in the number of rows plus the
+    size of the candidate buckets; no all-pairs comparison is made.
+
+    Cluster IDs are numbered 0.. in order of each cluster's first row.
+    """
+    if not 0.0 < threshold <= 1.0:
+        raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+
+    hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+    signatures, has_shingles = hasher.signatures(texts)
+    bands, rows = choose_bands(threshold, num_perm)
+    n = len(signatures)
+    parent = list(range(n))
+    candidate_pairs = 0
+    indexed = np.flatnonzero(has_shingles)
+
+    for band in range(bands):
+        chunk = np.ascontiguousarray(signatures[indexed, band * rows:(band + 1) * rows])
+        keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1], True])
+        shared = np.flatnonzero(np.diff(bounds) > 1)
+        for lo, hi in zip(bounds[shared], bounds[shared + 1]):
+            members = indexed[order[lo:hi]]
+            head = members[0]
+            similarity = (signatures[members[1:]] == signatures[head]).mean(axis=1)
+            candidate_pairs += len(members) - 1
+            root = _find(parent, head)
+            for member in members[1:][similarity >= threshold]:
+                other = _find(parent, int(member))
+                if other != root:
+                    parent[other] = root
+
+    roots = np.fromiter((_find(parent, i) for i in range(n)), dtype=np.int64, count=n)
+    _, first_index, inverse, sizes = np.unique(roots, return_index=True, return_inverse=True, return_counts=True)
+    cluster_sizes = sizes[inverse]
+
+    # Number the multi-row clusters by first appearance
+    cluster_ids = np.full(n, -1, dtype=np.int64)
+    multi = np.flatnonzero(sizes > 1)
+    ranked = multi[np.argsort(first_index[multi], kind='stable')]
+    label = np.full(len(sizes), -1, dtype=np.int64)
+    label[ranked] = np.arange(len(ranked))
+    cluster_ids[:] = label[inverse]
+
+    return NearDuplicateResult(cluster_ids=cluster_ids, cluster_sizes=cluster_sizes,
+                               bands=bands, rows=rows, candidate_pairs=candidate_pairs)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Normalization Pipeline
+Runs icon replacement (Icon.csv), slang replacement (KEY.csv) and whitespace
+cleanup over the dataset in memory, with a single CSV read and a single write
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from check_duplicates import clean_text
+from csv_stream import DEFAULT_CHUNK_SIZE, stream_csv
+from dataset_schema import select_text_columns
+from dataset_store import DATASET_FILE, ICON_FILE, KEY_FILE, PIPELINE_NORMALIZED_FILE, load_dataset
+from icon_normalization import load_icon_matcher
+from text_normalization import load_normalizer
+
+AVAILABLE_STAGES = ['icon', 'slang', 'whitespace', 'clean']
+DEFAULT_STAGES = ['icon', 'slang', 'whitespace']
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def collapse_whitespace(text: str) -> str:
+    """Collapse runs of whitespace to one space and strip both ends"""
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class NormalizationPipeline:
+    """
+    Ordered chain of per-cell normalization stages
+
+    Stages:
+        icon:       emoticons/emoji -> words (Icon.csv)
+        slang:      abbreviations/slang -> standard words (KEY.csv)
+        whitespace: collapse repeated whitespace, strip ends
+        clean:      check_duplicates.clean_text (lower-case, drop punctuation)
+    """
+
+    def __init__(self, stages: List[str], key_file: Optional[str] = None, icon_file: Optional[str] = None):
+        unknown = [stage for stage in stages if stage not in AVAILABLE_STAGES]
+        if unknown:
+            raise ValueError(f"Unknown stage(s) {unknown}; choose from {AVAILABLE_STAGES}")
+
+        self.stages = list(stages)
+        self.functions: Dict[str, Callable[[str], str]] = {}
+        for stage in self.stages:
+            if stage == 'icon':
+                self.functions[stage] = load_icon_matcher(icon_file).normalize
+            elif stage == 'slang':
+                self.functions[stage] = load_normalizer(key_file).normalize
+            elif stage == 'whitespace':
+                self.functions[stage] = collapse_whitespace
+            elif stage == 'clean':
+                self.functions[stage] = clean_text
+
+        self.timings: Dict[str, float] = {stage: 0.0 for stage in self.stages}
+        self.cells = 0
+        self.unique_cells = 0
+
+    def normalize(self, text: object) -> object:
+        """Run every stage on a single cell"""
+        if pd.isna(text):
+            return text
+        value = str(text)
+        for stage in self.stages:
+            value = self.functions[stage](value)
+        return value
+
+    def normalize_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Normalize the review text column(s) of df in place
+
+        Each stage runs over the distinct texts of a column in turn, so its
+        time can be measured separately; results are mapped back to all rows.
+        """
+        text_columns = select_text_columns(df)
+        for column in text_columns:
+            uniques = df[column].dropna().unique()
+            values = [str(value) for value in uniques]
+            for stage in self.stages:
+                function = self.functions[stage]
+                start = time.perf_counter()
+                values = [function(value) for value in values]
+                self.timings[stage] += time.perf_counter() - start
+
+            self.cells += int(df[column].notna().sum())
+            self.unique_cells += len(uniques)
+            df[column] = df[column].map(dict(zip(uniques, values)))
+        return df
+
+    def print_timings(self):
+        total = sum(self.timings.values())
+        print(f"Cells normalized: {self.cells} ({self.unique_cells} unique)")
+        print("Stage timings:")
+        for stage in self.stages:
+            share = self.timings[stage] / total * 100 if total > 0 else 0.0
+            print(f"  {stage:<10} {self.timings[stage]:8.3f}s ({share:5.1f}%)")
+
+
+def run_pipeline(input_file: str, output_file: str, pipeline: NormalizationPipeline,
+                 stream: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Read input_file once, run the pipeline and write output_file once
+
+    Args:
+        input_file: Path to input CSV file
+        output_file: Path to output CSV file
+        pipeline: Configured NormalizationPipeline
+        stream: Process the file in chunks of chunk_size rows
+        chunk_size: Rows per chunk when streaming
+    """
+    print(f"\nStages: {' -> '.join(pipeline.stages)}")
+    start = time.perf_counter()
+
+    if stream:
+        print(f"Streaming dataset from {input_file} in chunks of {chunk_size} rows...")
+        stats = stream_csv(input_file, output_file, pipeline.normalize_frame, chunk_size,
+                           report=lambda stats: print(f"  {stats.summary()}"))
+        print(f"Total rows processed: {stats.rows}")
+    else:
+        print(f"Reading dataset from {input_file}...")
+        read_start = time.perf_counter()
+        df = load_dataset(input_file)
+        print(f"Dataset shape: {df.shape} (read in {time.perf_counter() - read_start:.3f}s)")
+
+        pipeline.normalize_frame(df)
+
+        print(f"Saving normalized dataset to {output_file}...")
+        write_start = time.perf_counter()
+        df.to_csv(output_file, index=False, encoding='utf-8')
+        print(f"Written in {time.perf_counter() - write_start:.3f}s")
+
+    pipeline.print_timings()
+    print(f"Total time: {time.perf_counter() - start:.3f}s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Icon + slang + whitespace normalization in one pass")
+    parser.add_argument('--stages', default=','.join(DEFAULT_STAGES),
+                        help=f"Comma-separated stage order from {AVAILABLE_STAGES} "
+                             f"(default: {','.join(DEFAULT_STAGES)})")
+    parser.add_argument('--input', default=None, help="Input CSV (default: data/Dataset Text Normalization 14k.csv)")
+    parser.add_argument('--output', default=None,
+                        help="Output CSV (default: data/Dataset Text Normalization 14k_pipeline_normalized.csv)")
+    parser.add_argument('--stream', action='store_true', help="Process the dataset in chunks with bounded memory")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per chunk in --stream mode (default: {DEFAULT_CHUNK_SIZE})")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to run the fused normalization pipeline"""
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout.reconfigure(encoding='utf-8')
+    args = parse_args()
+
+    key_file = KEY_FILE
+    icon_file = ICON_FILE
+    input_file = args.input or DATASET_FILE
+    output_file = args.output or PIPELINE_NORMALIZED_FILE
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    for path, needed in ((key_file, 'slang' in stages), (icon_file, 'icon' in stages), (input_file, True)):
+        if needed and not os.path.exists(path):
+            print(f"Error: file not found at {path}")
+            return
+
+    pipeline = NormalizationPipeline(stages, key_file=key_file, icon_file=icon_file)
+    run_pipeline(input_file, output_file, pipeline, stream=args.stream, chunk_size=args.chunk_size)
+
+    print(f"\n{'='*60}")
+    print(f"Output saved to: {output_file}")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
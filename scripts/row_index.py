@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Byte-offset index of the records of a CSV, for random access to row N without parsing the file."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import mmap
+import os
+import sys
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Bump when the layout of the index file changes
+INDEX_VERSION = 1
+# Index slots before the offsets: version, source size, source mtime (ns)
+_META = 3
+_BLOCK = 16 << 20
+
+
+def index_path_for(source: str) -> str:
+    return f"{source}.rowidx.npy"
+
+
+def build_offsets(path: str) -> np.ndarray:
+    """
+    Start offsets of every record of path, header first, plus the file size.
+
+    A record ends at a newline outside quotes (quote parity is tracked across
+    the whole file with a vectorized xor-scan, so quoted multi-line fields stay
+    one record). Empty lines are left out, as pandas.read_csv skips them; row
+    N of the data is then the bytes offsets[N + 1]:offsets[N + 2].
+    """
+    size = os.path.getsize(path)
+    starts = [np.zeros(1, dtype=np.uint64)]
+    parity = 0
+    base = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_BLOCK)
+            if not block:
+                break
+            data = np.frombuffer(block, dtype=np.uint8)
+            inside = np.bitwise_xor.accumulate((data == ord('"')).view(np.uint8))
+            if parity:
+                inside ^= 1
+            newlines = np.flatnonzero(data == ord("\n"))
+            starts.append((newlines[inside[newlines] == 0] + (base + 1)).astype(np.uint64))
+            parity = int(inside[-1])
+            base += len(block)
+
+    offsets = np.concatenate(starts)
+    if offsets[-1] != size:
+        offsets = np.append(offsets, np.uint64(size))
+    if len(offsets) < 2:
+        return offsets
+
+    # Drop empty records ("\n" or "\r\n" only)
+    lengths = np.diff(offsets)
+    candidates = np.flatnonzero(lengths <= 2)
+    if len(candidates):
+        with open(path, "rb") as f:
+            blank = []
+            for i in candidates:
+                f.seek(int(offsets[i]))
+                if f.read(int(lengths[i])) in (b"\n", b"\r\n"):
+                    blank.append(i)
+        if blank:
+            keep = np.ones(len(offsets), dtype=bool)
+            keep[blank] = False
+            offsets = offsets[keep]
+    return offsets
+
+
+def load_or_build_index(source: str, rebuild: bool = False) -> np.ndarray:
+    """
+    Record offsets of source (see build_offsets), read from the sidecar
+    <source>.rowidx.npy through a memory map.
+
+    The sidecar is rebuilt when the source size or mtime differs from the
+    values stored in it. It holds uint64 values: version, size, mtime_ns,
+    then the offsets (8 bytes per row).
+    """
+    stat = os.stat(source)
+    index_file = index_path_for(source)
+    if not rebuild and os.path.exists(index_file):
+        try:
+            stored = np.load(index_file, mmap_mode="r")
+            if (len(stored) > _META and stored.dtype == np.uint64 and int(stored[0]) == INDEX_VERSION
+                    and int(stored[1]) == stat.st_size and int(stored[2]) == stat.st_mtime_ns):
+                return stored[_META:]
+        except (OSError, ValueError):
+            pass
+
+    offsets = build_offsets(source)
+    meta = np.array([INDEX_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.uint64)
+    tmp_file = index_file + ".tmp.npy"
+    try:
+        np.save(tmp_file, np.concatenate([meta, offsets]))
+        os.replace(tmp_file, index_file)
+    except OSError as e:
+        print(f"Could not write row index {index_file}: {e}")
+    return offsets
+
+
+class IndexedCSV:
+    """
+    Random access to the data rows of a CSV through its row index and a
+    read-only memory map of the file: row(n) and rows(start, stop) parse only
+    the requested records, frame(start, stop) returns them as read_csv would.
+    Row numbers are 0-based data rows (the header is not counted), like df.iloc.
+    """
+
+    def __init__(self, path: str, rebuild: bool = False):
+        self.path = path
+        self.offsets = load_or_build_index(path, rebuild=rebuild)
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.header_bytes = bytes(self._map[:int(self.offsets[1])]) if len(self.offsets) > 1 else b""
+        header_text = self.header_bytes.decode("utf-8-sig")
+        self.columns: List[str] = next(csv.reader(io.StringIO(header_text, newline="")), [])
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 2, 0)
+
+    def __enter__(self) -> "IndexedCSV":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _span(self, start: int, stop: int) -> bytes:
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return b""
+        return self._map[int(self.offsets[start + 1]):int(self.offsets[stop + 1])]
+
+    def row(self, n: int) -> List[str]:
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError(f"row {n} out of range for {len(self)} rows")
+        return self.rows(n, n + 1)[0]
+
+    def rows(self, start: int, stop: Optional[int] = None) -> List[List[str]]:
+        """Rows start..stop-1 as lists of strings (csv.reader)."""
+        text = self._span(start, len(self) if stop is None else stop).decode("utf-8")
+        return [row for row in csv.reader(io.StringIO(text, newline="")) if row]
+
+    def frame(self, start: int = 0, stop: Optional[int] = None,
+              usecols: Optional[Sequence[str]] = None, **read_csv_kwargs) -> pd.DataFrame:
+        """
+        Rows start..stop-1 parsed by pandas.read_csv (header included), with a
+        RangeIndex starting at start. dtypes are inferred from these rows only.
+        """
+        start = slice(start, stop).indices(len(self))[0]
+        data = io.BytesIO(self.header_bytes + self._span(start, len(self) if stop is None else stop))
+        df = pd.read_csv(data, usecols=usecols, **read_csv_kwargs)
+        df.index = pd.RangeIndex(start, start + len(df))
+        return df
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build (or refresh) the row-offset index of CSV files")
+    parser.add_argument("files", nargs="+", help="CSV files to index")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the index is up to date")
+    parser.add_argument("--show", type=int, default=None, metavar="N", help="Print data row N of each file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    if sys.stdout.encoding != "utf-8":
+        sys.stdout.reconfigure(encoding="utf-8")
+    args = parse_args()
+    for path in args.files:
+        start = time.perf_counter()
+        with IndexedCSV(path, rebuild=args.rebuild) as reader:
+            elapsed = time.perf_counter() - start
+            index_file = index_path_for(path)
+            print(f"{path}: {len(reader)} rows, {len(reader.columns)} columns, "
+                  f"index {os.path.getsize(index_file) / 1024:.1f} KB ({elapsed:.3f}s)")
+            if args.show is not None:
+                print(f"  row {args.show}: {reader.row(args.show)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Per-rule hit counters and timings for the normalization dictionaries."""
+
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+
+@dataclass
+class RuleStats:
+    rule: str
+    replacement: str
+    matches: int = 0
+    cells_changed: int = 0
+    seconds: float = 0.0
+
+
+class RuleProfile:
+    """Counters for every rule of one dictionary (KEY.csv or Icon.csv).
+
+    Times come from the normalizer's own pass over each cell (record_cell): the time of a
+    cell is shared among the rules that matched in it, in proportion to their matches, and
+    cells where nothing matched are counted as scan time. A rule that never fires has no time.
+    """
+
+    def __init__(self, name: str, rules: List[Tuple[str, str]]):
+        self.name = name
+        self.rules: Dict[str, RuleStats] = {rule: RuleStats(rule, replacement) for rule, replacement in rules}
+        self.cells = 0
+        self.match_seconds = 0.0
+        self.scan_seconds = 0.0
+
+    def __getitem__(self, rule: str) -> RuleStats:
+        return self.rules[rule]
+
+    def record_cell(self, seconds: float, hits: Mapping[str, int], changed: Iterable[str]) -> None:
+        """Add one cell: time of its normalization pass, matches per rule, rules that changed it."""
+        self.cells += 1
+        for rule in changed:
+            self.rules[rule].cells_changed += 1
+        total = sum(hits.values())
+        if not total:
+            self.scan_seconds += seconds
+            return
+        self.match_seconds += seconds
+        for rule, count in hits.items():
+            stats = self.rules[rule]
+            stats.matches += count
+            stats.seconds += seconds * count / total
+
+    def dead_rules(self) -> List[RuleStats]:
+        return [stats for stats in self.rules.values() if stats.matches == 0]
+
+    def top(self, key: str, n: int) -> List[RuleStats]:
+        return sorted(self.rules.values(), key=lambda stats: getattr(stats, key), reverse=True)[:n]
+
+    def write(self, path: str) -> None:
+        """Write one row per rule; JSON when path ends with .json, CSV otherwise."""
+        rows = sorted(self.rules.values(), key=lambda stats: (-stats.matches, -stats.seconds))
+        if str(path).endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"dictionary": self.name, "cells": self.cells,
+                           "match_seconds": self.match_seconds, "scan_seconds": self.scan_seconds,
+                           "rules": [asdict(stats) for stats in rows]}, f, ensure_ascii=False, indent=2)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(RuleStats)])
+                writer.writeheader()
+                for stats in rows:
+                    writer.writerow(asdict(stats))
+
+    def print_summary(self, top_n: int = 10) -> None:
+        print(f"\nRule profile for {self.name}: {len(self.rules)} rules over {self.cells} cells")
+
+        print(f"Top {top_n} rules by matches:")
+        for stats in self.top("matches", top_n):
+            print(f"  {stats.rule!r:<20} {stats.matches:8d} matches {stats.cells_changed:8d} cells")
+
+        print(f"Time: {self.match_seconds:.3f}s in cells with matches, "
+              f"{self.scan_seconds:.3f}s in cells without")
+        print(f"Top {top_n} rules by time (share of the cells they matched in):")
+        for stats in self.top("seconds", top_n):
+            if stats.matches:
+                print(f"  {stats.rule!r:<20} {stats.seconds:8.3f}s")
+
+        dead = self.dead_rules()
+        print(f"Rules that never matched: {len(dead)}")
+        if dead:
+            print("  " + ", ".join(repr(stats.rule) for stats in dead))
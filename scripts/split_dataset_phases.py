@@ -11,9 +11,10 @@ from typing import List
 
 import pandas as pd
 
+from dataset_store import SPLIT_DATASET_FILE, read_raw_dataset, source_encoding
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-DATASET_PATH = BASE_DIR / "trainning_data_split" / "Dataset.csv"
+DATASET_PATH = Path(SPLIT_DATASET_FILE)
 PHASE_1_DIR = BASE_DIR / "trainning_data_split" / "phase_1"
 PHASE_2_DIR = BASE_DIR / "trainning_data_split" / "phase_2"
 
@@ -54,7 +55,7 @@ def compute_phase2_chunk_sizes(total_rows: int) -> List[int]:
     return chunk_sizes
 
 
-def split_phase_1(df: pd.DataFrame) -> int:
+def split_phase_1(df: pd.DataFrame, encoding: str = "utf-8") -> int:
     ensure_dir(PHASE_1_DIR)
     phase1_rows = PHASE_1_SUBPHASE_COUNT * PHASE_1_SUBPHASE_SIZE
 
@@ -68,13 +69,13 @@ def split_phase_1(df: pd.DataFrame) -> int:
         sub_dir = PHASE_1_DIR / f"sub_phase_{idx + 1}"
         ensure_dir(sub_dir)
         output_file = sub_dir / f"sub_phase_{idx + 1}.csv"
-        sub_df.to_csv(output_file, index=False, encoding="utf-8")
+        sub_df.to_csv(output_file, index=False, encoding=encoding)
         print(f"Phase 1 - Sub-phase {idx + 1}: {len(sub_df)} rows -> {output_file}")
 
     return phase1_rows
 
 
-def split_phase_2(df: pd.DataFrame, start_row: int) -> None:
+def split_phase_2(df: pd.DataFrame, start_row: int, encoding: str = "utf-8") -> None:
     ensure_dir(PHASE_2_DIR)
     phase2_df = df.iloc[start_row:]
     total_phase2 = len(phase2_df)
@@ -90,7 +91,7 @@ def split_phase_2(df: pd.DataFrame, start_row: int) -> None:
         sub_dir = PHASE_2_DIR / f"chunk_{idx}"
         ensure_dir(sub_dir)
         output_file = sub_dir / f"phase_2_chunk_{idx}.csv"
-        sub_df.to_csv(output_file, index=False, encoding="utf-8")
+        sub_df.to_csv(output_file, index=False, encoding=encoding)
         print(f"Phase 2 - Chunk {idx}: {len(sub_df)} rows -> {output_file}")
         current_index += size
 
@@ -100,12 +101,14 @@ def main() -> None:
         raise FileNotFoundError(f"Dataset not found at {DATASET_PATH}")
 
     print(f"Loading dataset from {DATASET_PATH}...")
-    df = pd.read_csv(DATASET_PATH, encoding="utf-8")
+    # Slices keep the header and BOM of Dataset.csv
+    df = read_raw_dataset(str(DATASET_PATH))
+    encoding = source_encoding(str(DATASET_PATH))
     total_rows = len(df)
     print(f"Total rows in dataset: {total_rows}")
 
-    phase1_rows = split_phase_1(df)
-    split_phase_2(df, phase1_rows)
+    phase1_rows = split_phase_1(df, encoding)
+    split_phase_2(df, phase1_rows, encoding)
 
     print("\nDataset has been split into phase_1 and phase_2 directories.")
 
@@ -6,10 +6,50 @@ Replaces abbreviations, slang, and spelling errors with standard Vietnamese expr
 using a mapping dictionary from KEY.csv
 """
 
+import argparse
+import hashlib
+import json
+import math
+import pickle
 import pandas as pd
 import re
 import os
-from typing import Dict, List
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Match, Optional, Pattern, Tuple, Union
+
+from csv_stream import DEFAULT_CHUNK_SIZE, StreamStats, stream_csv
+from dataset_schema import select_text_columns
+from dataset_store import DATASET_FILE, KEY_FILE, NORMALIZED_FILE, load_dataset
+from mapping_cache import load_or_build, read_mapping_csv
+from memo import DEFAULT_MEMO_SIZE, describe_cache, lru_memoize, map_unique
+from rule_profile import RuleProfile
+
+def _build_key_cache(key_file: str) -> dict:
+    # Create dictionary from ACol to BCol and compile it
+    replacement_dict = read_mapping_csv(key_file, 'ACol', 'BCol')
+    return TextNormalizer(replacement_dict).cache_state()
+
+def load_normalizer(key_file: str) -> 'TextNormalizer':
+    """
+    Load the compiled normalizer for KEY.csv
+
+    The parsed dictionary and regex source are cached next to KEY.csv and
+    reused until the file content changes, so pandas is not needed here.
+
+    Args:
+        key_file: Path to the KEY.csv file
+
+    Returns:
+        Compiled TextNormalizer
+    """
+    print(f"Loading replacement dictionary from {key_file}...")
+    state = load_or_build(key_file, 'normalizer', lambda: _build_key_cache(key_file))
+    normalizer = TextNormalizer.from_cache_state(state)
+    print(f"Loaded {len(normalizer.replacement_dict)} replacement mappings")
+    return normalizer
 
 def load_replacement_dict(key_file: str) -> Dict[str, str]:
     """
@@ -21,59 +61,282 @@ def load_replacement_dict(key_file: str) -> Dict[str, str]:
     Returns:
         Dictionary mapping words to replace (ACol) to their replacements (BCol)
     """
-    print(f"Loading replacement dictionary from {key_file}...")
-    df = pd.read_csv(key_file)
-    
-    # Create dictionary from ACol to BCol
-    replacement_dict = {}
-    for _, row in df.iterrows():
-        # Strip whitespace and handle empty values
-        key = str(row['ACol']).strip()
-        value = str(row['BCol']).strip()
-        if key and value and key != 'nan' and value != 'nan':
-            replacement_dict[key] = value
-    
-    print(f"Loaded {len(replacement_dict)} replacement mappings")
-    return replacement_dict
+    return dict(load_normalizer(key_file).replacement_dict)
+
+_WORD_TOKEN = re.compile(r'\w+')
+
+class TextNormalizer:
+    """
+    Replacement dictionary compiled into a single alternation regex
 
-def normalize_text(text: str, replacement_dict: Dict[str, str]) -> str:
+    Rules are ordered longest key first so that the left-to-right scan picks
+    the longest match at each position. Single words keep their word
+    boundaries, phrases are matched anywhere, both case-insensitive.
+    """
+
+    def __init__(self, replacement_dict: Dict[str, str]):
+        self.replacement_dict = dict(replacement_dict)
+
+        # Sort replacements by length (longest first) to handle multi-word replacements first
+        sorted_replacements = sorted(replacement_dict.items(), key=lambda x: len(x[0]), reverse=True)
+
+        # Bucket rules by their first character; only one bucket can match at a
+        # given position, so the regex engine skips the others after one compare
+        buckets: Dict[str, List[Tuple[str, str]]] = {}
+        for old_word, new_word in sorted_replacements:
+            if not old_word:
+                continue
+            buckets.setdefault(old_word[0].lower(), []).append((old_word, new_word))
+
+        self.replacements: List[Tuple[str, str]] = [rule for bucket in buckets.values() for rule in bucket]
+        self.values = [new_word for _, new_word in self.replacements]
+        self.pattern = self._compile(list(buckets.values()))
+        self._build_prefilter()
+
+    def _build_prefilter(self):
+        """
+        Cheap check for cells that cannot match any rule
+
+        A single-word key made of word characters can only match a whole
+        word token of the same (case-folded) text; other keys (phrases, keys
+        with punctuation) are checked as case-folded substrings. Both checks
+        can give false positives but never miss a cell the regex would change.
+        """
+        self.word_keys = set()
+        self.substring_keys = []
+        for old_word, _ in self.replacements:
+            folded = old_word.casefold()
+            if ' ' not in old_word and _WORD_TOKEN.fullmatch(folded):
+                self.word_keys.add(folded)
+            else:
+                self.substring_keys.append(folded)
+        self.skipped = 0
+        self.scanned = 0
+
+    def could_match(self, text: str) -> bool:
+        # str.casefold() expands U+0130 to two characters, unlike the regex
+        # engine's case folding; send such cells to the full matcher
+        if '\u0130' in text:
+            return True
+        folded = text.casefold()
+        if not self.word_keys.isdisjoint(_WORD_TOKEN.findall(folded)):
+            return True
+        return any(key in folded for key in self.substring_keys)
+
+    @staticmethod
+    def _rule_tail(old_word: str) -> str:
+        escaped_tail = re.escape(old_word[1:])
+        if ' ' in old_word:
+            # For phrases, use direct matching
+            return escaped_tail
+        # For single words, use word boundaries to avoid partial matches. The
+        # leading \b is checked after the first character so that every
+        # alternative starts with a literal: (?<!\w\w) == \b before a word char
+        if re.match(r'\w', old_word[0]):
+            leading = r'(?<!\w\w)'
+        else:
+            leading = r'(?<=\w.)'
+        return leading + escaped_tail + r'\b'
+
+    @classmethod
+    def _compile(cls, buckets: List[List[Tuple[str, str]]]) -> Optional[Pattern[str]]:
+        if not buckets:
+            return None
+
+        # One capturing group per rule; match.lastindex tells which rule fired
+        alternatives = []
+        for bucket in buckets:
+            tails = '|'.join('(' + cls._rule_tail(old_word) + ')' for old_word, _ in bucket)
+            alternatives.append(re.escape(bucket[0][0][0]) + '(?:' + tails + ')')
+        return re.compile('|'.join(alternatives), re.IGNORECASE)
+
+    def cache_state(self) -> dict:
+        """Plain-data form of the compiled rules, for mapping_cache"""
+        return {
+            'replacement_dict': list(self.replacement_dict.items()),
+            'replacements': self.replacements,
+            'pattern': self.pattern.pattern if self.pattern is not None else None,
+        }
+
+    @classmethod
+    def from_cache_state(cls, state: dict) -> 'TextNormalizer':
+        normalizer = cls.__new__(cls)
+        normalizer.replacement_dict = dict(state['replacement_dict'])
+        normalizer.replacements = [tuple(rule) for rule in state['replacements']]
+        normalizer.values = [new_word for _, new_word in normalizer.replacements]
+        normalizer.pattern = re.compile(state['pattern'], re.IGNORECASE) if state['pattern'] else None
+        normalizer._build_prefilter()
+        return normalizer
+
+    def _replace(self, match: Match[str]) -> str:
+        return self.values[match.lastindex - 1]
+
+    def normalize_profiled(self, text: str, profile: RuleProfile) -> str:
+        """
+        Normalize text like normalize(), recording per-rule statistics
+
+        The prefilter and the single-pass substitution are timed together and
+        the time is recorded with the rules that matched (RuleProfile.record_cell).
+
+        Args:
+            text: Text to normalize
+            profile: RuleProfile built from this normalizer's rules
+
+        Returns:
+            Normalized text
+        """
+        if pd.isna(text) or text == '':
+            return text
+
+        normalized = str(text)
+        hits = Counter()
+        changed_by = set()
+
+        def _replace(match: Match[str]) -> str:
+            old_word, new_word = self.replacements[match.lastindex - 1]
+            hits[old_word] += 1
+            if new_word != match.group(0):
+                changed_by.add(old_word)
+            return new_word
+
+        start = time.perf_counter()
+        if self.pattern is not None and self.could_match(normalized):
+            normalized = self.pattern.sub(_replace, normalized)
+        profile.record_cell(time.perf_counter() - start, hits, changed_by)
+        return normalized
+
+    def normalize(self, text: str) -> str:
+        """
+        Normalize text in a single left-to-right pass over the string
+
+        Args:
+            text: Text to normalize
+
+        Returns:
+            Normalized text
+        """
+        if pd.isna(text) or text == '':
+            return text
+
+        normalized = str(text)
+        if self.pattern is None or not self.could_match(normalized):
+            self.skipped += 1
+            return normalized
+        self.scanned += 1
+        return self.pattern.sub(self._replace, normalized)
+
+    def prefilter_summary(self) -> str:
+        total = self.skipped + self.scanned
+        share = self.skipped / total * 100 if total else 0.0
+        return f"{self.skipped} of {total} texts skipped by prefilter ({share:.1f}%)"
+
+    __call__ = normalize
+
+
+@lru_cache(maxsize=8)
+def _compile_cached(items: Tuple[Tuple[str, str], ...]) -> TextNormalizer:
+    return TextNormalizer(dict(items))
+
+
+def compile_replacements(replacement_dict: Union[Dict[str, str], TextNormalizer]) -> TextNormalizer:
+    """
+    Build (or reuse) the compiled normalizer for a replacement dictionary
+
+    Args:
+        replacement_dict: Dictionary of replacements, or an already compiled normalizer
+
+    Returns:
+        Compiled TextNormalizer
+    """
+    if isinstance(replacement_dict, TextNormalizer):
+        return replacement_dict
+    return _compile_cached(tuple(replacement_dict.items()))
+
+
+def normalize_text(text: str, replacement_dict: Union[Dict[str, str], TextNormalizer]) -> str:
     """
     Normalize text by replacing words according to the replacement dictionary
     Uses word boundary matching to avoid partial replacements
     
     Args:
         text: Text to normalize
-        replacement_dict: Dictionary of replacements
+        replacement_dict: Dictionary of replacements, or a compiled TextNormalizer
         
     Returns:
         Normalized text
     """
-    if pd.isna(text) or text == '':
-        return text
-    
-    normalized = str(text)
-    
-    # Sort replacements by length (longest first) to handle multi-word replacements first
-    sorted_replacements = sorted(replacement_dict.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    for old_word, new_word in sorted_replacements:
-        # Create regex pattern with word boundaries
-        # Handle special regex characters by escaping them
-        escaped_old = re.escape(old_word)
-        
-        # Use word boundary (\b) for single words, or flexible matching for phrases
-        if ' ' in old_word:
-            # For phrases, use direct replacement with case insensitive matching
-            pattern = re.compile(re.escape(old_word), re.IGNORECASE)
-            normalized = pattern.sub(new_word, normalized)
-        else:
-            # For single words, use word boundaries to avoid partial matches
-            pattern = re.compile(r'\b' + escaped_old + r'\b', re.IGNORECASE)
-            normalized = pattern.sub(new_word, normalized)
-    
-    return normalized
+    return compile_replacements(replacement_dict).normalize(text)
+
+# Normalizer held by each worker process; set once by _init_worker
+_worker_normalizer: Optional[TextNormalizer] = None
+
+
+def _init_worker(normalizer: TextNormalizer):
+    global _worker_normalizer
+    _worker_normalizer = normalizer
+
 
-def process_dataset(input_file: str, output_file: str, replacement_dict: Dict[str, str]):
+def _normalize_chunk(values: list) -> Tuple[list, int, int]:
+    skipped, scanned = _worker_normalizer.skipped, _worker_normalizer.scanned
+    normalized = [_worker_normalizer.normalize(x) for x in values]
+    return normalized, _worker_normalizer.skipped - skipped, _worker_normalizer.scanned - scanned
+
+
+def create_worker_pool(normalizer: TextNormalizer, workers: int) -> ProcessPoolExecutor:
+    """Start a process pool whose workers each hold a copy of the normalizer"""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(normalizer,))
+
+
+def normalize_parallel(df: pd.DataFrame, columns: List[str], normalizer: TextNormalizer,
+                       workers: int, chunk_size: Optional[int] = None,
+                       executor: Optional[ProcessPoolExecutor] = None) -> pd.DataFrame:
+    """
+    Normalize the given columns in chunks across a process pool
+
+    Each distinct text is normalized once: the unique values of the columns
+    are split into chunks for the workers and the results are mapped back
+    onto every row. The compiled normalizer is sent to each worker once
+    through the pool initializer; tasks only carry raw text values.
+
+    Args:
+        df: Dataframe to normalize (modified in place)
+        columns: Text columns to normalize
+        normalizer: Compiled TextNormalizer
+        workers: Number of worker processes
+        chunk_size: Values per task (default: spread values over 4 tasks per worker)
+        executor: Pool from create_worker_pool to reuse (default: start a new one)
+
+    Returns:
+        The dataframe with normalized columns, rows in their original order
+    """
+    uniques = pd.unique(pd.concat([df[column].dropna() for column in columns])) if columns else []
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(uniques) / (workers * 4)))
+
+    chunks = [list(uniques[start:start + chunk_size]) for start in range(0, len(uniques), chunk_size)]
+
+    normalized: list = []
+    pool = executor if executor is not None else create_worker_pool(normalizer, workers)
+    try:
+        # map() yields results in submission order, so values line up with uniques
+        for result, skipped, scanned in pool.map(_normalize_chunk, chunks):
+            normalized.extend(result)
+            # Keep the prefilter counters of the worker copies in the parent
+            normalizer.skipped += skipped
+            normalizer.scanned += scanned
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+    lookup = dict(zip(uniques, normalized))
+    for column in columns:
+        df[column] = df[column].map(lookup)
+    return df
+
+def process_dataset(input_file: str, output_file: str,
+                    replacement_dict: Union[Dict[str, str], TextNormalizer],
+                    workers: int = 1, profile: Optional[RuleProfile] = None):
     """
     Process the dataset CSV file and normalize all text columns
     
@@ -81,35 +344,247 @@ def process_dataset(input_file: str, output_file: str, replacement_dict: Dict[st
         input_file: Path to input CSV file
         output_file: Path to output CSV file
         replacement_dict: Dictionary of replacements
+        workers: Number of worker processes (1 = normalize in this process)
+        profile: Collect per-rule statistics into this profile (runs in this process, cell by cell)
     """
     print(f"\nReading dataset from {input_file}...")
-    df = pd.read_csv(input_file)
+    df = load_dataset(input_file)
     
     print(f"Dataset shape: {df.shape}")
     print(f"Columns: {list(df.columns)}")
     
-    # Process each column (normalize all text columns)
-    total_cells = 0
-    for column in df.columns:
-        if df[column].dtype == 'object':  # Text columns
+    # Compile the dictionary once for the whole dataset
+    normalizer = compile_replacements(replacement_dict)
+
+    # Only the review text is normalized; label columns are passed through
+    text_columns = select_text_columns(df)
+    print(f"Text columns: {text_columns} (passed through: {[c for c in df.columns if c not in text_columns]})")
+    if profile is not None:
+        for column in text_columns:
+            print(f"\nNormalizing column (profiling rules): {column}")
+            df[column] = df[column].apply(lambda x: normalizer.normalize_profiled(x, profile))
+    elif workers > 1 and len(df) > 0:
+        print(f"\nNormalizing columns {text_columns} with {workers} worker processes")
+        normalize_parallel(df, text_columns, normalizer, workers)
+    else:
+        for column in text_columns:
             print(f"\nNormalizing column: {column}")
-            df[column] = df[column].apply(lambda x: normalize_text(x, replacement_dict))
-            total_cells += df[column].notna().sum()
+            # Duplicated texts are normalized once and broadcast back to their rows
+            df[column], unique_count = map_unique(df[column], normalizer.normalize)
+            print(f"Unique texts normalized: {unique_count} of {df[column].notna().sum()}")
+    total_cells = sum(df[column].notna().sum() for column in text_columns)
     
     print(f"\nTotal cells processed: {total_cells}")
+    if profile is None:
+        print(f"Prefilter: {normalizer.prefilter_summary()}")
     
     # Save the normalized dataset
     print(f"Saving normalized dataset to {output_file}...")
     df.to_csv(output_file, index=False, encoding='utf-8')
     print("Normalization complete!")
 
+def process_dataset_streaming(input_file: str, output_file: str,
+                              replacement_dict: Union[Dict[str, str], TextNormalizer],
+                              chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1,
+                              memo_size: int = DEFAULT_MEMO_SIZE) -> StreamStats:
+    """
+    Normalize the dataset chunk by chunk so memory stays bounded by chunk_size
+
+    Args:
+        input_file: Path to input CSV file
+        output_file: Path to output CSV file
+        replacement_dict: Dictionary of replacements
+        chunk_size: Number of rows read, normalized and written at a time
+        workers: Number of worker processes (1 = normalize in this process)
+        memo_size: Entries in the LRU cache shared by all chunks (single process)
+
+    Returns:
+        Row/byte counts and throughput of the run
+    """
+    print(f"\nStreaming dataset from {input_file} in chunks of {chunk_size} rows...")
+    normalizer = compile_replacements(replacement_dict)
+    executor = create_worker_pool(normalizer, workers) if workers > 1 else None
+    # Texts repeated across chunks are served from a bounded LRU cache
+    memoized = lru_memoize(normalizer.normalize, memo_size)
+
+    def _normalize(chunk: pd.DataFrame) -> pd.DataFrame:
+        text_columns = select_text_columns(chunk)
+        if executor is not None and len(chunk) > 0:
+            return normalize_parallel(chunk, text_columns, normalizer, workers, executor=executor)
+        for column in text_columns:
+            chunk[column] = chunk[column].apply(lambda x: x if pd.isna(x) else memoized(x))
+        return chunk
+
+    def _report(stats: StreamStats):
+        print(f"  {stats.summary()}")
+
+    try:
+        stats = stream_csv(input_file, output_file, _normalize, chunk_size, report=_report)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print(f"\nTotal rows processed: {stats.rows}")
+    print(f"Throughput: {stats.rows_per_second:,.0f} rows/s, {stats.mb_per_second:.2f} MB/s")
+    print(f"Prefilter: {normalizer.prefilter_summary()}")
+    if executor is None:
+        print(f"Memo cache: {describe_cache(memoized)}")
+    print("Normalization complete!")
+    return stats
+
+def dictionary_fingerprint(replacement_dict: Dict[str, str]) -> str:
+    """Stable hash of the rule set, independent of KEY.csv row order"""
+    payload = json.dumps(sorted(replacement_dict.items()), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class NormalizationCache:
+    """
+    Sidecar cache of normalized cells, keyed by a hash of the raw text
+
+    The cache remembers the rule set it was built with. When KEY.csv changes,
+    a cached cell is reused only if none of the added, removed or modified keys
+    matches its raw text; any other cell would normalize to the same result.
+    """
+
+    def __init__(self, cache_file: str, replacement_dict: Dict[str, str]):
+        self.cache_file = cache_file
+        self.rules = dict(replacement_dict)
+        self.fingerprint = dictionary_fingerprint(self.rules)
+        self.entries: Dict[bytes, str] = {}
+        self.stale_pattern: Optional[Pattern[str]] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        # Digests looked up in this run; their entries are current
+        self.seen: set = set()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Ignoring unreadable cache {self.cache_file}: {e}")
+            return
+
+        self.entries = cached['entries']
+        if cached['fingerprint'] != self.fingerprint:
+            old_rules = cached['rules']
+            changed = {key for key in old_rules.keys() | self.rules.keys()
+                       if old_rules.get(key) != self.rules.get(key)}
+            print(f"Dictionary changed: {len(changed)} rule(s) added, removed or modified")
+            # Only the keys matter for the check, values are placeholders
+            self.stale_pattern = TextNormalizer({key: '' for key in changed}).pattern
+
+    def normalize(self, text: str, normalizer: TextNormalizer) -> str:
+        if pd.isna(text) or text == '':
+            return text
+
+        raw = str(text)
+        digest = text_digest(raw)
+        cached = self.entries.get(digest)
+        if cached is not None:
+            if digest in self.seen or self.stale_pattern is None or not self.stale_pattern.search(raw):
+                self.hits += 1
+                self.seen.add(digest)
+                return cached
+            self.invalidated += 1
+        else:
+            self.misses += 1
+
+        normalized = normalizer.normalize(raw)
+        self.entries[digest] = normalized
+        self.seen.add(digest)
+        return normalized
+
+    def save(self):
+        """Write the cache, dropping entries for texts not seen in this run"""
+        entries = {digest: self.entries[digest] for digest in self.seen}
+        tmp_file = self.cache_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            pickle.dump({'fingerprint': self.fingerprint, 'rules': self.rules, 'entries': entries},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.cache_file)
+
+
+def process_dataset_incremental(input_file: str, output_file: str,
+                                replacement_dict: Union[Dict[str, str], TextNormalizer],
+                                cache_file: Optional[str] = None) -> NormalizationCache:
+    """
+    Normalize the dataset, reusing results from a previous run where possible
+
+    Args:
+        input_file: Path to input CSV file
+        output_file: Path to output CSV file
+        replacement_dict: Dictionary of replacements
+        cache_file: Sidecar cache path (default: output_file + '.cache.pkl')
+
+    Returns:
+        The cache, with hit/miss/invalidated counters for this run
+    """
+    if cache_file is None:
+        cache_file = output_file + '.cache.pkl'
+
+    print(f"\nReading dataset from {input_file}...")
+    df = load_dataset(input_file)
+    print(f"Dataset shape: {df.shape}")
+
+    normalizer = compile_replacements(replacement_dict)
+    cache = NormalizationCache(cache_file, normalizer.replacement_dict)
+    print(f"Loaded {len(cache.entries)} cached cells from {cache_file}")
+
+    text_columns = select_text_columns(df)
+    for column in text_columns:
+        print(f"\nNormalizing column: {column}")
+        df[column] = df[column].apply(lambda x: cache.normalize(x, normalizer))
+
+    print(f"\nCells reused from cache: {cache.hits}")
+    print(f"Cells recomputed (new text): {cache.misses}")
+    print(f"Cells recomputed (affected by changed rules): {cache.invalidated}")
+    print(f"Prefilter: {normalizer.prefilter_summary()}")
+
+    print(f"Saving normalized dataset to {output_file}...")
+    df.to_csv(output_file, index=False, encoding='utf-8')
+    cache.save()
+    print(f"Cache saved to {cache_file}")
+    print("Normalization complete!")
+    return cache
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Normalize Vietnamese text using the KEY.csv dictionary")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes (default: 1)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Read, normalize and write the dataset in chunks with bounded memory")
+    parser.add_argument('--profile', default=None,
+                        help="Write per-rule matches/changed cells/time to this .json or .csv file")
+    parser.add_argument('--top', type=int, default=10,
+                        help="Rules listed in the --profile summary (default: 10)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Reuse normalized cells from the previous run's sidecar cache")
+    parser.add_argument('--cache', default=None,
+                        help="Sidecar cache path for --incremental (default: <output>.cache.pkl)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per chunk in --stream mode (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--memo-size', type=int, default=DEFAULT_MEMO_SIZE,
+                        help=f"LRU entries for duplicated texts in --stream mode (default: {DEFAULT_MEMO_SIZE})")
+    return parser.parse_args()
+
 def main():
     """Main function to run the text normalization"""
+    args = parse_args()
+
     # Define file paths
-    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    key_file = os.path.join(base_path, 'data', 'KEY.csv')
-    input_file = os.path.join(base_path, 'data', 'Dataset Text Normalization 14k.csv')
-    output_file = os.path.join(base_path, 'data', 'Dataset Text Normalization 14k_normalized.csv')
+    key_file = KEY_FILE
+    input_file = DATASET_FILE
+    output_file = NORMALIZED_FILE
     
     # Check if files exist
     if not os.path.exists(key_file):
@@ -120,11 +595,24 @@ def main():
         print(f"Error: Dataset file not found at {input_file}")
         return
     
-    # Load replacement dictionary
-    replacement_dict = load_replacement_dict(key_file)
+    # Load replacement dictionary (compiled, cached next to KEY.csv)
+    replacement_dict = load_normalizer(key_file)
     
     # Process dataset
-    process_dataset(input_file, output_file, replacement_dict)
+    if args.profile:
+        profile = RuleProfile('KEY.csv', replacement_dict.replacements)
+        process_dataset(input_file, output_file, replacement_dict, profile=profile)
+        profile.write(args.profile)
+        profile.print_summary(args.top)
+        print(f"Rule profile saved to: {args.profile}")
+    elif args.incremental:
+        process_dataset_incremental(input_file, output_file, replacement_dict, cache_file=args.cache)
+    elif args.stream:
+        process_dataset_streaming(input_file, output_file, replacement_dict,
+                                  chunk_size=args.chunk_size, workers=args.workers,
+                                  memo_size=args.memo_size)
+    else:
+        process_dataset(input_file, output_file, replacement_dict, workers=args.workers)
     
     print(f"\n{'='*60}")
     print(f"Output saved to: {output_file}")
@@ -7,13 +7,19 @@ Verification script to show examples of text normalization
 import pandas as pd
 import sys
 
+from row_index import IndexedCSV
+
 # Set UTF-8 encoding for output
 sys.stdout.reconfigure(encoding='utf-8')
 
 def main():
-    # Load both files
-    df_orig = pd.read_csv('data/Dataset Text Normalization 14k.csv')
-    df_norm = pd.read_csv('data/Dataset Text Normalization 14k_normalized.csv')
+    # Read only the compared rows of both files through their row indexes
+    with IndexedCSV('data/Dataset Text Normalization 14k.csv') as orig, \
+            IndexedCSV('data/Dataset Text Normalization 14k_normalized.csv') as norm:
+        total_rows = len(orig)
+        checked = min(100, total_rows)  # Check first 100 rows
+        df_orig = orig.frame(0, checked, usecols=['data'])
+        df_norm = norm.frame(0, checked, usecols=['data'])
     
     print("=" * 80)
     print("TEXT NORMALIZATION VERIFICATION")
@@ -24,7 +30,7 @@ def main():
     examples_shown = 0
     max_examples = 5
     
-    for idx in range(min(100, len(df_orig))):  # Check first 100 rows
+    for idx in range(checked):
         orig_text = str(df_orig.loc[idx, 'data'])
         norm_text = str(df_norm.loc[idx, 'data'])
         
@@ -39,7 +45,7 @@ def main():
     
     print("\n" + "=" * 80)
     print(f"Total changes found in first 100 rows: {changes_found}")
-    print(f"Total rows in dataset: {len(df_orig)}")
+    print(f"Total rows in dataset: {total_rows}")
     print("=" * 80)
     
     # Show some statistics about the KEY.csv mappings used
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The scripts are run directly and import each other by module name
+for scripts_dir in (ROOT / "scripts", ROOT / "ai_training" / "scripts"):
+    if str(scripts_dir) not in sys.path:
+        sys.path.insert(0, str(scripts_dir))
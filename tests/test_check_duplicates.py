@@ -0,0 +1,114 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import check_duplicates
+import dataset_store
+from check_duplicates import clean_text, clean_text_series
+
+SPECIAL_VALUES = [
+    None, np.nan, pd.NA, "", " ", "!!!", "...?!", " - ", "\t\n",
+    "Điện thoại ĐẸP, pin trâu!!!", "Máy xài ỔN 👍👍", "giá rẻ...  nhưng   giao hàng chậm :(",
+    "Ếch, ỐC; ƯỚT", "tiếng việt có dấu: à á ả ã ạ ă ằ ắ ẳ ẵ ặ",
+    "ΑΣ", "ΑΣ.", "'ΣΑ", "İstanbul", "snake_case_word", "a\x00b", 3, 4.5,
+]
+
+
+def test_matches_clean_text_on_special_values():
+    series = pd.Series(SPECIAL_VALUES, dtype=object)
+    assert clean_text_series(series).tolist() == [clean_text(value) for value in SPECIAL_VALUES]
+
+
+@pytest.mark.parametrize("values", [[], [" "], ["!"], ["", ""], [None], ["a"]])
+def test_matches_clean_text_on_tiny_columns(values):
+    series = pd.Series(values, dtype=object)
+    assert clean_text_series(series).tolist() == [clean_text(value) for value in values]
+
+
+def test_matches_clean_text_across_blocks(monkeypatch):
+    monkeypatch.setattr(check_duplicates, "_CLEAN_BLOCK", 7)
+    rng = random.Random(0)
+    alphabet = "aBđĐếỆ _.,!?-\t😀Σς"
+    values = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(500)]
+    series = pd.Series(values + SPECIAL_VALUES + values, index=range(10, 10 + 2 * len(values) + len(SPECIAL_VALUES)))
+    result = clean_text_series(series)
+    assert result.index.equals(series.index)
+    assert result.tolist() == series.map(clean_text).tolist()
+
+
+def write_batch(path, texts, column="data"):
+    pd.DataFrame({column: texts, "Camera": ["Positive"] * len(texts)}).to_csv(path, index=False, encoding="utf-8")
+    return str(path)
+
+
+def ingested(path):
+    return pd.read_csv(path, encoding="utf-8")["data"].tolist()
+
+
+@pytest.fixture
+def seeded_index(tmp_path):
+    index_file = str(tmp_path / "dedup_index.sqlite")
+    seed = write_batch(tmp_path / "seed.csv", ["Máy đẹp!", "pin yếu", "Máy đẹp!"])
+    assert check_duplicates.ingest_batch(seed, index_file) == 2
+    assert ingested(tmp_path / "seed_new.csv") == ["Máy đẹp!", "pin yếu"]
+    return index_file
+
+
+BATCH = ["pin yếu", "máy   ĐẸP", "giao nhanh", "giao nhanh", None, "Giao nhanh!!"]
+
+
+def test_ingest_exact_key_drops_known_repeated_and_empty_rows(tmp_path, seeded_index):
+    batch = write_batch(tmp_path / "batch.csv", BATCH)
+    assert check_duplicates.ingest_batch(batch, seeded_index, key="exact", chunk_size=2) == 3
+    assert ingested(tmp_path / "batch_new.csv") == ["máy   ĐẸP", "giao nhanh", "Giao nhanh!!"]
+
+    # Accepted rows are now in the index
+    again = write_batch(tmp_path / "again.csv", ["giao nhanh", "Giao nhanh!!", "mới"])
+    assert check_duplicates.ingest_batch(again, seeded_index) == 1
+    assert ingested(tmp_path / "again_new.csv") == ["mới"]
+
+
+def test_ingest_clean_key_matches_clean_text_form(tmp_path, seeded_index):
+    batch = write_batch(tmp_path / "batch.csv", BATCH)
+    assert check_duplicates.ingest_batch(batch, seeded_index, key="clean", chunk_size=2) == 1
+    assert ingested(tmp_path / "batch_new.csv") == ["giao nhanh"]
+
+
+def test_ingest_dry_run_leaves_the_index_unchanged(tmp_path, seeded_index):
+    batch = write_batch(tmp_path / "batch.csv", ["mới"])
+    output = str(tmp_path / "out.csv")
+    assert check_duplicates.ingest_batch(batch, seeded_index, output_file=output, dry_run=True) == 1
+    assert check_duplicates.ingest_batch(batch, seeded_index, output_file=output) == 1
+    assert check_duplicates.ingest_batch(batch, seeded_index, output_file=output) == 0
+
+
+def test_ingest_without_data_column_writes_nothing(tmp_path):
+    batch = write_batch(tmp_path / "batch.csv", ["x"], column="text")
+    index_file = tmp_path / "dedup_index.sqlite"
+    assert check_duplicates.ingest_batch(batch, str(index_file)) is None
+    assert not (tmp_path / "batch_new.csv").exists()
+    assert not index_file.exists()
+
+
+def test_main_resolves_default_outputs_next_to_the_dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "CACHE_DIR", str(tmp_path / "cache"))
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write_batch(data_dir / "dataset.csv", ["máy đẹp", "pin tốt", "máy đẹp", "Máy đẹp!!"])
+    monkeypatch.setattr(check_duplicates, "DATASET_FILE", str(data_dir / "dataset.csv"))
+    for name in ["CLEAN_DATA_FILE", "DUPLICATES_EXACT_FILE", "DUPLICATES_NEAR_FILE"]:
+        monkeypatch.setattr(check_duplicates, name, str(data_dir / f"{name.lower()}.csv"))
+    cwd = tmp_path / "elsewhere"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+
+    for argv in [[], ["--near", "--threshold", "0.5"]]:
+        monkeypatch.setattr("sys.argv", ["check_duplicates.py", *argv])
+        check_duplicates.main()
+
+    assert list(cwd.iterdir()) == []
+    assert ingested(data_dir / "clean_data_file.csv") == ["máy đẹp", "pin tốt", "Máy đẹp!!"]
+    assert (data_dir / "duplicates_exact_file.csv").exists()
+    assert (data_dir / "duplicates_near_file.csv").exists()
@@ -0,0 +1,86 @@
+import codecs
+import sys
+
+import pandas as pd
+import pytest
+
+import check_split_leakage
+import dataset_store
+
+HEADER = "data,camera,Pin\n"
+NEAR_A = "máy chụp ảnh rất đẹp pin dùng được hai ngày giao hàng nhanh đóng gói cẩn thận shop tư vấn nhiệt tình"
+NEAR_B = NEAR_A + " nhé"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "CACHE_DIR", str(tmp_path / "cache"))
+
+
+def write(path, rows, bom=False):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    text = HEADER + "".join(f'"{text}",{label},\n' for text, label in rows)
+    path.write_bytes((codecs.BOM_UTF8 if bom else b"") + text.encode("utf-8"))
+    return path
+
+
+@pytest.fixture
+def splits(tmp_path):
+    root = tmp_path / "splits"
+    test = write(root / "phase_1" / "sub_1" / "test_split" / "sub_1_test.csv",
+                 [("Máy đẹp!", "Positive"), ("pin yếu", "Negative")])
+    train = write(root / "phase_1" / "sub_1" / "test_split" / "sub_1_train.csv",
+                  [("máy đẹp", "Positive"), ("pin yếu", "Negative"), ("giao nhanh", "Positive")], bom=True)
+    chunk = write(root / "phase_2" / "chunk_1" / "chunk_1.csv",
+                  [(NEAR_A, "Positive"), ("shop ok", "Neutral")])
+    other = write(root / "phase_2" / "chunk_2" / "chunk_2.csv",
+                  [(NEAR_B, "Positive"), ("giao nhanh", "Positive")])
+    aggregate = write(root / "phase_1" / "sub_1" / "sub_1.csv",
+                      [("Máy đẹp!", "Positive"), ("pin yếu", "Negative"), ("máy đẹp", "Positive"),
+                       ("pin yếu", "Negative"), ("giao nhanh", "Positive")])
+    return root, test, train, chunk, other, aggregate
+
+
+def run(root, tmp_path, monkeypatch, *flags):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["check_split_leakage.py", "--root", str(root), *flags])
+    check_split_leakage.main()
+
+
+def test_fix_drops_exact_and_normalized_leaks_only(splits, tmp_path, monkeypatch, capsys):
+    root, test, train, chunk, other, aggregate = splits
+    before = {path: path.read_bytes() for path in (test, chunk, other, aggregate)}
+    run(root, tmp_path, monkeypatch, "--fix")
+
+    # 'máy đẹp' (normalized) and 'pin yếu' (exact) leak from the test split into train
+    assert train.read_bytes().startswith(codecs.BOM_UTF8)
+    rewritten = pd.read_csv(train, encoding="utf-8-sig")
+    assert list(rewritten.columns) == ["data", "camera", "Pin"]
+    assert rewritten["data"].tolist() == ["giao nhanh"]
+    # 'giao nhanh' also leaks into chunk_2, which loses it; the near duplicate stays
+    assert pd.read_csv(other)["data"].tolist() == [NEAR_B]
+    assert {path: path.read_bytes() for path in before} == {**before, other: other.read_bytes()}
+
+    out = capsys.readouterr().out
+    assert "Near-duplicate leaks only (dropped with --fix-near): 1" in out
+    assert "sub_1.csv: still holds the 2 rows removed" in out
+    assert (tmp_path / "leakage_report.csv").exists()
+
+
+def test_fix_near_also_drops_near_duplicates(splits, tmp_path, monkeypatch):
+    root, test, train, chunk, other, aggregate = splits
+    run(root, tmp_path, monkeypatch, "--fix", "--fix-near")
+    assert pd.read_csv(other)["data"].tolist() == []
+    assert pd.read_csv(chunk)["data"].tolist() == [NEAR_A, "shop ok"]
+
+
+def test_without_fix_nothing_is_rewritten(splits, tmp_path, monkeypatch):
+    root = splits[0]
+    before = {path: path.read_bytes() for path in root.rglob("*.csv")}
+    run(root, tmp_path, monkeypatch)
+    assert {path: path.read_bytes() for path in root.rglob("*.csv")} == before
+
+
+def test_fix_near_requires_fix(splits, tmp_path, monkeypatch):
+    with pytest.raises(SystemExit):
+        run(splits[0], tmp_path, monkeypatch, "--fix-near")
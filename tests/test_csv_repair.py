@@ -0,0 +1,98 @@
+import codecs
+import csv
+import json
+
+import pytest
+
+from csv_repair import repair_csv
+
+
+def write(path, text, bom=False):
+    path.write_bytes((codecs.BOM_UTF8 if bom else b"") + text.encode("utf-8"))
+    return str(path)
+
+
+def read_rows(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_rejoins_line_broken_out_of_a_record(tmp_path):
+    source = write(tmp_path / "in.csv", "data,A,B\nmáy đẹp\npin tốt,Positive,\nok,,Negative\n")
+    stats = repair_csv(source, str(tmp_path / "out.csv"), steps=["rejoin"])
+    assert read_rows(tmp_path / "out.csv") == [
+        ["data", "A", "B"],
+        ["máy đẹp pin tốt", "Positive", ""],
+        ["ok", "", "Negative"],
+    ]
+    assert stats.rejoined == 1
+
+
+def test_short_row_is_not_merged_into_a_complete_one(tmp_path):
+    # Joined with the next line it would overshoot the schema width, and a
+    # quoted line starts a new record: both short rows stay as they are
+    source = write(tmp_path / "in.csv", 'data,A,B\nsolo\na,b,c,d\nsolo2\n"x",y,z\n')
+    stats = repair_csv(source, str(tmp_path / "out.csv"), steps=["rejoin"])
+    assert read_rows(tmp_path / "out.csv") == [
+        ["data", "A", "B"], ["solo"], ["a", "b", "c", "d"], ["solo2"], ["x", "y", "z"],
+    ]
+    assert stats.rejoined == 0
+
+
+def test_adds_missing_opening_quote(tmp_path):
+    source = write(tmp_path / "in.csv", 'data,A,B\nmáy, pin tốt",Positive,\n')
+    stats = repair_csv(source, str(tmp_path / "out.csv"), steps=["rejoin"])
+    assert read_rows(tmp_path / "out.csv")[1] == ["máy, pin tốt", "Positive", ""]
+    assert stats.leading_quotes == 1
+
+
+def test_closes_quote_that_never_closes(tmp_path):
+    lines = ['"unterminated, text,Positive,'] + [f"row {i},,Neutral" for i in range(5)]
+    source = write(tmp_path / "in.csv", "data,A,B\n" + "\n".join(lines) + "\n")
+    stats = repair_csv(source, str(tmp_path / "out.csv"), steps=["rejoin"], max_record_lines=3)
+    rows = read_rows(tmp_path / "out.csv")
+    assert rows[1] == ["unterminated, text", "Positive", ""]
+    assert rows[2:] == [[f"row {i}", "", "Neutral"] for i in range(5)]
+    assert stats.closed_quotes == 1
+
+
+def test_fit_pads_and_truncates_to_the_header(tmp_path):
+    source = write(tmp_path / "in.csv", "data,A,B\nshort\nlong,1,2,3,4\n")
+    report = tmp_path / "report.jsonl"
+    stats = repair_csv(source, str(tmp_path / "out.csv"), steps=["fit"], report_file=str(report))
+    assert read_rows(tmp_path / "out.csv") == [["data", "A", "B"], ["short", "", ""], ["long", "1", "2"]]
+    assert (stats.padded, stats.truncated) == (1, 1)
+    entries = [json.loads(line) for line in report.read_text(encoding="utf-8").splitlines()]
+    assert [entry["fixes"] for entry in entries] == [["padded"], ["truncated"]]
+
+
+def test_blank_lines_dropped_or_kept(tmp_path):
+    source = write(tmp_path / "in.csv", "data,A\n\nx,1\n\n")
+    stats = repair_csv(source, str(tmp_path / "dropped.csv"))
+    assert read_rows(tmp_path / "dropped.csv") == [["data", "A"], ["x", "1"]]
+    assert stats.blank == 2
+
+    repair_csv(source, str(tmp_path / "kept.csv"), steps=["fit"], drop_blank=False)
+    assert read_rows(tmp_path / "kept.csv") == [["data", "A"], ["", ""], ["x", "1"], ["", ""]]
+
+
+@pytest.mark.parametrize("bom, input_bom, output_bom", [
+    ("keep", True, True), ("keep", False, False), ("add", False, True), ("strip", True, False),
+])
+def test_bom_policy(tmp_path, bom, input_bom, output_bom):
+    source = write(tmp_path / "in.csv", "data,A\nx,1\n", bom=input_bom)
+    repair_csv(source, str(tmp_path / "out.csv"), bom=bom)
+    assert (tmp_path / "out.csv").read_bytes().startswith(codecs.BOM_UTF8) == output_bom
+
+
+def test_in_place_repair_leaves_no_temporary_files(tmp_path):
+    source = write(tmp_path / "in.csv", "data,A,B\nshort\n")
+    repair_csv(source, steps=["fit"])
+    assert read_rows(source) == [["data", "A", "B"], ["short", "", ""]]
+    assert [path.name for path in tmp_path.iterdir()] == ["in.csv"]
+
+
+def test_unknown_step_is_rejected(tmp_path):
+    source = write(tmp_path / "in.csv", "data\nx\n")
+    with pytest.raises(ValueError):
+        repair_csv(source, str(tmp_path / "out.csv"), steps=["dedupe"])
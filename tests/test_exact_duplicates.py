@@ -0,0 +1,47 @@
+import random
+
+from exact_duplicates import DigestCounter, text_digest
+
+
+def make_chunks(seed=0, chunks=8, rows=250):
+    rng = random.Random(seed)
+    vocabulary = [f"câu {i}" for i in range(600)] + [None, float("nan"), ""]
+    return [[rng.choice(vocabulary) for _ in range(rows)] for _ in range(chunks)]
+
+
+def count(chunks, **kwargs):
+    counter = DigestCounter(**kwargs)
+    try:
+        first = [counter.add([text_digest(text) for text in chunk], chunk) for chunk in chunks]
+        return (counter.spilled, first, list(counter.duplicates()), counter.duplicated_rows(),
+                counter.rows, counter.unique)
+    finally:
+        counter.close()
+
+
+def test_spilled_counter_matches_in_memory(tmp_path):
+    chunks = make_chunks()
+    in_memory = count(chunks)
+    spilled = count(chunks, max_entries=50, spill_dir=str(tmp_path))
+    assert not in_memory[0]
+    assert spilled[0]
+    assert spilled[1:] == in_memory[1:]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_counts_match_value_counts():
+    chunks = make_chunks(seed=1)
+    _, first, duplicates, duplicated_rows, rows, unique = count(chunks)
+    texts = [text for chunk in chunks for text in chunk]
+    seen = {}
+    for row, text in enumerate(texts):
+        key = "<NA>" if text != text or text is None else text
+        seen.setdefault(key, [0, row])[0] += 1
+
+    assert rows == len(texts)
+    assert unique == len(seen)
+    assert sum(map(sum, first)) == len(seen)
+    assert duplicated_rows == sum(n for n, _ in seen.values() if n > 1)
+    expected = sorted(((text, n, row) for text, (n, row) in seen.items() if n > 1 and text != "<NA>"),
+                      key=lambda item: (-item[1], item[2]))
+    assert duplicates == expected
@@ -0,0 +1,55 @@
+import random
+
+from icon_normalization import IconMatcher
+
+MAPPING = {
+    ":)": " vui ",
+    "=))": " cười ",
+    "😂": " cười ",
+    "❤️": " yêu ",
+    "👍": " tốt ",
+    "🙂‍↔️": " không ",
+}
+
+
+def per_icon_replace(text, mapping):
+    """The per-icon str.replace loop IconMatcher replaced."""
+    for icon, replacement in mapping.items():
+        if icon in text:
+            text = text.replace(icon, replacement)
+    return text
+
+
+def test_matches_per_icon_replace_on_random_texts():
+    matcher = IconMatcher(MAPPING)
+    rng = random.Random(0)
+    pieces = list(MAPPING) + ["máy", "đẹp", " ", "!", "=", ")", "🙂", "‍"]
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 10)))
+        expected = per_icon_replace(text, MAPPING)
+        # Texts where one icon ends where the next starts can be read two ways
+        # (":)" then ")" vs "=))"); only compare texts the loop reads unambiguously
+        if per_icon_replace(text, dict(reversed(list(MAPPING.items())))) != expected:
+            continue
+        assert matcher.normalize(text) == expected, text
+
+
+def test_longest_icon_wins():
+    matcher = IconMatcher({"=))": "cười", "=)))": "cười lớn", ":(": "buồn"})
+    assert matcher.normalize("=)))") == "cười lớn"
+    assert matcher.normalize("=))))") == "cười lớn)"
+    assert matcher.normalize("a =)) b :(") == "a cười b buồn"
+
+
+def test_text_without_icons_is_returned_unchanged():
+    matcher = IconMatcher(MAPPING)
+    text = "không có biểu tượng"
+    assert matcher.normalize(text) is text
+    assert matcher.skipped == 1
+
+
+def test_cache_state_round_trip():
+    matcher = IconMatcher(MAPPING)
+    restored = IconMatcher.from_cache_state(matcher.cache_state())
+    text = "đẹp 😂👍 =))"
+    assert restored.normalize(text) == matcher.normalize(text)
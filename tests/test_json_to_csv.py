@@ -0,0 +1,135 @@
+import csv
+import json
+
+import pytest
+
+import json_to_csv as converter
+from json_to_csv import infer_schema, iter_json_records, json_to_csv
+
+RECORDS = [
+    {"id": 1, "data": "máy đẹp", "Camera": "Positive", "lead_time": 1.5},
+    {"id": 2, "data": "pin \"trâu\"\nlắm", "Pin": "Positive", "nested": {"a": [1, 2]}},
+    {"id": 3, "data": "", "Camera": None, "agreement": 100, "created_at": "2024-05-01T10:00:00.123Z"},
+    {"id": 40000000000, "data": "😂 " * 50, "flag": True},
+]
+
+CHUNK_SIZES = [1, 3, 16, 1 << 20]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_array_matches_json_load(tmp_path, chunk_size):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps(RECORDS, ensure_ascii=False, indent=2), encoding="utf-8")
+    with open(path, encoding="utf-8") as f:
+        assert list(iter_json_records(path, chunk_size=chunk_size)) == json.load(f)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_json_lines_match_json_loads(tmp_path, chunk_size):
+    path = tmp_path / "export.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in RECORDS) + "\n", encoding="utf-8")
+    expected = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert list(iter_json_records(path, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ ]\n", "﻿[1, 2.5e3, -0]", "[12345678901234567890]"])
+def test_small_documents(tmp_path, text):
+    path = tmp_path / "small.json"
+    path.write_text(text, encoding="utf-8")
+    assert list(iter_json_records(path, chunk_size=2)) == json.loads(text.lstrip("﻿"))
+
+
+@pytest.mark.parametrize("text", [
+    '[{"a": 1}] trailing',
+    '[{"a": 1},\n {"a": 2}]\n{"b": 3}',
+    '[{"a": 1},]',
+    '[{"a": 1}\n\n{"a": 2}]',
+    '[{"a": 1},\n {"a": tru}]',
+    '[{"a": "' + "x" * 40 + '"},\n{"a": 1}\n,\n{"a": @}]',
+])
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_invalid_json_raises_at_the_same_position_as_json_loads(tmp_path, text, chunk_size):
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+    with pytest.raises(json.JSONDecodeError) as raised:
+        list(iter_json_records(path, chunk_size=chunk_size))
+    error, reference = raised.value, expected.value
+    assert (error.pos, error.lineno, error.colno) == (reference.pos, reference.lineno, reference.colno)
+
+
+@pytest.mark.parametrize("values, kind", [
+    ([1, 2, None], "int"),
+    ([1, "a", None], "string"),
+    ([1, 2.5, None], "float"),
+    ([None, "", None], "string"),
+    ([3, ""], "int"),
+    ([True, 1], "string"),
+    (["2024-05-01T10:00:00Z", "2024-05-01 10:00"], "timestamp"),
+    (["2024-05-01T10:00:00Z", "hôm qua"], "string"),
+    ([{"a": 1}, None], "string"),
+])
+def test_infer_schema_merges_mixed_columns(values, kind):
+    records = [{"x": value} for value in values]
+    assert infer_schema(records) == (["x"], {"x": kind}, len(values))
+    assert infer_schema(list(reversed(records)))[1] == {"x": kind}
+
+
+def test_infer_schema_headers_and_label_studio_types():
+    records = [
+        {"id": 1, "data": "a"},
+        {"data": 5, "agreement": 100, "Camera": None, "created_at": None},
+        {"id": "x1", "lead_time": None, "new": None},
+    ]
+    headers, types, count = infer_schema(records)
+    assert headers == ["id", "data", "agreement", "Camera", "created_at", "lead_time", "new"]
+    assert types == {
+        "id": "string",  # declared int, but 'x1' does not fit it
+        "data": "string",
+        "agreement": "float",
+        "Camera": "string",
+        "created_at": "timestamp",
+        "lead_time": "float",
+        "new": "string",
+    }
+    assert count == 3
+    assert infer_schema(records, limit=1) == (["id", "data"], {"id": "int", "data": "string"}, 1)
+
+
+def test_csv_has_the_union_of_keys(tmp_path):
+    source = tmp_path / "export.json"
+    source.write_text(json.dumps(RECORDS, ensure_ascii=False), encoding="utf-8")
+    json_to_csv(source, tmp_path / "export.csv")
+    with open(tmp_path / "export.csv", encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["id", "data", "Camera", "lead_time", "Pin", "nested", "agreement", "created_at", "flag"]
+    assert rows[1] == ["1", "máy đẹp", "Positive", "1.5", "", "", "", "", ""]
+    assert rows[2][1] == "pin \"trâu\"\nlắm"
+    assert len(rows) == len(RECORDS) + 1
+
+
+def test_parquet_flag_rejects_other_suffixes(tmp_path):
+    with pytest.raises(ValueError, match="--parquet"):
+        json_to_csv(tmp_path / "export.json", tmp_path / "export.csv", parquet=True)
+
+
+def test_parquet_without_pyarrow_fails_before_reading(tmp_path, monkeypatch):
+    monkeypatch.setattr(converter, "HAVE_PYARROW", False)
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        json_to_csv(tmp_path / "missing.json", tmp_path / "export.parquet")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parquet_keeps_column_types(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    source = tmp_path / "export.json"
+    source.write_text(json.dumps(RECORDS, ensure_ascii=False), encoding="utf-8")
+    json_to_csv(source, tmp_path / "export.parquet")
+    table = pq.read_table(tmp_path / "export.parquet")
+    types = {field.name: str(field.type) for field in table.schema}
+    assert types["id"] == "int64"
+    assert types["lead_time"] == types["agreement"] == "double"
+    assert types["created_at"] == "timestamp[us, tz=UTC]"
+    assert types["Camera"].startswith("dictionary")
+    assert table.column("data").to_pylist() == [record["data"] for record in RECORDS]
@@ -0,0 +1,72 @@
+import codecs
+import csv
+import io
+
+import pandas as pd
+
+from row_index import IndexedCSV
+
+ROWS = [
+    ["data", "Camera", "Pin"],
+    ["máy đẹp", "Positive", ""],
+    ["dòng\nnhiều\r\ndòng", "", "Negative"],
+    ['có "ngoặc", và dấu phẩy', "Neutral", "Neutral"],
+    ["", "", ""],
+    ["cuối", "Positive", "Positive"],
+]
+
+
+def write_csv(path, rows, bom=False, lineterminator="\r\n", trailing_newline=True):
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer, lineterminator=lineterminator).writerows(rows)
+    text = buffer.getvalue()
+    if not trailing_newline:
+        text = text[:-len(lineterminator)]
+    path.write_bytes((codecs.BOM_UTF8 if bom else b"") + text.encode("utf-8"))
+    return str(path)
+
+
+def reader_rows(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_rows_match_csv_reader(tmp_path):
+    for i, (bom, terminator, trailing) in enumerate([(False, "\r\n", True), (True, "\n", True),
+                                                     (False, "\n", False)]):
+        path = write_csv(tmp_path / f"{i}.csv", ROWS, bom, terminator, trailing)
+        expected = reader_rows(path)
+        with IndexedCSV(path) as indexed:
+            assert indexed.columns == expected[0]
+            assert len(indexed) == len(expected) - 1
+            assert indexed.rows(0) == expected[1:]
+            assert [indexed.row(n) for n in range(len(indexed))] == expected[1:]
+            assert indexed.rows(1, 3) == expected[2:4]
+            assert indexed.row(-1) == expected[-1]
+
+
+def test_frame_matches_read_csv(tmp_path):
+    path = write_csv(tmp_path / "data.csv", ROWS, bom=True)
+    expected = pd.read_csv(path, encoding="utf-8-sig")
+    with IndexedCSV(path) as indexed:
+        pd.testing.assert_frame_equal(indexed.frame(encoding="utf-8-sig"), expected)
+        part = indexed.frame(2, 4, usecols=["data"], encoding="utf-8-sig")
+        assert list(part.index) == [2, 3]
+        assert part["data"].tolist() == expected["data"].iloc[2:4].tolist()
+
+
+def test_index_is_rebuilt_when_the_file_changes(tmp_path):
+    path = write_csv(tmp_path / "data.csv", ROWS)
+    with IndexedCSV(path) as indexed:
+        assert len(indexed) == len(ROWS) - 1
+    write_csv(tmp_path / "data.csv", ROWS + [["thêm", "", ""]])
+    with IndexedCSV(path) as indexed:
+        assert indexed.rows(0) == reader_rows(path)[1:]
+
+
+def test_header_only_file(tmp_path):
+    path = write_csv(tmp_path / "empty.csv", ROWS[:1])
+    with IndexedCSV(path) as indexed:
+        assert indexed.columns == ROWS[0]
+        assert len(indexed) == 0
+        assert indexed.rows(0) == []
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from icon_normalization import IconMatcher, normalize_icons_in_text_profiled
+from rule_profile import RuleProfile
+from text_normalization import TextNormalizer
+
+TEXTS = ["sp dc lắm ko", "ko ko biết", "không có gì", "", None, "đc 😂😂 =))", "👍"]
+
+
+def test_text_profile_counts_and_times_only_firing_rules(tmp_path):
+    normalizer = TextNormalizer({"ko": "không", "dc": "được", "sp": "sản phẩm", "seen": "xem"})
+    profile = RuleProfile("KEY.csv", normalizer.replacements)
+    for text in TEXTS:
+        assert normalizer.normalize_profiled(text, profile) == normalizer.normalize(text)
+
+    assert profile.cells == 5
+    assert profile["ko"].matches == 3
+    assert profile["ko"].cells_changed == 2
+    assert profile["seen"].matches == 0 and profile["seen"].seconds == 0
+    assert sum(stats.seconds for stats in profile.rules.values()) == pytest.approx(profile.match_seconds)
+    assert profile.scan_seconds > 0
+
+    profile.write(str(tmp_path / "profile.csv"))
+    header = (tmp_path / "profile.csv").read_text(encoding="utf-8").splitlines()[0]
+    assert header == "rule,replacement,matches,cells_changed,seconds"
+
+
+def test_icon_profile_uses_the_same_timing(tmp_path):
+    matcher = IconMatcher({"😂": " cười ", "=))": " cười ", "👍": " tốt ", ":(": " buồn "})
+    profile = RuleProfile("Icon.csv", list(matcher.mapping.items()))
+    for text in TEXTS:
+        expected = text if pd.isna(text) else matcher.normalize(text)
+        assert normalize_icons_in_text_profiled(text, matcher, profile) == expected
+
+    assert profile["😂"].matches == 2 and profile["😂"].cells_changed == 1
+    assert profile[":("].matches == 0 and profile[":("].seconds == 0
+    assert profile["👍"].seconds > 0
+    assert sum(stats.seconds for stats in profile.rules.values()) == pytest.approx(profile.match_seconds)
+
@@ -0,0 +1,127 @@
+import random
+import re
+
+import pandas as pd
+import pytest
+
+import dataset_store
+from text_normalization import TextNormalizer, process_dataset_incremental
+
+REPLACEMENTS = {
+    "ko": "không",
+    "k": "không",
+    "dc": "được",
+    "đc": "được",
+    "sp": "sản phẩm",
+    "ko biết": "không biết",
+    "bt": "bình thường",
+    "ok": "tốt",
+    "vs": "với",
+    "nv": "nhân viên",
+}
+
+
+def sequential_normalize(text, replacement_dict):
+    """The per-rule loop TextNormalizer replaced: one regex per rule, longest key first."""
+    normalized = str(text)
+    for old_word, new_word in sorted(replacement_dict.items(), key=lambda x: len(x[0]), reverse=True):
+        if " " in old_word:
+            pattern = re.compile(re.escape(old_word), re.IGNORECASE)
+        else:
+            pattern = re.compile(r"\b" + re.escape(old_word) + r"\b", re.IGNORECASE)
+        normalized = pattern.sub(new_word, normalized)
+    return normalized
+
+
+def test_matches_sequential_loop_on_examples():
+    normalizer = TextNormalizer(REPLACEMENTS)
+    texts = [
+        "sp dc lắm, ko biết nói gì",
+        "KO thích, Sp bt thôi",
+        "okay nhưng k ok",
+        "nv tư vấn vs khách đc",
+        "kdc sp1 _ko ko_ ko.",
+        "không có gì để thay",
+        "ko  biết",
+    ]
+    for text in texts:
+        assert normalizer.normalize(text) == sequential_normalize(text, REPLACEMENTS), text
+
+
+def test_matches_sequential_loop_on_random_texts():
+    normalizer = TextNormalizer(REPLACEMENTS)
+    rng = random.Random(0)
+    tokens = list(REPLACEMENTS) + ["máy", "pin", "Ko", "DC", "okk", "k1", "", "!", ",", "..."]
+    separators = [" ", "  ", ", ", ".", "\n", ""]
+    for _ in range(2000):
+        text = "".join(rng.choice(tokens) + rng.choice(separators) for _ in range(rng.randint(1, 12)))
+        assert normalizer.normalize(text) == sequential_normalize(text, REPLACEMENTS), text
+
+
+def test_empty_and_missing_values_pass_through():
+    normalizer = TextNormalizer(REPLACEMENTS)
+    assert normalizer.normalize("") == ""
+    assert normalizer.normalize(None) is None
+
+
+def test_cache_state_round_trip():
+    normalizer = TextNormalizer(REPLACEMENTS)
+    restored = TextNormalizer.from_cache_state(normalizer.cache_state())
+    text = "sp dc lắm, ko biết nói gì"
+    assert restored.normalize(text) == normalizer.normalize(text)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "CACHE_DIR", str(tmp_path / "cache"))
+    texts = ["sp dc lắm", "ko thích", "giao nhanh", "ko thích", "", "máy bt", "nv ok"]
+    path = tmp_path / "dataset.csv"
+    pd.DataFrame({"data": texts, "Camera": ["Positive"] * len(texts)}).to_csv(path, index=False)
+    return path
+
+
+def incremental(dataset, rules):
+    output = str(dataset.with_name("normalized.csv"))
+    cache = process_dataset_incremental(str(dataset), output, rules)
+    return cache, pd.read_csv(output, keep_default_na=False)["data"].tolist()
+
+
+def expected(dataset, rules):
+    normalizer = TextNormalizer(rules)
+    return [normalizer.normalize(text) for text in pd.read_csv(dataset, keep_default_na=False)["data"]]
+
+
+def test_incremental_reuses_the_sidecar_cache(dataset):
+    cache, first = incremental(dataset, REPLACEMENTS)
+    assert (cache.hits, cache.misses, cache.invalidated) == (1, 5, 0)
+    assert first == expected(dataset, REPLACEMENTS)
+
+    cache, second = incremental(dataset, REPLACEMENTS)
+    assert (cache.hits, cache.misses, cache.invalidated) == (6, 0, 0)
+    assert second == first
+
+
+def test_incremental_recomputes_rows_affected_by_changed_rules(dataset):
+    incremental(dataset, REPLACEMENTS)
+
+    rules = {**REPLACEMENTS, "ko": "hông", "giao": "gửi"}
+    del rules["nv"]
+    cache, result = incremental(dataset, rules)
+    # 'ko thích' (twice, recomputed once), 'giao nhanh' and 'nv ok' are affected
+    assert (cache.invalidated, cache.misses, cache.hits) == (3, 0, 3)
+    assert result == expected(dataset, rules)
+    assert result[1] == result[3] == "hông thích"
+
+    cache, again = incremental(dataset, rules)
+    assert (cache.hits, cache.misses, cache.invalidated) == (6, 0, 0)
+    assert again == result
+
+
+def test_incremental_computes_new_rows_only(dataset):
+    incremental(dataset, REPLACEMENTS)
+    df = pd.read_csv(dataset, keep_default_na=False)
+    pd.concat([df, pd.DataFrame({"data": ["dc vs k"], "Camera": [""]})]).to_csv(dataset, index=False)
+
+    cache, result = incremental(dataset, REPLACEMENTS)
+    assert (cache.hits, cache.misses, cache.invalidated) == (6, 1, 0)
+    assert result == expected(dataset, REPLACEMENTS)